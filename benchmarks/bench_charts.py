@@ -0,0 +1,52 @@
+"""
+Benchmark of batch chart rendering over all survey years.
+
+Synthetic research and patent workbooks are cleaned once, then every chart of
+every year is rendered cold (empty output directory) and again warm, when the
+unchanged charts are skipped by their input hash.
+
+Usage:
+    python benchmarks/bench_charts.py --years 1992-2023 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import synthetic_workbooks  # noqa: E402
+from innovation.clean import DataCleaner  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", default="1992-2023", help="First-last survey year.")
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--font", help="Font file for the Japanese labels.")
+    args = parser.parse_args()
+    first, last = (int(y) for y in args.years.split("-"))
+    # Without a Japanese font every label raises a missing-glyph warning
+    warnings.simplefilter("ignore", UserWarning)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        download_dir = os.path.join(tmp, "downloads")
+        synthetic_workbooks.generate(download_dir, range(first, last + 1), n_rows=args.rows, tables=("research", "patent"))
+        cleaner = DataCleaner(download_dir, font_path=args.font, use_cache=False, max_workers=args.workers)
+        cleaner.ResearchExpenseDict = cleaner.research_expense_cleaner.clean_data(target_str="研究開発費及び売上高比率")
+        cleaner.PatentCountDict = cleaner.patent_count_cleaner.clean_data(target_str="産業別、企業数、特許権")
+
+        out_dir = os.path.join(tmp, "plots")
+        for label in ("cold", "warm"):
+            start = time.perf_counter()
+            report = cleaner.render_charts(out_dir=out_dir)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label:<5} {elapsed:8.2f} s  {len(report['rendered'])} rendered, "
+                f"{len(report['skipped'])} skipped  ({args.workers} workers)"
+            )
+
+if __name__ == "__main__":
+    main()
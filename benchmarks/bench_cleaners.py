@@ -0,0 +1,133 @@
+"""
+Benchmark suite for the cleaners (pytest-benchmark), with a baseline regression gate.
+
+Synthetic workbooks (see synthetic_workbooks.py) are generated for every survey
+year where a table's layout changes in LAYOUT_REGISTRY, so each year-specific
+layout of ResearchExpenseCleaner, PatentCountCleaner and the labor cleaner is
+exercised. Each benchmark is timed without the frame cache, and once more with a
+warm cache. Memory is measured in a separate pass with tracemalloc (peak of
+Python, pandas and NumPy allocations) and saved as the benchmark's peak_mb.
+
+The benchmarks carry the `benchmark` marker and are not under the test paths, so
+a plain `pytest` does not run them. The fixture set is sized by environment
+variables: INNOVATION_BENCH_ROWS, INNOVATION_BENCH_SHEETS, INNOVATION_BENCH_EXT
+(.xlsx or .xls), INNOVATION_BENCH_YEARS ("layouts", "all" or first-last) and
+INNOVATION_BENCH_WORKERS. pytest-benchmark's --benchmark-compare-fail gates the
+time; INNOVATION_BENCH_BASELINE, a --benchmark-json file, gates the memory
+(INNOVATION_BENCH_TOLERANCE, 0.2 by default).
+
+Usage:
+    INNOVATION_BENCH_ROWS=200 INNOVATION_BENCH_SHEETS=2 INNOVATION_BENCH_EXT=.xls \\
+        pytest benchmarks/bench_cleaners.py --benchmark-autosave --benchmark-json=baseline.json
+    INNOVATION_BENCH_ROWS=200 INNOVATION_BENCH_SHEETS=2 INNOVATION_BENCH_EXT=.xls INNOVATION_BENCH_BASELINE=baseline.json \\
+        pytest benchmarks/bench_cleaners.py --benchmark-compare --benchmark-compare-fail=min:20%
+"""
+import gc
+import json
+import os
+import shutil
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import synthetic_workbooks  # noqa: E402
+from innovation import LAYOUT_REGISTRY, TABLE_TARGETS, DataCleaner, close_workbooks  # noqa: E402
+
+pytestmark = pytest.mark.benchmark(group="cleaners")
+
+# The fixture set and the cleaners' workers
+ROWS = int(os.environ.get("INNOVATION_BENCH_ROWS", "100"))
+SHEETS = int(os.environ.get("INNOVATION_BENCH_SHEETS", "1"))
+EXT = os.environ.get("INNOVATION_BENCH_EXT", ".xlsx")
+YEARS = os.environ.get("INNOVATION_BENCH_YEARS", "layouts")
+WORKERS = int(os.environ.get("INNOVATION_BENCH_WORKERS", "1"))
+# Timed rounds of each benchmark; the best and the spread are reported
+ROUNDS = 3
+# The memory regression gate: a saved --benchmark-json run, and the allowed growth as a fraction
+BASELINE = os.environ.get("INNOVATION_BENCH_BASELINE")
+TOLERANCE = float(os.environ.get("INNOVATION_BENCH_TOLERANCE", "0.2"))
+
+def layout_years():
+    """
+    Returns every year at which some table's layout changes, plus the year after it.
+    """
+    years = set()
+    for layouts in LAYOUT_REGISTRY.values():
+        for year in layouts:
+            years.update((year, year + 1))
+    return sorted(y for y in years if y <= 2023)
+
+def survey_years():
+    if YEARS == "layouts":
+        return layout_years()
+    if YEARS == "all":
+        return list(range(1992, 2024))
+    first, last = (int(y) for y in YEARS.split("-"))
+    return list(range(first, last + 1))
+
+@pytest.fixture(scope="module")
+def workdir(tmp_path_factory):
+    """
+    A working directory with the synthetic workbooks under downloads/.
+    """
+    path = tmp_path_factory.mktemp("bench_cleaners")
+    synthetic_workbooks.generate(str(path / "downloads"), survey_years(), n_rows=ROWS, n_sheets=SHEETS, ext=EXT)
+    return path
+
+@pytest.fixture(scope="module")
+def baseline():
+    """
+    {benchmark name: peak_mb} of the baseline run, empty without one.
+    """
+    if not BASELINE:
+        return {}
+    with open(BASELINE, encoding="utf-8") as f:
+        return {bench["name"]: bench["extra_info"].get("peak_mb") for bench in json.load(f)["benchmarks"]}
+
+def benchmarks(workdir, use_cache):
+    """
+    Returns {name: function} for the benchmarks, each cleaning the whole fixture set.
+    """
+    def cleaner():
+        return DataCleaner("downloads", font_path=None, use_cache=use_cache, max_workers=WORKERS)
+
+    def clean_table(table):
+        return lambda: cleaner().load_table(table)
+
+    suite = {f"clean:{table}": clean_table(table) for table in TABLE_TARGETS}
+    suite["clean_all_data"] = lambda: cleaner().clean_all_data()
+    return suite
+
+def peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        close_workbooks()
+
+def start_round():
+    close_workbooks()
+    gc.collect()
+
+@pytest.mark.parametrize("use_cache", [False, True], ids=["cold", "warm cache"])
+@pytest.mark.parametrize("name", [*(f"clean:{table}" for table in TABLE_TARGETS), "clean_all_data"])
+def test_cleaner(benchmark, workdir, baseline, monkeypatch, name, use_cache):
+    monkeypatch.chdir(workdir)
+    shutil.rmtree(workdir / "downloads" / ".frame_cache", ignore_errors=True)
+    func = benchmarks(workdir, use_cache)[name]
+    if use_cache:
+        func()  # fill the cache
+
+    benchmark.pedantic(func, setup=start_round, rounds=ROUNDS)
+    peak_mb = peak_memory(func) / 2**20
+    benchmark.extra_info.update(rows=ROWS, sheets=SHEETS, ext=EXT, workers=WORKERS, peak_mb=round(peak_mb, 3))
+
+    base_mb = baseline.get(benchmark.name)
+    if base_mb:
+        assert peak_mb <= base_mb * (1 + TOLERANCE), f"peak {peak_mb:.1f} MB, baseline {base_mb:.1f} MB"
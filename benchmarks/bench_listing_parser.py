@@ -0,0 +1,97 @@
+"""
+Benchmark of listing-page parsing: the previous BeautifulSoup tree walk
+(find_all + find_parent + find_previous) against the streaming ExcelLinkParser.
+
+Pages are generated in the e-Stat listing format, or read from a directory of
+saved listing pages with --pages-dir. Both parsers must return the same links.
+
+Usage:
+    python benchmarks/bench_listing_parser.py --pages 30 --items 100
+    python benchmarks/bench_listing_parser.py --pages-dir saved_listings/
+"""
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_scraper import LISTING_ITEM  # noqa: E402
+from innovation.scrape import ExcelLinkParser  # noqa: E402
+
+PAGE_URL = "https://www.e-stat.go.jp/stat-search/files?page=1&layout=datalist&toukei=00550100"
+PAGINATION = '<div class="stat-paginate"><a href="?page=1&layout=datalist&toukei=00550100">1</a><a href="?page=2&layout=datalist&toukei=00550100">2</a></div>'
+
+def parse_bs4(html, page_url):
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    for span in soup.find_all("span", class_="stat-dl_text"):
+        if span.get_text(strip=True) != "EXCEL":
+            continue
+        dl_a = span.find_parent("a", href=True)
+        if not dl_a:
+            continue
+        download_url = urljoin(page_url, dl_a["href"])
+        table_a = span.find_previous("a", class_="stat-link_text stat-dataset_list-detail-item-text js-data")
+        if not table_a:
+            table_name = download_url.split("/")[-1]
+        else:
+            table_name = table_a.get_text(separator=" ", strip=True)
+        results.append((download_url, table_name))
+    return results
+
+def parse_streaming(html, page_url):
+    parser = ExcelLinkParser(page_url)
+    parser.feed(html)
+    parser.close()
+    return parser.results
+
+def build_pages(n_pages, n_items):
+    pages = []
+    for page in range(n_pages):
+        items = "".join(LISTING_ITEM.format(fid=page * 1000 + j) for j in range(n_items))
+        pages.append(f"<html><body><ul>{items}</ul>{PAGINATION}</body></html>")
+    return pages
+
+def load_pages(pages_dir):
+    names = sorted(f for f in os.listdir(pages_dir) if f.endswith((".html", ".htm")))
+    pages = []
+    for name in names:
+        with open(os.path.join(pages_dir, name), encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--items", type=int, default=100, help="Datasets per generated page.")
+    parser.add_argument("--pages-dir", help="Directory of saved listing pages to parse instead.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir) if args.pages_dir else build_pages(args.pages, args.items)
+    total_kb = sum(len(page.encode("utf-8")) for page in pages) / 1024
+
+    expected = [parse_bs4(page, PAGE_URL) for page in pages]
+    actual = [parse_streaming(page, PAGE_URL) for page in pages]
+    if expected != actual:
+        sys.exit("ExcelLinkParser results differ from the BeautifulSoup parser")
+
+    n_links = sum(len(links) for links in actual)
+    for label, func in (("BeautifulSoup", parse_bs4), ("ExcelLinkParser", parse_streaming)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for page in pages:
+                func(page, PAGE_URL)
+            best = min(best, time.perf_counter() - start)
+        print(
+            f"{label:<16} {best:8.3f} s  {len(pages) / best:8.1f} pages/s  {total_kb / best:9.1f} KB/s  "
+            f"({len(pages)} pages, {n_links} links, best of {args.repeat})"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark of the serial and concurrent DataScraper paths.
+
+A local HTTP server stands in for e-Stat. It serves fixture listing pages shaped
+like the real ones and random .xls payloads, with an optional per-request latency.
+With --replay, its responses are recorded once into a cassette store and the
+benchmark runs against the replay transport, with the server shut down.
+
+Usage:
+    python benchmarks/bench_scraper.py --pages 30 --files-per-page 5 --size-kb 200 --latency 0.05
+    python benchmarks/bench_scraper.py --replay --workers 1 2 4 8
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from innovation.scrape import JOURNAL_FILENAME, MANIFEST_FILENAME, DataScraper  # noqa: E402
+
+# Files the scraper keeps next to the downloads, not counted as downloaded files
+METADATA_FILES = (MANIFEST_FILENAME, JOURNAL_FILENAME)
+
+LISTING_ITEM = """
+<li class="stat-dataset_list-item">
+  <a class="stat-link_text stat-dataset_list-detail-item-text js-data" href="/stat-search/files?stat_infid={fid}">
+    第{fid}表　産業別、企業数、特許権、実用新案権、意匠権別所有件数及び使用件数
+  </a>
+  <a href="/stat-search/file-download?statInfId={fid}&fileKind=4"><span class="stat-dl_text">CSV</span></a>
+  <a href="/file/{fid}.xls"><span class="stat-dl_text">EXCEL</span></a>
+</li>
+"""
+
+def build_listing(page: int, files_per_page: int) -> bytes:
+    """
+    Builds one fixture listing page with `files_per_page` EXCEL links.
+    """
+    items = "".join(LISTING_ITEM.format(fid=page * 1000 + j) for j in range(files_per_page))
+    return f"<html><body><ul>{items}</ul></body></html>".encode("utf-8")
+
+def make_handler(files_per_page: int, payload: bytes, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            if self.path.startswith("/listing/"):
+                body = build_listing(int(self.path.rsplit("/", 1)[-1]), files_per_page)
+                content_type = "text/html; charset=utf-8"
+            elif self.path.startswith("/file/"):
+                body = payload
+                content_type = "application/vnd.ms-excel"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+def downloaded_files(download_dir: str) -> set:
+    """
+    Returns (filename, sha256) of each downloaded file, leaving out the scraper's metadata files.
+    """
+    files = set()
+    for name in os.listdir(download_dir):
+        path = os.path.join(download_dir, name)
+        if name in METADATA_FILES or not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            files.add((name, hashlib.sha256(f.read()).hexdigest()))
+    return files
+
+def run(label: str, base_urls: list, years: list, **scraper_kwargs) -> set:
+    """
+    Runs one scrape into a temporary directory and prints its throughput.
+
+    Returns:
+        set: (filename, sha256) of the downloaded files.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = DataScraper(base_urls, tmp, years, **scraper_kwargs)
+        start = time.perf_counter()
+        scraper.run_scraper()
+        elapsed = time.perf_counter() - start
+        files = downloaded_files(tmp)
+        total_bytes = sum(os.path.getsize(os.path.join(tmp, name)) for name, _ in files)
+    print(
+        f"{label:<12} {elapsed:8.2f} s  {len(base_urls) / elapsed:8.1f} pages/s  "
+        f"{total_bytes / elapsed / 1e6:8.2f} MB/s  ({len(files)} files)"
+    )
+    return files
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--files-per-page", type=int, default=5)
+    parser.add_argument("--size-kb", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated server latency in seconds.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[8], help="Worker counts of the concurrent runs.")
+    parser.add_argument("--per-host-limit", type=int, default=8)
+    parser.add_argument("--min-interval", type=float, default=0.0,
+                        help="Minimum seconds between two requests to the server (none for the local server).")
+    parser.add_argument("--replay", action="store_true", help="Benchmark replaying recorded responses, without a server.")
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_kb * 1024)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.files_per_page, payload, args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    base_urls = [f"http://{host}:{port}/listing/{page}" for page in range(args.pages)]
+    years = list(range(2023, 2023 - args.pages, -1))
+    with tempfile.TemporaryDirectory() as cassette_dir:
+        options = {"min_interval": args.min_interval}
+        try:
+            if args.replay:
+                run("record", base_urls, years, max_workers=max(args.workers), per_host_limit=args.per_host_limit,
+                    transport="record", cassette_dir=cassette_dir, **options)
+                options.update(transport="replay", cassette_dir=cassette_dir)
+                server.shutdown()
+            serial = run("serial", base_urls, years, **options)
+            for workers in args.workers:
+                files = run(f"workers={workers}", base_urls, years, max_workers=workers,
+                            per_host_limit=args.per_host_limit, **options)
+                assert files == serial, f"workers={workers} downloaded other files than the serial run"
+        finally:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark of sheet reads on multi-sheet workbooks: one pd.read_excel per sheet
+(the workbook is parsed again for every sheet) against one WorkbookReader per file.
+
+Usage:
+    python benchmarks/bench_workbook_reader.py --sheets 8 --rows 200 --ext .xls
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import synthetic_workbooks  # noqa: E402
+from innovation.clean import WorkbookReader  # noqa: E402
+
+def read_per_sheet(path):
+    engine = "xlrd" if path.endswith(".xls") else "openpyxl"
+    sheet_names = pd.ExcelFile(path, engine=engine).sheet_names
+    return [pd.read_excel(path, sheet_name=sheet, engine=engine, header=[0, 1]) for sheet in sheet_names]
+
+def read_with_reader(path):
+    with WorkbookReader(path) as reader:
+        return [reader.read(sheet, header=[0, 1]) for sheet in reader.sheet_names]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sheets", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--ext", default=".xlsx", choices=[".xlsx", ".xls"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = synthetic_workbooks.generate(
+            tmp, range(2014, 2014 + args.files), n_rows=args.rows, n_sheets=args.sheets, ext=args.ext, tables=("labor",)
+        )
+        for label, func in (("per-sheet read_excel", read_per_sheet), ("WorkbookReader", read_with_reader)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for path in paths:
+                    func(path)
+                best = min(best, time.perf_counter() - start)
+            print(f"{label:<22} {best:8.3f} s  ({args.files} files x {args.sheets} sheets, best of {args.repeat})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Synthetic workbooks shaped like the e-Stat tables handled by the cleaners.
+
+Every year-specific layout of ResearchExpenseCleaner, PatentCountCleaner and
+DataCleaner.clean_labor_number_data is reproduced: merged header spans, offset
+header rows, dropped leading columns and suppression markers (X, -, *** ...).
+Row and sheet counts are configurable so the benchmarks can scale the input.
+
+Files are written as .xlsx with openpyxl, or as .xls with xlwt when it is installed.
+"""
+import os
+import random
+
+RESEARCH_TABLE = "第10表 産業別、企業数、売上高、研究開発費及び売上高比率、受託研究費、研究開発投資、能力開発費"
+PATENT_TABLE = "第11表 産業別、企業数、特許権、実用新案権、意匠権別所有件数及び使用件数"
+LABOR_TABLE = "第3表 産業別、売上高経常利益率別常時従業者数"
+
+INDUSTRIES = [
+    "合 計", "製造業計", "食料品製造業", "飲料・たばこ・飼料製造業", "繊維工業", "木材・木製品製造業",
+    "パルプ・紙・紙加工品製造業", "印刷・同関連業", "化学工業", "石油製品・石炭製品製造業",
+    "プラスチック製品製造業", "ゴム製品製造業", "窯業・土石製品製造業", "鉄鋼業", "非鉄金属製造業",
+    "金属製品製造業", "はん用機械器具製造業", "生産用機械器具製造業", "業務用機械器具製造業",
+    "電子部品・デバイス・電子回路製造業", "電気機械器具製造業", "情報通信機械器具製造業",
+    "輸送用機械器具製造業", "その他の製造業", "卸売業", "小売業", "情報通信業", "サービス業",
+]
+SUPPRESSED = ["X", "x", "-", "Ｘ", "ｘ", "***"]
+
+RESEARCH_BEFORE_2020 = [
+    ("研究開発", "企業数", None, None, "社"),
+    (None, "研究開発費", "計", None, "百万円"),
+    (None, None, "社内", None, "百万円"),
+    (None, None, "社外", None, "百万円"),
+    (None, None, "うち、関係会社への委託", None, "百万円"),
+    (None, None, None, None, "百万円"),
+    (None, "売上高研究開発費比率", None, None, "％"),
+    (None, "委託研究開発費（百万円）", None, None, None),
+    (None, None, "うち、関係会社からの受託", None, None),
+    (None, None, None, None, None),
+    (None, "受託研究費（百万円）", None, None, None),
+    ("研究開発投資", "計", None, None, "百万円"),
+    (None, "うち、ソフトウェア", None, None, "百万円"),
+    ("能力開発", "能力開発費", None, None, "百万円"),
+    (None, "うち、研修", None, None, "百万円"),
+]
+RESEARCH_AFTER_2020 = [
+    ("研究開発", "企業数", None, None, None, "社"),
+    ("研究開発", "研究開発費", "計", None, None, "百万円"),
+    ("研究開発", "研究開発費", "社内", None, None, "百万円"),
+    ("研究開発", "研究開発費", "社外", None, None, "百万円"),
+    ("研究開発", "売上高研究開発費比率", None, None, None, "％"),
+    ("研究開発", "受託研究費", None, None, None, "百万円"),
+    ("研究開発投資", "計", None, None, None, "百万円"),
+    ("能力開発", "能力開発費", None, None, None, "百万円"),
+]
+PATENT_BEFORE_2020 = [
+    ("企業数", None, None, None, None, "社"),
+    ("特許権", "件数", "所有数", None, None, None),
+    (None, None, "所有数", "使用のもの（含供与）", None, "件"),
+    (None, None, None, None, None, "件"),
+    ("実用新案権", "件数", "所有数", None, None, "件"),
+    (None, None, "使用のもの（含供与）", None, None, "件"),
+    (None, None, None, None, None, "件"),
+    (None, None, None, None, None, "件"),
+    ("意匠権", "件数", "所有数", None, None, "件"),
+    (None, None, "使用のもの（含供与）", None, None, "件"),
+    (None, None, None, None, None, "件"),
+    (None, None, None, None, None, "件"),
+]
+PATENT_AFTER_2020 = [
+    ("企業数", None, None, None, None, "社"),
+    ("特許権", "件数", "所有数", None, None, "件"),
+    ("特許権", "件数", "所有数", "使用のもの（含供与）", None, "件"),
+    ("実用新案権", "件数", "所有数", None, None, "件"),
+    ("実用新案権", "件数", "所有数", "使用のもの（含供与）", None, "件"),
+    ("意匠権", "件数", "所有数", None, None, "件"),
+    ("意匠権", "件数", "所有数", "使用のもの（含供与）", None, "件"),
+]
+
+def industries(n_rows):
+    """
+    Returns n_rows industry labels, padding the real ones with numbered labels.
+    """
+    names = list(INDUSTRIES)
+    i = 0
+    while len(names) < n_rows:
+        names.append(f"その他の産業{i}")
+        i += 1
+    return names[:n_rows]
+
+def value(rng):
+    """
+    Returns a random cell value, sometimes a suppression marker.
+    """
+    if rng.random() < 0.08:
+        return rng.choice(SUPPRESSED)
+    return rng.randint(1, 500000)
+
+def header_block(columns, label):
+    """
+    Turns per-column header tuples into header rows, with the industry label in column 0.
+    """
+    levels = len(columns[0])
+    return [[label if level == 0 else None] + [col[level] for col in columns] for level in range(levels)]
+
+def research_grid(year, n_rows, rng):
+    """
+    Returns the rows of one R&D expense sheet for a year.
+    """
+    if year >= 2020:
+        columns = RESEARCH_AFTER_2020
+        width = len(columns) + 4
+        grid = [[f"列{i}" for i in range(width)]]
+        for level, row in enumerate(header_block(columns, "産業分類")):
+            grid.append([None, "産業分類" if level == 0 else None, None, None] + row[1:])
+        grid += [["注"] + [None] * (width - 1) for _ in range(6)]
+        for j, name in enumerate(industries(n_rows)):
+            grid.append([f"{j:03d}", name, f"A{j}", f"B{j}"] + [value(rng) for _ in columns])
+        return grid
+    columns = list(RESEARCH_BEFORE_2020)
+    skip = 1 if year in (2011, 2012, 2013) else 2
+    width = len(columns) + 2
+    grid = [[f"第10表 {year}"] + [None] * (width - 1), [f"列{i}" for i in range(width)]]
+    grid[1][5] = None  # an empty column that dropna removes
+    grid += [["（単位）"] + [None] * (width - 1) for _ in range(skip)]
+    block = header_block(columns, "産業分類")
+    for row in block:
+        grid.append(row[:5] + [None] + row[5:])
+    grid += [["注"] + [None] * (width - 1) for _ in range(5)]
+    for name in industries(n_rows):
+        row = [name] + [value(rng) for _ in columns]
+        grid.append(row[:5] + [None] + row[5:])
+    return grid
+
+def patent_grid(year, n_rows, rng):
+    """
+    Returns the rows of one patent count sheet for a year.
+    """
+    if year >= 2020:
+        columns = PATENT_AFTER_2020
+        width = len(columns) + 4
+        grid = [[f"列{i}" for i in range(width)]]
+        for level, row in enumerate(header_block(columns, "産業分類")):
+            grid.append([None, "産業分類" if level == 0 else None, None, None] + row[1:])
+        grid += [["注"] + [None] * (width - 1) for _ in range(6)]
+        for j, name in enumerate(industries(n_rows)):
+            grid.append([f"{j:03d}", name, f"A{j}", f"B{j}"] + [value(rng) for _ in columns])
+        return grid
+    columns = PATENT_BEFORE_2020
+    lead = [] if 2011 <= year <= 2013 else ["番号"]
+    width = len(lead) + len(columns) + 1
+    grid = [[f"第11表 {year}"] + [None] * (width - 1), [f"列{i}" for i in range(width)]]
+    if year >= 2014:
+        grid += [["（単位）"] + [None] * (width - 1) for _ in range(2)]
+    for row in header_block(columns, "産業分類"):
+        grid.append([None] * len(lead) + row)
+    grid += [[None] * len(lead) + ["注"] + [None] * (width - len(lead) - 1) for _ in range(5)]
+    for j, name in enumerate(industries(n_rows)):
+        grid.append([j] * len(lead) + [name] + [value(rng) for _ in columns])
+    return grid
+
+def labor_grid(year, n_rows, rng, n_values=8):
+    """
+    Returns the rows of one labor number sheet for a year. Each industry has two fiscal-year rows.
+    """
+    value_headers = [f"{lo}％～{lo + 2}％" for lo in range(0, 2 * n_values, 2)]
+    if year >= 2020:
+        grid = [["表", None, None, None] + ["従業者数"] * n_values,
+                ["番号", "産業", "区分", "年度"] + value_headers]
+        grid += [["コード", "産業名", "区分", "年度"] + [f"h{i}" for i in range(n_values)]]
+        grid += [[None, None, None, None] + ["人"] * n_values for _ in range(2)]
+        for j, name in enumerate(industries(n_rows)):
+            grid.append([f"{j:03d}", name, "計", f"{year}年度"] + [value(rng) for _ in range(n_values)])
+        return grid
+    code_col = year in (2003, 2006, 2007, 2008)
+    lead = ["産業", "年度"] + (["コード"] if code_col else [])
+    width = len(lead) + n_values
+    grid = [["第3表"] + [None] * (width - 1), ["区分"] + [None] * (len(lead) - 1) + value_headers]
+    if year in (2004, 2005):
+        grid += [["注"] + [None] * (width - 1)]
+        grid += [[f"h{level}"] * 2 + [f"{v}_{level}" for v in value_headers] for level in range(4)]
+        for name in industries(n_rows):
+            grid.append([name] + [None] * (width - 1))
+            for y in (year - 1, year):
+                grid.append([f" {y}年度 "] + [None] + [value(rng) for _ in range(n_values)])
+        return [row[:width] for row in grid]
+    if year == 2007:
+        n_header, offset = 3, 1
+    elif year in (2009, 2011, 2012, 2013):
+        n_header, offset = 3, 0
+    else:
+        n_header, offset = 3, 2
+    grid += [["注"] + [None] * (width - 1) for _ in range(offset)]
+    grid += [[f"h{level}"] * len(lead) + [f"{v}_{level}" for v in value_headers] for level in range(n_header)]
+    for name in industries(n_rows):
+        for k, y in enumerate((year - 1, year)):
+            grid.append([name if k == 0 else None, f" {y}年度 "] + (["C"] if code_col else [])
+                        + [value(rng) for _ in range(n_values)])
+    grid.append([None] * width)
+    return grid
+
+def write_workbook(path, sheets):
+    """
+    Writes {sheet name: rows} to a workbook. The format follows the file extension.
+    """
+    if path.endswith(".xls"):
+        import xlwt
+
+        wb = xlwt.Workbook()
+        for name, grid in sheets.items():
+            ws = wb.add_sheet(name)
+            for r, row in enumerate(grid):
+                for c, cell in enumerate(row):
+                    if cell is not None:
+                        ws.write(r, c, cell)
+        wb.save(path)
+        return
+
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    for name, grid in sheets.items():
+        ws = wb.create_sheet(title=name)
+        for row in grid:
+            ws.append(row)
+    wb.save(path)
+
+def generate(download_dir, years, n_rows=40, n_sheets=1, ext=".xlsx", tables=("research", "patent", "labor"), seed=0):
+    """
+    Writes one workbook per table and year into download_dir, named like the scraper names them.
+
+    Args:
+        download_dir (str): The output directory.
+        years (list): The survey years to generate.
+        n_rows (int): Number of industry rows per sheet.
+        n_sheets (int): Number of sheets per workbook.
+        ext (str): ".xlsx" or ".xls".
+        tables (tuple): Which of "research", "patent" and "labor" to generate.
+        seed (int): Seed for the cell values.
+
+    Returns:
+        list: The paths of the written files.
+    """
+    builders = {
+        "research": (RESEARCH_TABLE, research_grid),
+        "patent": (PATENT_TABLE, patent_grid),
+        "labor": (LABOR_TABLE, labor_grid),
+    }
+    os.makedirs(download_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for year in years:
+        for table in tables:
+            table_name, builder = builders[table]
+            path = os.path.join(download_dir, f"{table_name}_{year}_{1700000000 + year}{ext}")
+            write_workbook(path, {f"Sheet{i + 1}": builder(year, n_rows, rng) for i in range(n_sheets)})
+            paths.append(path)
+    return paths
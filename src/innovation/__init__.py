@@ -0,0 +1,36 @@
+"""
+Scrapes, cleans and plots the e-Stat tables of the Basic Survey of Japanese
+Business Structure and Activities (labor, R&D expense and patent counts).
+
+    scrape   listing pages and downloads (requests)
+    clean    workbooks, layouts, cleaners and panels (pandas)
+    plot     charts (matplotlib)
+
+Nothing is imported until it is used: `from innovation import DataScraper`
+loads the scraping code only, and importing the package has no effect on disk.
+"""
+from .lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".config": (
+        "DOWNLOAD_DIR", "SPILL_THRESHOLD", "SURVEY_YEARS", "TABLE_ATTRIBUTES", "TABLE_OUTPUT_DIRS", "TABLE_TARGETS",
+        "listing_urls", "table_for_name",
+    ),
+    ".report": ("RUN_REPORT", "RunReport", "peak_rss_mb", "summarize_report"),
+    ".tasks": ("run_tasks",),
+    ".pipeline": ("Pipeline", "Stage"),
+    ".scrape.listing": ("ExcelLinkParser", "listing_key", "url_extension"),
+    ".scrape.manifest": ("DownloadManifest", "canonical_files"),
+    ".scrape.scraper": ("DataScraper", "RateLimiter"),
+    ".clean.cache": ("FrameCache", "file_sha256", "source_version"),
+    ".clean.cleaners": ("LAYOUT_ENGINE", "BaseCleaner", "DataCleaner", "PatentCountCleaner", "ResearchExpenseCleaner"),
+    ".clean.export": ("EXPORT_FORMATS", "TableExporter", "read_exported"),
+    ".clean.industry": ("IndustryNames", "canonicalize_industries"),
+    ".clean.layout": ("LAYOUT_REGISTRY", "HeaderSpec", "SheetLayout", "apply_layout", "get_layout"),
+    ".clean.metrics": ("DERIVED_METRICS", "DerivedMetric", "MetricsEngine", "compute_metrics"),
+    ".clean.normalize": ("normalize_frame", "report_memory"),
+    ".clean.panel": ("PanelStore", "build_panel", "canonical_metric"),
+    ".clean.query": ("DataQuery",),
+    ".clean.workbook": ("WorkbookReader", "close_workbooks", "open_workbook"),
+    ".plot.charts": ("CHART_SPECS", "ChartSpec", "render_charts"),
+})
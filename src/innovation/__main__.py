@@ -0,0 +1,7 @@
+"""
+`python -m innovation`: see innovation.cli.
+"""
+from .cli import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Cleaning the downloaded workbooks into typed frames and long-format panels.
+"""
+from ..lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".cache": ("CLEANER_VERSION", "FRAME_CACHE_DIRNAME", "FrameCache", "file_sha256", "source_version"),
+    ".cleaners": ("LAYOUT_ENGINE", "BaseCleaner", "DataCleaner", "PatentCountCleaner", "ResearchExpenseCleaner"),
+    ".export": (
+        "EXPORT_FORMATS", "SCHEMA_FILENAME", "ExportFormat", "TableExporter", "read_exported", "read_schema",
+        "unique_names", "write_batches",
+    ),
+    ".layout": (
+        "LAYOUT_REGISTRY", "HeaderSpec", "SheetLayout", "apply_layout", "apply_rows", "build_header", "column_names",
+        "fill_merged_spans", "get_layout", "join_header_levels",
+    ),
+    ".industry": (
+        "INDUSTRY_ALIASES", "INDUSTRY_LABELS_FILENAME", "IndustryLabelStore", "IndustryNames", "canonicalize_industries",
+        "frame_labels", "industry_key", "industry_label",
+    ),
+    ".metrics": (
+        "DERIVED_DIR", "DERIVED_METRICS", "DerivedMetric", "MetricsEngine", "compute_metrics", "lagged", "lookback",
+    ),
+    ".normalize": (
+        "ID_COLUMNS", "SUPPRESSION_MARKERS", "compact_numeric", "normalize_frame", "parse_values", "report_memory",
+    ),
+    ".panel": (
+        "METRIC_ALIASES", "PANEL_DIR", "PanelStore", "build_panel", "canonical_metric", "normalize_header", "wide_panel",
+    ),
+    ".query": ("TOTAL_INDUSTRIES", "DataQuery"),
+    ".stream": ("NA_STRINGS", "SheetStream", "sheet_rows"),
+    ".workbook": ("OPEN_WORKBOOKS", "WorkbookReader", "close_workbooks", "open_workbook"),
+})
@@ -0,0 +1,97 @@
+"""
+The on-disk cache of cleaned frames.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+
+import pandas as pd
+
+# Bump this when a change outside the cleaner classes alters the cleaned output
+CLEANER_VERSION = 1
+# Cleaned frames are cached here, next to the downloads
+FRAME_CACHE_DIRNAME = ".frame_cache"
+
+def file_sha256(path: str) -> str:
+    """
+    Returns the SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def source_version(*objs) -> str:
+    """
+    Returns a short hash of the source code of the given classes or functions.
+    Editing a cleaning rule changes the hash and so invalidates the frame cache.
+    Memoized per process: inspect.getsource re-reads and parses the module on every call.
+    """
+    digest = hashlib.sha256(str(CLEANER_VERSION).encode())
+    for obj in objs:
+        digest.update(inspect.getsource(obj).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+class FrameCache:
+    """
+    Stores cleaned DataFrames on disk, keyed by the source file hash and the cleaner version.
+
+    Frames are written as Parquet when pyarrow is installed and the frame survives
+    the round trip unchanged. Otherwise (e.g. mixed-type object columns) they are pickled.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, source, version: str, *parts) -> str:
+        """
+        Builds the cache key of a cleaned frame.
+
+        Args:
+            source (str | bytes): The Excel file the frame is cleaned from, or its content.
+            version (str): The version of the cleaner code.
+            *parts: Extra values the cleaned output depends on (year, sheet, ...).
+
+        Returns:
+            str: The cache key.
+        """
+        content_hash = file_sha256(source) if isinstance(source, str) else hashlib.sha256(source).hexdigest()
+        digest = hashlib.sha256(content_hash.encode())
+        digest.update(version.encode())
+        for part in parts:
+            digest.update(f"|{part}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self, key: str):
+        """
+        Returns the cached frame for a key, or None on a cache miss.
+        """
+        parquet_path = os.path.join(self.cache_dir, f"{key}.parquet")
+        pickle_path = os.path.join(self.cache_dir, f"{key}.pkl")
+        try:
+            if os.path.exists(parquet_path):
+                return pd.read_parquet(parquet_path)
+            if os.path.exists(pickle_path):
+                return pd.read_pickle(pickle_path)
+        except Exception as e:
+            print(f"Error reading cached frame {key}: {e}. Cleaning again.")
+        return None
+
+    def store(self, key: str, df: pd.DataFrame):
+        """
+        Writes a cleaned frame to the cache.
+        """
+        parquet_path = os.path.join(self.cache_dir, f"{key}.parquet")
+        try:
+            df.to_parquet(parquet_path)
+            if pd.read_parquet(parquet_path).equals(df):
+                return
+            os.remove(parquet_path)
+        except Exception:
+            if os.path.exists(parquet_path):
+                os.remove(parquet_path)
+        df.to_pickle(os.path.join(self.cache_dir, f"{key}.pkl"), protocol=pickle.HIGHEST_PROTOCOL)
@@ -0,0 +1,622 @@
+"""
+The table cleaners.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from ..config import EXPORT_FORMAT, STREAM_BATCH_ROWS, TABLE_ATTRIBUTES, TABLE_TARGETS, table_for_name
+from ..report import RUN_REPORT
+from ..scrape.manifest import canonical_files
+from ..tasks import run_tasks
+from .cache import FRAME_CACHE_DIRNAME, FrameCache, source_version
+from .export import TableExporter
+from .industry import IndustryLabelStore, IndustryNames, canonicalize_industries, frame_labels
+from .layout import (
+    HeaderSpec, SheetLayout, apply_layout, apply_rows, build_header, column_names, fill_merged_spans, get_layout,
+    join_header_levels,
+)
+from .metrics import MetricsEngine
+from .normalize import compact_numeric, normalize_frame, parse_values, report_memory
+from .panel import PanelStore, build_panel
+from .stream import SheetStream, sheet_rows
+from .workbook import WorkbookReader, close_workbooks, open_workbook
+
+# Code that decides how a sheet is cleaned, part of the frame cache key
+LAYOUT_ENGINE = (
+    HeaderSpec, SheetLayout, fill_merged_spans, join_header_levels, build_header, apply_layout, column_names,
+    apply_rows, compact_numeric, parse_values, normalize_frame,
+)
+
+def other_year_labels(download_dir, table: str, files: dict, labels: dict, labels_of) -> dict:
+    """
+    Records the industry labels of the years a run cleans and returns those of the
+    table's other available years, so that canonical names do not depend on which
+    years a run cleans. Years whose labels were never recorded are read with
+    labels_of (through the frame cache where there is one).
+
+    Args:
+        download_dir (str): Where the industry label store is kept.
+        table (str): The table name.
+        files (dict): {year: file name} of every available year of the table.
+        labels (dict): {year: labels} of the years this run cleans.
+        labels_of (callable): Reads {year: file name} into {year: labels}.
+
+    Returns:
+        dict: {year (str): labels} of the available years that are not in labels.
+    """
+    store = IndustryLabelStore(download_dir)
+    store.record(table, labels, files)
+    recorded = store.labels(table, files)
+    missing = {year: file_path for year, file_path in files.items() if str(year) not in recorded}
+    if missing:
+        store.record(table, labels_of(missing), files)
+        recorded = store.labels(table, files)
+    cleaned = {str(year) for year in labels}
+    return {year: year_labels for year, year_labels in recorded.items() if year not in cleaned}
+
+class BaseCleaner:
+    """
+    A base class for cleaning data.
+
+    Subclasses name their table in LAYOUT_REGISTRY; the year-specific
+    layouts there decide how each file is cleaned.
+    """
+    table = None
+
+    def __init__(self, download_dir, use_cache=True, max_workers=1):
+        self.download_dir = download_dir
+        self.frame_cache = FrameCache(os.path.join(download_dir, FRAME_CACHE_DIRNAME)) if use_cache else None
+        self.max_workers = max_workers
+        self.errors = []
+
+    def cache_version(self) -> str:
+        """
+        Returns the version of this cleaner's code, used in the frame cache key.
+        """
+        return source_version(BaseCleaner, type(self), *LAYOUT_ENGINE)
+
+    def clean_data(self, target_str: str, years=None):
+        """
+        Cleans one file per year of the table whose name contains target_str.
+
+        Args:
+            target_str (str): A part of the table name.
+            years (list): Only clean these years. None cleans every year found.
+
+        Returns:
+            dict: A mapping of year to the cleaned DataFrame.
+        """
+        files = canonical_files(self.download_dir, target_str)
+        tasks = [(file_path, year) for year, file_path in files.items() if years is None or year in years]
+        results, self.errors = run_tasks(self.clean_file, tasks, self.max_workers)
+        close_workbooks({os.path.join(self.download_dir, file_path) for file_path, _ in tasks})
+        frames = {year: df for (file_path, year), df in results}
+        others = other_year_labels(
+            self.download_dir, self.table, files, {year: frame_labels(df) for year, df in frames.items()},
+            lambda missing: {year: frame_labels(df) for year, df in self.clean_files(missing).items()},
+        )
+        df_dict = canonicalize_industries(frames, labels_by_year=others)
+        report_memory(self.table, df_dict)
+        return df_dict
+
+    def clean_files(self, files: dict) -> dict:
+        """
+        Cleans some files of the table, {year: file name} -> {year: cleaned DataFrame}.
+        """
+        tasks = [(file_path, year) for year, file_path in files.items()]
+        results, _ = run_tasks(self.clean_file, tasks, self.max_workers)
+        close_workbooks({os.path.join(self.download_dir, file_path) for file_path, _ in tasks})
+        return {year: df for (_, year), df in results}
+
+    def clean_file(self, filename, year):
+        """
+        Cleans one file, loading the result from the frame cache when the file
+        and the cleaner code are unchanged.
+        """
+        return self.clean_source(os.path.join(self.download_dir, filename), year)
+
+    def clean_source(self, source, year, ext=None):
+        """
+        Cleans one workbook given as a path or as the bytes of the file.
+
+        Args:
+            source (str | bytes): The workbook path or content.
+            year (int): The survey year.
+            ext (str): The file extension when source is bytes (".xls", ".xlsx").
+
+        Returns:
+            pd.DataFrame: The cleaned frame, the same for a path and for its bytes.
+        """
+        layout = get_layout(self.table, year)
+        with RUN_REPORT.measure("clean", table=self.table, year=year) as metrics:
+            key = None
+            if self.frame_cache is not None:
+                key = self.frame_cache.key(source, self.cache_version(), year, layout)
+                df = self.frame_cache.load(key)
+                if df is not None:
+                    metrics.update(cache="hit", rows_out=df.shape[0], cols_out=df.shape[1])
+                    return df
+            metrics["cache"] = "miss" if key is not None else None
+
+            if isinstance(source, str):
+                df = open_workbook(source).read(header=layout.read_header)
+            else:
+                with WorkbookReader(source, ext) as reader:
+                    df = reader.read(header=layout.read_header)
+            metrics.update(rows_in=df.shape[0], cols_in=df.shape[1])
+            df = normalize_frame(apply_layout(df, layout))
+            metrics.update(rows_out=df.shape[0], cols_out=df.shape[1])
+
+            if key is not None:
+                self.frame_cache.store(key, df)
+            return df
+
+class ResearchExpenseCleaner(BaseCleaner):
+    """
+    A class to clean and process research expense data.
+    """
+    table = "research_expense"
+
+    def __init__(self, download_dir, use_cache=True, max_workers=1):
+        super().__init__(download_dir, use_cache, max_workers)
+
+class PatentCountCleaner(BaseCleaner):
+    """
+    A class to clean and process patent count data.
+    """
+    table = "patent_count"
+
+    def __init__(self, download_dir, use_cache=True, max_workers=1):
+        super().__init__(download_dir, use_cache, max_workers)
+
+class DataCleaner:
+    """
+    A class to clean and process downloaded EXCEL files.
+    """
+    def __init__(self, download_dir, font_path='/Library/Fonts/Arial Unicode.ttf', use_cache=True, max_workers=1,
+                 export_format=EXPORT_FORMAT):
+        self.download_dir = download_dir
+        self.font_path = font_path # visualization use
+        self.max_workers = max_workers
+        self.export_format = export_format
+        self.research_expense_cleaner = ResearchExpenseCleaner(download_dir, use_cache, max_workers)
+        self.patent_count_cleaner = PatentCountCleaner(download_dir, use_cache, max_workers)
+        self.frame_cache = FrameCache(os.path.join(download_dir, FRAME_CACHE_DIRNAME)) if use_cache else None
+        self.errors = []
+
+    def sanitize_filename(self, text: str) -> str:
+        """
+        Turns arbitrary text into a safe filename.
+
+        Args:
+            text (str): The text to sanitize.
+
+        Returns:
+            str: A safe filename.
+        """
+        name = re.sub(r"\s+", " ", text.strip())
+        return re.sub(r'[\\/:"*?<>|]+', "_", name)
+
+    def clean_all_data(self):
+        """
+        Clean all data from the downloaded files.
+        """
+        # Cleans each table, then writes the files of all tables at once
+        for table in TABLE_TARGETS:
+            self.load_table(table)
+        self.save_tables(TABLE_TARGETS)
+        self.save_panels()
+
+    def clean_table(self, table: str, years=None) -> dict:
+        """
+        Clean one table (optionally only some years) and save it to files in the export format.
+        """
+        frames = self.load_table(table, years)
+        self.save_tables([table])
+        return frames
+
+    def load_table(self, table: str, years=None) -> dict:
+        """
+        Clean one table without writing its files. Unchanged files come from the frame cache.
+
+        Args:
+            table (str): A key of TABLE_TARGETS.
+            years (list): Only clean these years. None cleans every year found.
+
+        Returns:
+            dict: A mapping of year to the cleaned DataFrame.
+        """
+        with RUN_REPORT.measure("clean_table", table=table, years=years) as metrics:
+            if table == "labor_number":
+                frames = self.labor_number_frames(years)
+                errors = self.errors
+            else:
+                cleaner = {
+                    "research_expense": self.research_expense_cleaner,
+                    "patent_count": self.patent_count_cleaner,
+                }[table]
+                frames = cleaner.clean_data(target_str=TABLE_TARGETS[table], years=years)
+                errors = cleaner.errors
+            metrics.update(frames=len(frames), failed_tasks=len(errors))
+        setattr(self, TABLE_ATTRIBUTES[table], frames)
+        return frames
+
+    def exporter(self, fmt=None) -> TableExporter:
+        """
+        Returns a TableExporter for fmt, by default the cleaner's export format.
+        """
+        return TableExporter(fmt or self.export_format, self.max_workers)
+
+    def save_tables(self, tables, fmt=None) -> dict:
+        """
+        Save the cleaned frames of some tables to {TABLE_OUTPUT_DIRS[table]}/{year}.{fmt},
+        with a schema file per table. The files are written concurrently (max_workers threads).
+
+        Args:
+            tables (iterable): Keys of TABLE_TARGETS.
+            fmt (str): A key of EXPORT_FORMATS. Defaults to the cleaner's export format.
+
+        Returns:
+            dict: {table: {year: written file}}.
+        """
+        fmt = fmt or self.export_format
+        with RUN_REPORT.measure("export", tables=list(tables), format=fmt) as metrics:
+            paths = self.exporter(fmt).write_tables({table: getattr(self, TABLE_ATTRIBUTES[table]) for table in tables})
+            metrics["files"] = sum(len(table_paths) for table_paths in paths.values())
+        return paths
+
+    def save_table_csv(self, table: str):
+        """
+        Save the cleaned frames of a table to {TABLE_OUTPUT_DIRS[table]}/{year}.csv.
+        """
+        self.save_tables([table], "csv")
+
+    def stream_table(self, table: str, years=None, fmt=None, batch_size=STREAM_BATCH_ROWS) -> dict:
+        """
+        Clean one table in streaming mode and write it to {TABLE_OUTPUT_DIRS[table]}/{year}.{fmt}.
+
+        Each workbook is read row by row and its cleaned rows go to the writer in
+        batches of batch_size rows, so memory is bounded by the batch size, not by
+        the size of the sheets. The rows and values are the ones save_tables
+        writes. The frames are not kept and the frame cache is not used.
+
+        Args:
+            table (str): A key of TABLE_TARGETS.
+            years (list): Only clean these years. None cleans every year found.
+            fmt (str): A key of EXPORT_FORMATS. Defaults to the cleaner's export format.
+            batch_size (int): Data rows per batch.
+
+        Returns:
+            dict: A mapping of year to the written file.
+        """
+        files = canonical_files(self.download_dir, TABLE_TARGETS[table])
+        streams = self.profile_streams(table, {
+            year: file_path for year, file_path in files.items() if years is None or year in years
+        }, batch_size)
+
+        # Industry names are made canonical across the years before any rows are written
+        labels = {str(year): list(stream.labels) for year, stream in streams.items()}
+        others = other_year_labels(
+            self.download_dir, table, files, labels,
+            lambda missing: {
+                year: list(stream.labels) for year, stream in self.profile_streams(table, missing, batch_size).items()
+            },
+        )
+        names = IndustryNames()
+        names.build({**others, **labels})
+        exporter = self.exporter(fmt)
+        os.makedirs(exporter.output_dirs[table], exist_ok=True)
+        entries = {}
+        for year, stream in streams.items():
+            with RUN_REPORT.measure("stream_clean", table=table, year=year) as metrics:
+                batches = (
+                    batch.assign(産業=names.apply(batch["産業"])) if "産業" in batch.columns else batch
+                    for batch in stream.batches()
+                )
+                entries[str(year)] = exporter.write_batches(table, year, batches)
+                metrics["rows_out"] = entries[str(year)]["rows"]
+        exporter.write_schema(table, entries)
+        return {year: exporter.path(table, year) for year in entries}
+
+    def profile_streams(self, table: str, files: dict, batch_size=STREAM_BATCH_ROWS) -> dict:
+        """
+        Returns the profiled SheetStreams of some workbooks of a table, {year: SheetStream}.
+        """
+        streams = {}
+        for year, file_path in files.items():
+            full_path = os.path.join(self.download_dir, file_path)
+            with RUN_REPORT.measure("stream_profile", table=table, year=year) as metrics:
+                stream = self.sheet_stream(table, full_path, year, batch_size)
+                if stream is None:
+                    metrics["error"] = "no readable sheet"
+                    continue
+            streams[year] = stream
+        return streams
+
+    def sheet_stream(self, table: str, full_path: str, year: int, batch_size=STREAM_BATCH_ROWS):
+        """
+        Returns the profiled SheetStream of a workbook, or None if no sheet can be read.
+        Like labor_number_frames, the last readable sheet of a labor number workbook is used.
+        """
+        layout = get_layout(table, int(year))
+        try:
+            with WorkbookReader(full_path) as reader:
+                sheets = reader.sheet_names[::-1] if table == "labor_number" else [0]
+        except Exception as e:
+            print(f"Error opening Excel file {full_path}: {e}. Skipping.")
+            return None
+        for sheet in sheets:
+            stream = SheetStream(sheet_rows(full_path, sheet), layout, batch_size)
+            try:
+                stream.profile()
+                return stream
+            except Exception as e:
+                print(f"Error reading sheet {sheet} from {full_path}: {e}. Skipping sheet.")
+        return None
+
+    def clean_sources(self, downloads) -> dict:
+        """
+        Clean downloaded workbooks handed over directly, without listing the download directory.
+
+        Each workbook goes to the cleaner of its table as soon as it arrives, in a
+        process pool when max_workers > 1. The frames are the same as the ones
+        cleaned from the saved files.
+
+        Args:
+            downloads (iterable): (table_name, year, source, ext) tuples. source is the
+                bytes of the file, or its path if it was saved to disk.
+
+        Returns:
+            dict: {table: {year: cleaned DataFrame}}. The table attributes are set too.
+        """
+        cleaners = {"research_expense": self.research_expense_cleaner, "patent_count": self.patent_count_cleaner}
+        pool = ProcessPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else None
+        pending = []
+        try:
+            for table_name, year, source, ext in downloads:
+                table = table_for_name(table_name)
+                if table is None or source is None or not year:
+                    continue
+                if table == "labor_number":
+                    func, args, key = self.clean_labor_source, (source, year, ext), str(year)
+                else:
+                    func, args, key = cleaners[table].clean_source, (source, int(year), ext), int(year)
+                if pool is not None:
+                    pending.append((table, key, pool.submit(func, *args)))
+                    continue
+                try:
+                    pending.append((table, key, func(*args)))
+                except Exception as e:
+                    print(f"Error cleaning {table_name} ({year}): {e!r}. Skipping.")
+
+            frames = {table: {} for table in TABLE_TARGETS}
+            for table, key, result in pending:
+                try:
+                    df = result.result() if pool is not None else result
+                except Exception as e:
+                    print(f"Error cleaning {table} ({key}): {e!r}. Skipping.")
+                    continue
+                if df is not None:
+                    frames[table][key] = df
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        store = IndustryLabelStore(self.download_dir)
+        for table in TABLE_TARGETS:
+            # Downloads kept in memory have no file name: the labels of the other years are taken as recorded
+            store.record(table, {year: frame_labels(df) for year, df in frames[table].items()})
+            cleaned = {str(year) for year in frames[table]}
+            others = {year: labels for year, labels in store.labels(table).items() if year not in cleaned}
+            frames[table] = canonicalize_industries(dict(sorted(frames[table].items())), labels_by_year=others)
+            setattr(self, TABLE_ATTRIBUTES[table], frames[table])
+            report_memory(table, frames[table])
+        return frames
+
+    def query(self):
+        """
+        Returns a DataQuery over the tables cleaned so far.
+        """
+        from .query import DataQuery
+
+        return DataQuery.from_cleaner(self)
+
+    def save_panels(self, store=None, engine=None, years=None):
+        """
+        Save the cleaned tables as long-format panels (year, industry, metric, value),
+        and bring their derived metrics up to date (see MetricsEngine).
+
+        Args:
+            store (PanelStore): Where the panels go. Defaults to PANEL_DIR.
+            engine (MetricsEngine): The derived metrics cache. Defaults to DERIVED_DIR.
+            years (list): The survey years that were cleaned, if not all of them.
+        """
+        store = store or PanelStore()
+        engine = engine or MetricsEngine()
+        tables = {
+            "research_expense": self.ResearchExpenseDict,
+            "patent_count": self.PatentCountDict,
+            "labor_number": self.LaborNumberDict,
+        }
+        for table, frames in tables.items():
+            if frames:
+                panel = build_panel(table, frames)
+                store.write(table, panel)
+                engine.update(table, store.read(table) if years else panel, years)
+
+    def output_visualization(self, year=2020):
+        """
+        Output visualization of the cleaned data.
+        """
+        return self.render_charts(years=[year])
+
+    def render_charts(self, years=None, specs=None, out_dir=None, force=False):
+        """
+        Render the charts of several years at once. See innovation.plot.charts.render_charts;
+        specs and out_dir default to CHART_SPECS and PLOT_DIR.
+        """
+        # Imported here so that cleaning does not load the plotting code
+        from ..plot.charts import CHART_SPECS, PLOT_DIR, render_charts
+
+        frames = {"research_expense": self.ResearchExpenseDict, "patent_count": self.PatentCountDict}
+        return render_charts(frames, years, specs or CHART_SPECS, out_dir or PLOT_DIR, self.font_path,
+                             self.max_workers, force)
+
+    def clean_labor_number_data(self, years=None):
+        """
+        Clean the labor number data from Excel files.
+        """
+        self.LaborNumberDict = self.labor_number_frames(years)
+        self.save_tables(["labor_number"])
+
+    def labor_number_frames(self, years=None) -> dict:
+        """
+        Clean the labor number workbooks, one per year.
+
+        Returns:
+            dict: A mapping of year (str) to the cleaned DataFrame.
+        """
+        # 1. Get the list of files in the directory
+        files = canonical_files(self.download_dir, TABLE_TARGETS["labor_number"])
+        filepaths = {year: file_path for year, file_path in files.items() if years is None or year in years}
+        dfs = self.labor_sheet_frames(filepaths)
+
+        others = other_year_labels(
+            self.download_dir, "labor_number", files, {year: frame_labels(df) for year, df in dfs.items()},
+            lambda missing: {year: frame_labels(df) for year, df in self.labor_sheet_frames(missing).items()},
+        )
+        dfs = canonicalize_industries({f"{year}": dfs[f"{year}"] for year in filepaths if f"{year}" in dfs},
+                                      labels_by_year=others)
+
+        report_memory("labor_number", dfs)
+        return dfs
+
+    def labor_sheet_frames(self, filepaths: dict) -> dict:
+        """
+        Cleans the labor number workbooks without canonicalizing their industry names.
+
+        Args:
+            filepaths (dict): {year: file name} of the workbooks to clean.
+
+        Returns:
+            dict: A mapping of year (str) to the cleaned DataFrame.
+        """
+        dfs = {}
+        # 2. Open the workbook and list sheets
+        # 3. Read and clean each sheet into a DataFrame
+        cache_keys = {}
+        tasks = []
+        opened = set()
+        for year, file_path in filepaths.items():
+            year = str(year)
+            full_path = os.path.join(self.download_dir, file_path)
+            if self.frame_cache is not None:
+                cache_keys[year] = self.labor_cache_key(full_path, year)
+                df = self.frame_cache.load(cache_keys[year])
+                if df is not None:
+                    RUN_REPORT.record("clean", table="labor_number", year=year, cache="hit",
+                                      rows_out=df.shape[0], cols_out=df.shape[1])
+                    dfs[year] = df
+                    continue
+            # 2. Open the workbook and list sheets
+            sheet_names = self.list_sheets(full_path)
+            opened.add(full_path)
+            tasks.extend((full_path, sheet, year) for sheet in sheet_names)
+
+        # 3. Read and clean each sheet into a DataFrame, one task per (file, sheet)
+        results, self.errors = run_tasks(self.clean_labor_sheet, tasks, self.max_workers)
+        close_workbooks(opened)
+        cleaned = {}
+        for (full_path, sheet, year), df in results:
+            if df is not None:
+                cleaned[year] = df  # The last readable sheet of a workbook wins
+        for year, df in cleaned.items():
+            RUN_REPORT.record("clean", table="labor_number", year=year, cache="miss" if year in cache_keys else None,
+                              rows_out=df.shape[0], cols_out=df.shape[1])
+            if year in cache_keys:
+                self.frame_cache.store(cache_keys[year], df)
+        dfs.update(cleaned)
+        return dfs
+
+    def list_sheets(self, full_path):
+        """
+        List the sheet names of a workbook.
+
+        Returns:
+            list: The sheet names, or an empty list if the workbook cannot be opened.
+        """
+        try:
+            sheet_names = open_workbook(full_path).sheet_names
+        except Exception as e:
+            print(f"Error opening Excel file {full_path}: {e}. Skipping.")
+            return []
+
+        print("Available sheets:", sheet_names)
+        return sheet_names
+
+    def labor_cache_key(self, source, year) -> str:
+        """
+        Returns the frame cache key of a labor number workbook (a path or its bytes).
+        """
+        layout = get_layout("labor_number", int(year))
+        return self.frame_cache.key(source, source_version(DataCleaner, *LAYOUT_ENGINE), "labor", str(year), layout)
+
+    def clean_labor_sheet(self, full_path, sheet, year, reader=None):
+        """
+        Read and clean one sheet of a labor number workbook.
+
+        Returns:
+            pd.DataFrame: The cleaned sheet, or None if it could not be read.
+        """
+        layout = get_layout("labor_number", int(year))
+        with RUN_REPORT.measure("clean_sheet", table="labor_number", year=year, sheet=sheet) as metrics:
+            try:
+                reader = reader or open_workbook(full_path)
+                df = reader.read(sheet, header=layout.read_header, skiprows=0)
+            except Exception as e:
+                print(f"Error reading sheet {sheet} from {full_path}: {e}. Skipping sheet.")
+                metrics["error"] = repr(e)
+                return None
+            metrics.update(rows_in=df.shape[0], cols_in=df.shape[1])
+            df = normalize_frame(apply_layout(df, layout))
+            metrics.update(rows_out=df.shape[0], cols_out=df.shape[1])
+            return df
+
+    def clean_labor_source(self, source, year, ext=None):
+        """
+        Clean a labor number workbook given as a path or as the bytes of the file.
+        Like labor_number_frames, the last readable sheet wins.
+
+        Returns:
+            pd.DataFrame: The cleaned frame, or None if no sheet could be read.
+        """
+        key = self.labor_cache_key(source, year) if self.frame_cache is not None else None
+        if key is not None:
+            df = self.frame_cache.load(key)
+            if df is not None:
+                RUN_REPORT.record("clean", table="labor_number", year=year, cache="hit",
+                                  rows_out=df.shape[0], cols_out=df.shape[1])
+                return df
+
+        reader = open_workbook(source) if isinstance(source, str) else WorkbookReader(source, ext)
+        try:
+            sheet_names = reader.sheet_names
+        except Exception as e:
+            print(f"Error opening Excel file {reader.path}: {e}. Skipping.")
+            return None
+        print("Available sheets:", sheet_names)
+        df = None
+        for sheet in sheet_names:
+            cleaned = self.clean_labor_sheet(reader.path, sheet, year, reader)
+            if cleaned is not None:
+                df = cleaned
+        if not isinstance(source, str):
+            reader.close()
+
+        if df is not None:
+            RUN_REPORT.record("clean", table="labor_number", year=year, cache="miss" if key is not None else None,
+                              rows_out=df.shape[0], cols_out=df.shape[1])
+        if key is not None and df is not None:
+            self.frame_cache.store(key, df)
+        return df
@@ -0,0 +1,271 @@
+"""
+Exporting the cleaned tables: one CSV, Parquet or Feather (Arrow IPC) file per
+year, and a schema file with the columns and dtypes of each file.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from ..config import EXPORT_FORMAT, PARQUET_COMPRESSION, PARQUET_ROW_GROUP_ROWS, TABLE_OUTPUT_DIRS
+
+# The columns and dtypes of a table's files, written next to them
+SCHEMA_FILENAME = "schema.json"
+
+def unique_names(names) -> list:
+    """
+    Numbers repeated column names the way pd.read_csv does: name, name.1, name.2, ...
+    """
+    seen, unique = {}, []
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        unique.append(f"{name}.{count}" if count else name)
+    return unique
+
+def arrow_table(batch: pd.DataFrame):
+    """
+    Converts a frame to an Arrow table. Arrow column names have to be unique, so
+    repeated names are numbered; the schema file keeps the original names.
+    """
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(batch.set_axis(unique_names(batch.columns), axis=1), preserve_index=True)
+
+def write_csv(batches, path: str) -> int:
+    n_rows = 0
+    for batch in batches:
+        batch.to_csv(path, index=True, mode="a" if n_rows else "w", header=not n_rows)
+        n_rows += len(batch)
+    return n_rows
+
+def write_parquet(batches, path: str, compression=PARQUET_COMPRESSION, row_group_size=PARQUET_ROW_GROUP_ROWS) -> int:
+    import pyarrow.parquet as pq
+
+    writer, n_rows = None, 0
+    try:
+        for batch in batches:
+            table = arrow_table(batch)
+            writer = writer or pq.ParquetWriter(path, table.schema, compression=compression)
+            writer.write_table(table, row_group_size=row_group_size)
+            n_rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+def write_feather(batches, path: str, compression=None) -> int:
+    import pyarrow as pa
+
+    writer, n_rows = None, 0
+    try:
+        for batch in batches:
+            table = arrow_table(batch)
+            writer = writer or pa.ipc.new_file(path, table.schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+            writer.write_table(table)
+            n_rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+def read_csv(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, index_col=0)
+
+def read_parquet(path: str) -> pd.DataFrame:
+    return pd.read_parquet(path, memory_map=True)
+
+def read_feather(path: str) -> pd.DataFrame:
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas()
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """
+    A file format of the exported tables.
+
+    `write(batches, path, **options)` writes the batches of one table-year to
+    path as they come and returns the number of rows; `read(path)` reads the file
+    back into one frame. `options` are the defaults of the writer's options.
+    """
+    name: str
+    extension: str
+    write: object = field(repr=False)
+    read: object = field(repr=False)
+    options: dict = field(default_factory=dict)
+
+# The export formats by name. Parquet files are compressed, with one row group per
+# batch of at most PARQUET_ROW_GROUP_ROWS rows. Feather files are left
+# uncompressed, so reading them memory-maps the file instead of decoding it.
+EXPORT_FORMATS = {
+    "csv": ExportFormat("csv", ".csv", write_csv, read_csv),
+    "parquet": ExportFormat("parquet", ".parquet", write_parquet, read_parquet,
+                            {"compression": PARQUET_COMPRESSION, "row_group_size": PARQUET_ROW_GROUP_ROWS}),
+    "feather": ExportFormat("feather", ".feather", write_feather, read_feather, {"compression": None}),
+}
+
+def export_format(path: str) -> ExportFormat:
+    """
+    Returns the export format of a file by its extension (CSV if it has no other).
+    """
+    extension = os.path.splitext(path)[1]
+    return next((fmt for fmt in EXPORT_FORMATS.values() if fmt.extension == extension), EXPORT_FORMATS["csv"])
+
+def write_batches(batches, path: str, **options) -> int:
+    """
+    Writes cleaned batches to one file, in the format given by the extension of
+    path, as they come, through a temp file that replaces path when all are written.
+
+    Returns:
+        int: The number of rows written.
+    """
+    fmt = export_format(path)
+    tmp_path = f"{path}.tmp"
+    n_rows = fmt.write(batches, tmp_path, **{**fmt.options, **options})
+    os.replace(tmp_path, path)
+    return n_rows
+
+def schema_entry(df: pd.DataFrame, file: str, n_rows: int) -> dict:
+    """
+    Describes one exported file: its columns, their dtypes and its index.
+    """
+    return {
+        "file": file,
+        "rows": n_rows,
+        "columns": [str(column) for column in df.columns],
+        "dtypes": [str(dtype) for dtype in df.dtypes],
+        "index": str(df.index.dtype),
+    }
+
+def read_schema(output_dir: str) -> dict:
+    """
+    Returns the schema file of a table's output directory: {year: schema entry}.
+    """
+    try:
+        with open(os.path.join(output_dir, SCHEMA_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+class TableExporter:
+    """
+    Writes the cleaned frames of the tables to {TABLE_OUTPUT_DIRS[table]}/{year}{extension}
+    and records each file in the table's schema file.
+
+    The files of all tables and years are written concurrently in threads; the
+    Parquet and Arrow writers release the GIL while they encode. A file that
+    cannot be written is reported and skipped.
+    """
+    def __init__(self, fmt=EXPORT_FORMAT, max_workers=1, output_dirs=None, **options):
+        """
+        Args:
+            fmt (str): A key of EXPORT_FORMATS.
+            max_workers (int): Files written at the same time.
+            output_dirs (dict): The output directory of each table. Defaults to TABLE_OUTPUT_DIRS.
+            **options: Writer options (compression, row_group_size) over the format's defaults.
+        """
+        self.format = EXPORT_FORMATS[fmt]
+        self.max_workers = max_workers
+        self.output_dirs = output_dirs or TABLE_OUTPUT_DIRS
+        self.options = options
+
+    def path(self, table: str, year) -> str:
+        return os.path.join(self.output_dirs[table], f"{year}{self.format.extension}")
+
+    def write_batches(self, table: str, year, batches) -> dict:
+        """
+        Writes the batches of one table-year to its file.
+
+        Returns:
+            dict: The schema entry of the file.
+        """
+        first = []
+
+        def remember_first(batches):
+            for batch in batches:
+                if not first:
+                    first.append(batch.iloc[:0])
+                yield batch
+
+        path = self.path(table, year)
+        n_rows = write_batches(remember_first(batches), path, **self.options)
+        return schema_entry(first[0], os.path.basename(path), n_rows)
+
+    def write_tables(self, tables: dict) -> dict:
+        """
+        Writes the frames of several tables and updates their schema files.
+
+        Args:
+            tables (dict): {table: {year: DataFrame}}.
+
+        Returns:
+            dict: {table: {year: written file}}.
+        """
+        jobs = [(table, year, df) for table, frames in tables.items() for year, df in frames.items()]
+        for table in tables:
+            os.makedirs(self.output_dirs[table], exist_ok=True)
+        entries = {table: {} for table in tables}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.write_batches, table, year, [df]) for table, year, df in jobs]
+            for (table, year, _), future in zip(jobs, futures):
+                try:
+                    entries[table][str(year)] = future.result()
+                except Exception as e:
+                    print(f"Error writing {table} {year}: {e!r}. Skipping.")
+        for table, table_entries in entries.items():
+            self.write_schema(table, table_entries)
+        return {
+            table: {year: self.path(table, year) for year in table_entries}
+            for table, table_entries in entries.items()
+        }
+
+    def write_schema(self, table: str, entries: dict):
+        """
+        Adds the entries of newly written files to the schema file of a table.
+        """
+        output_dir = self.output_dirs[table]
+        schema = read_schema(output_dir)
+        schema.update(entries)
+        schema = dict(sorted(schema.items()))
+        tmp_path = os.path.join(output_dir, f"{SCHEMA_FILENAME}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(schema, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, os.path.join(output_dir, SCHEMA_FILENAME))
+
+def read_exported(table: str, years=None, output_dir=None) -> dict:
+    """
+    Reads the exported files of a table back with their original column names and dtypes.
+
+    Parquet files are read through a memory map and Feather files are
+    memory-mapped Arrow IPC files, so neither is parsed like a CSV; CSV files are
+    parsed and cast to the dtypes in the schema file.
+
+    Args:
+        table (str): A key of TABLE_OUTPUT_DIRS.
+        years (list): Only read these years. None reads every year in the schema file.
+        output_dir (str): The table's output directory. Defaults to TABLE_OUTPUT_DIRS[table].
+
+    Returns:
+        dict: A mapping of year (str) to the DataFrame.
+    """
+    output_dir = output_dir or TABLE_OUTPUT_DIRS[table]
+    frames = {}
+    for year, entry in read_schema(output_dir).items():
+        if years is not None and int(year) not in {int(y) for y in years}:
+            continue
+        path = os.path.join(output_dir, entry["file"])
+        try:
+            df = export_format(path).read(path)
+        except Exception as e:
+            print(f"Error reading {path}: {e}. Skipping.")
+            continue
+        df = df.set_axis(entry["columns"], axis=1)
+        df.index.name = None
+        for position, dtype in enumerate(entry["dtypes"]):
+            if str(df.dtypes.iloc[position]) != dtype:
+                df.isetitem(position, df.iloc[:, position].astype(dtype))
+        frames[year] = df
+    return frames
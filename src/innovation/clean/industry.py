@@ -0,0 +1,257 @@
+"""
+Canonical industry names across survey years.
+"""
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+
+import pandas as pd
+
+# Renamed or reclassified industries (JSIC revisions) -> the current name. Only true
+# synonyms belong here: a sub-industry must not be mapped onto its parent.
+# Both sides are compared by industry_key, so width and whitespace do not matter.
+INDUSTRY_ALIASES = {
+    "製造業計": "製造業",
+    "出版・印刷・同関連産業": "印刷・同関連業",
+    "電子部品・デバイス製造業": "電子部品・デバイス・電子回路製造業",
+    "精密機械器具製造業": "業務用機械器具製造業",
+    "衣服・その他の繊維製品製造業": "繊維工業",
+}
+# Minimum Dice similarity of the character bigrams of two industry keys for a fuzzy match
+FUZZY_THRESHOLD = 0.85
+# The industry labels of every cleaned table-year, kept next to the downloads
+INDUSTRY_LABELS_FILENAME = ".industry_labels.json"
+
+def industry_label(label) -> str:
+    """
+    Returns the display form of an industry label: NFKC-normalized, without
+    whitespace and without a leading industry code ("090食料品製造業" -> "食料品製造業").
+    """
+    label = re.sub(r"\s+", "", unicodedata.normalize("NFKC", str(label)))
+    return re.sub(r"^\d+", "", label) or label
+
+def industry_key(label) -> str:
+    """
+    Returns the key industry labels are matched on: the display form without
+    punctuation and without parenthesized qualifiers such as "(別掲を除く)".
+    """
+    key = re.sub(r"\([^)]*\)", "", industry_label(label))
+    return re.sub(r"[・、,.]", "", key) or industry_label(label)
+
+def bigrams(key: str) -> set:
+    return {key[i:i + 2] for i in range(len(key) - 1)} or {key}
+
+class IndustryNames:
+    """
+    Maps the industry labels of a table's survey years onto canonical names.
+
+    The lookup table is built once per table from the distinct labels, newest
+    year first: the labels of the newest year are the canonical names. An older
+    label maps to a canonical name when its key is the same, when INDUSTRY_ALIASES
+    renames it, or, failing both, by fuzzy matching on character bigrams. The
+    bigrams of the canonical keys are kept in an inverted index, so a label is
+    only scored against the few names that share one of its rarest bigrams, not
+    against every name. Within one year no two labels map to the same name, and
+    a label with no close match becomes a canonical name of its own.
+    """
+    def __init__(self, aliases=None, threshold=FUZZY_THRESHOLD):
+        aliases = INDUSTRY_ALIASES if aliases is None else aliases
+        self.aliases = {industry_key(old): industry_key(new) for old, new in aliases.items()}
+        self.threshold = threshold
+        self.names = {}  # key -> canonical name
+        self.grams = {}  # key -> its bigrams
+        self.index = {}  # bigram -> keys of canonical names
+        self.lookup = {}  # label -> canonical name
+        self.keys = {}  # label -> key of its canonical name
+
+    def add(self, key: str, name: str):
+        self.names[key] = name
+        self.grams[key] = bigrams(key)
+        for gram in self.grams[key]:
+            self.index.setdefault(gram, set()).add(key)
+
+    def fuzzy_match(self, key: str, taken: set):
+        """
+        Returns the canonical key most similar to key, or None if no key that is
+        not taken reaches the threshold or two keys tie.
+
+        A key with a Dice similarity of at least the threshold shares at least
+        `needed` bigrams with key, so it shares one of any len(grams) - needed + 1
+        of them: only the postings of that many of the rarest bigrams are read.
+        """
+        grams = bigrams(key)
+        needed = math.ceil(self.threshold * len(grams) / (2 - self.threshold))
+        rarest = sorted(grams, key=lambda gram: len(self.index.get(gram, ())))[:len(grams) - needed + 1]
+        candidates = set().union(*(self.index.get(gram, ()) for gram in rarest)) - taken
+        scored = sorted(
+            ((2 * len(grams & self.grams[candidate]) / (len(grams) + len(self.grams[candidate])), candidate)
+             for candidate in candidates),
+            reverse=True,
+        )
+        if not scored or scored[0][0] < self.threshold or (len(scored) > 1 and scored[1][0] == scored[0][0]):
+            return None
+        return scored[0][1]
+
+    def build(self, labels_by_year: dict) -> dict:
+        """
+        Adds the labels of some survey years to the lookup table.
+
+        Within a year, labels are matched on their exact key first, then through
+        INDUSTRY_ALIASES, then fuzzily, and never onto a name another label of the
+        year already has: such a label gets a distinct name of its own.
+
+        Args:
+            labels_by_year (dict): {year: labels}. Years are taken newest first.
+
+        Returns:
+            dict: The lookup table, {label: canonical name}.
+        """
+        for year in sorted(labels_by_year, key=int, reverse=True):
+            taken, pending = set(), []
+            for label in dict.fromkeys(labels_by_year[year]):
+                if pd.isna(label):
+                    continue
+                if label in self.lookup:
+                    taken.add(self.keys[label])
+                else:
+                    pending.append(label)
+
+            # A label with the very display name of a canonical name claims it before labels that only share its key
+            pending.sort(key=lambda label: industry_label(label) not in self.names.values())
+            unmatched = []
+            for label in pending:
+                key = next((key for key in (industry_label(label), industry_key(label)) if key in self.names), None)
+                if key is not None and key not in taken:
+                    self.assign(label, key, taken)
+                else:
+                    unmatched.append(label)
+            pending, unmatched = unmatched, []
+            for label in pending:
+                key = self.aliases.get(industry_key(label))
+                if key in self.names and key not in taken:
+                    self.assign(label, key, taken)
+                else:
+                    unmatched.append(label)
+            for label in unmatched:
+                key = industry_key(label)
+                match = self.fuzzy_match(self.aliases.get(key, key), taken) if self.names else None
+                if match is None:
+                    # A new canonical name, under the label's own key unless another name has it
+                    match, name = (key, industry_label(label)) if key not in self.names else self.distinct_name(label)
+                    self.add(match, name)
+                self.assign(label, match, taken)
+        return self.lookup
+
+    def assign(self, label, key: str, taken: set):
+        self.lookup[label] = self.names[key]
+        self.keys[label] = key
+        taken.add(key)
+
+    def distinct_name(self, label) -> tuple:
+        """
+        Returns (key, name) for a label whose key another label of its year already
+        has: a numbered key, and its display form as the name unless that is taken too.
+        """
+        key, count = industry_key(label), 2
+        while f"{key}#{count}" in self.names:
+            count += 1
+        name, used = industry_label(label), set(self.names.values())
+        return f"{key}#{count}", name if name not in used else f"{name}_{count}"
+
+    def apply(self, labels: pd.Series) -> pd.Series:
+        """
+        Replaces labels with their canonical names (a vectorized map over the
+        categories when labels is categorical).
+        """
+        canonical = labels.map(self.lookup)
+        return canonical.astype("category") if isinstance(labels.dtype, pd.CategoricalDtype) else canonical
+
+def canonicalize_industries(frames: dict, names=None, labels_by_year=None) -> dict:
+    """
+    Gives the 産業 column of every frame of a table its canonical industry names.
+
+    Args:
+        frames (dict): {year: cleaned DataFrame} of one table.
+        names (IndustryNames): The lookup to use and extend. None builds a new one.
+        labels_by_year (dict): {year: labels} of the table's other survey years, so
+            that the names do not depend on which years are cleaned together
+            (see IndustryLabelStore). The labels of frames take precedence.
+
+    Returns:
+        dict: {year: DataFrame} with canonical industry names.
+    """
+    names = names or IndustryNames()
+    labels = {str(year): list(year_labels) for year, year_labels in (labels_by_year or {}).items()}
+    labels.update({str(year): df["産業"].unique() for year, df in frames.items() if "産業" in df.columns})
+    names.build(labels)
+    return {year: df.assign(産業=names.apply(df["産業"])) if "産業" in df.columns else df for year, df in frames.items()}
+
+def frame_labels(df: pd.DataFrame) -> list:
+    """
+    Returns the distinct industry labels of a cleaned frame.
+    """
+    return [str(label) for label in df["産業"].dropna().unique()] if "産業" in df.columns else []
+
+class IndustryLabelStore:
+    """
+    The raw industry labels of each cleaned table-year, with the file they came
+    from, in a JSON file next to the downloads.
+
+    The canonical names depend on the labels of every survey year, so a run that
+    cleans only some years builds its lookup from the recorded labels of the
+    others, and gets the same names as a run over all years.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, download_dir):
+        self.path = os.path.join(download_dir, INDUSTRY_LABELS_FILENAME)
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Error reading industry labels {self.path}: {e}. Starting a new file.")
+            return {}
+
+    def record(self, table: str, labels_by_year: dict, files=None):
+        """
+        Records the labels of some years of a table.
+
+        Args:
+            table (str): The table name.
+            labels_by_year (dict): {year: labels}.
+            files (dict): {year: file name} the labels were cleaned from, if known.
+        """
+        if not labels_by_year:
+            return
+        files = {str(year): name for year, name in (files or {}).items()}
+        with self._lock:
+            entries = self.load()
+            table_entries = entries.setdefault(table, {})
+            for year, labels in labels_by_year.items():
+                table_entries[str(year)] = {"file": files.get(str(year)), "labels": list(labels)}
+            entries[table] = dict(sorted(table_entries.items()))
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def labels(self, table: str, files=None) -> dict:
+        """
+        Returns the recorded labels of a table, {year: labels}. With files
+        ({year: file name}), only the years whose labels came from that file.
+        """
+        entries = self.load().get(table, {})
+        if files is None:
+            return {year: entry["labels"] for year, entry in entries.items()}
+        files = {str(year): name for year, name in files.items()}
+        return {
+            year: entry["labels"] for year, entry in entries.items()
+            if year in files and entry.get("file") in (None, files[year])
+        }
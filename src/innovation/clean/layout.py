@@ -0,0 +1,310 @@
+"""
+Sheet layouts: where the header and the data of a sheet are, by table and survey year.
+"""
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+@dataclass(frozen=True)
+class HeaderSpec:
+    """
+    Describes the header block of a sheet: how many rows it has and which
+    merged cells have to be copied to the right before the rows are joined.
+
+    Attributes:
+        rows (int): Number of header rows joined into one header.
+        merged_spans (dict): Merged cell label -> number of cells to its right that the merge covers.
+        sep (str): Separator between header levels. Trailing separators are stripped;
+            a whitespace separator strips whitespace at both ends instead.
+        collapse_passes (int): How many times a doubled separator is collapsed in the joined header.
+        renames (dict): Regex replacements applied to the joined header.
+        first_label (str): Label of the first column, or None to keep the joined one.
+    """
+    rows: int
+    merged_spans: dict = field(default_factory=dict)
+    sep: str = "_"
+    collapse_passes: int = 1
+    renames: dict = field(default_factory=dict)
+    first_label: str = "産業"
+
+def fill_merged_spans(values: np.ndarray, merged_spans: dict):
+    """
+    Copies merged cell labels into the empty cells to their right, in place.
+
+    For every label the first row that contains it is used, and only the cells
+    of that row that are empty get the label.
+
+    Args:
+        values (np.ndarray): The header rows as an object array.
+        merged_spans (dict): Merged cell label -> number of cells the merge covers to the right.
+    """
+    missing = pd.isna(values)
+    for key, span in merged_spans.items():
+        hits = np.argwhere(values == key)
+        if not len(hits):
+            continue
+        row, col = hits[0]
+        target = slice(col + 1, min(col + 1 + span, values.shape[1]))
+        mask = missing[row, target]
+        values[row, target][mask] = key
+        missing[row, target] = False
+
+def join_header_levels(values: np.ndarray, sep: str = "_", collapse_passes: int = 1) -> pd.Index:
+    """
+    Joins the header rows column-wise into one header.
+
+    Args:
+        values (np.ndarray): The header rows as an object array.
+        sep (str): Separator between header levels.
+        collapse_passes (int): How many times a doubled separator is collapsed.
+
+    Returns:
+        pd.Index: The joined header.
+    """
+    rows = pd.DataFrame(values).fillna('').astype(str).to_numpy()
+    joined = rows[0]
+    for row in rows[1:]:
+        joined = joined + sep + row
+    header = pd.Index(joined)
+    for _ in range(collapse_passes):
+        header = header.str.replace(sep * 2, sep, regex=False)
+    return header.str.rstrip(sep) if sep.strip() else header.str.strip()
+
+def build_header(header_rows: pd.DataFrame, spec: HeaderSpec) -> pd.Index:
+    """
+    Builds one header from the header rows of a sheet.
+
+    Args:
+        header_rows (pd.DataFrame): The header rows.
+        spec (HeaderSpec): The header layout.
+
+    Returns:
+        pd.Index: The header.
+    """
+    values = header_rows.to_numpy(dtype=object, copy=True)
+    fill_merged_spans(values, spec.merged_spans)
+    if spec.first_label is not None:
+        values[0, 0] = spec.first_label
+    header = join_header_levels(values, spec.sep, spec.collapse_passes)
+    for pattern, replacement in spec.renames.items():
+        header = header.str.replace(pattern, replacement, regex=True)
+    return header
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """
+    Describes where the header and the data of a sheet are and how to clean them.
+
+    Rows are counted after the empty rows and columns have been dropped.
+
+    Attributes:
+        header (HeaderSpec): The header block.
+        read_header (int | list): The header argument used when reading the sheet.
+        skip_rows (int): Rows above the header block.
+        data_start (int): First data row, counted from the first header row.
+        drop_empty_rows (bool): Drop rows that are entirely empty.
+        drop_empty_columns (bool): Drop columns that are entirely empty.
+        drop_columns (tuple): Positions of columns dropped before the header is built.
+        strip_whitespace (bool): Remove all whitespace from the cells.
+        column_names (dict): Position -> name, set after the header is built.
+        split_industry_rows (bool): Industry names are on their own rows in the year column
+            and are moved to a new leading "産業" column.
+        ffill_industry (bool): Forward-fill the first column.
+        require_year (bool): Drop rows without a value in the second column.
+        drop_after (tuple): Positions of columns dropped after the header is built.
+        strip_year (bool): Strip whitespace around the values of the second column.
+        reset_index (bool): Renumber the data rows from 0.
+    """
+    header: HeaderSpec
+    read_header: object = 0
+    skip_rows: int = 0
+    data_start: int = 0
+    drop_empty_rows: bool = False
+    drop_empty_columns: bool = False
+    drop_columns: tuple = ()
+    strip_whitespace: bool = False
+    column_names: dict = field(default_factory=dict)
+    split_industry_rows: bool = False
+    ffill_industry: bool = False
+    require_year: bool = False
+    drop_after: tuple = ()
+    strip_year: bool = False
+    reset_index: bool = True
+
+def apply_layout(df: pd.DataFrame, layout: SheetLayout) -> pd.DataFrame:
+    """
+    Cleans a raw sheet with its layout.
+
+    The header block and the data rows are cut out of the raw frame with one
+    positional slice, without intermediate copies of the whole sheet.
+
+    Args:
+        df (pd.DataFrame): The sheet as read with layout.read_header.
+        layout (SheetLayout): The layout of the sheet.
+
+    Returns:
+        pd.DataFrame: The cleaned sheet.
+    """
+    if layout.drop_empty_rows:
+        df = df.dropna(how='all')
+    if layout.drop_empty_columns:
+        df = df.dropna(axis=1, how='all')
+    columns = [i for i in range(df.shape[1]) if i not in layout.drop_columns]
+    df = df.iloc[layout.skip_rows:, columns]
+    if layout.strip_whitespace:
+        # Remove all whitespaces from the dataframe
+        df = df.replace(to_replace=r'\s+', value='', regex=True)
+
+    header = build_header(df.iloc[:layout.header.rows], layout.header)
+    df = df.iloc[layout.data_start:]
+    if layout.reset_index:
+        df = df.reset_index(drop=True)
+    df.columns = column_names(header, layout)
+    df, _ = apply_rows(df, layout)
+    return df
+
+def column_names(header: pd.Index, layout: SheetLayout) -> list:
+    """
+    Returns the column names of a sheet: the built header with the layout's column_names.
+    """
+    names = list(header)
+    for position, name in layout.column_names.items():
+        names[position] = name
+    return names
+
+def apply_rows(df: pd.DataFrame, layout: SheetLayout, carry=None) -> tuple:
+    """
+    Applies the row-wise steps of a layout to data rows that have their column names.
+
+    The rows can be a whole sheet or one batch of it: `carry` is the industry
+    the rows before the batch ended with, forward-filled into its first rows.
+
+    Args:
+        df (pd.DataFrame): The data rows.
+        layout (SheetLayout): The layout of the sheet.
+        carry: The industry to fill the leading empty industry cells with.
+
+    Returns:
+        tuple: (the cleaned rows, the industry to carry into the next batch)
+    """
+    if layout.split_industry_rows:
+        df.insert(0, "産業", None)
+        is_industry = ~df.iloc[:, 1].str.contains("年度", na=False)
+        df.loc[is_industry, "産業"] = df.iloc[:, 1]
+        df.loc[is_industry, df.columns[1]] = None
+    if layout.ffill_industry:
+        industry = df.iloc[:, 0].ffill()
+        if carry is not None:
+            industry = industry.where(industry.notna(), carry)
+        df.iloc[:, 0] = industry
+        carry = industry.iloc[-1] if len(industry) and pd.notna(industry.iloc[-1]) else carry
+    if layout.require_year:
+        df = df.dropna(subset=[df.columns[1]])
+    for position in layout.drop_after:
+        df = df.drop(df.columns[position], axis=1)
+    if layout.strip_year:
+        try:
+            df.iloc[:, 1] = df.iloc[:, 1].str.strip()
+        except AttributeError:
+            pass
+    return df, carry
+
+# 結合されたセルとコピーが必要な回数
+RESEARCH_MERGED_SPANS = {
+    "研究開発": 9,
+    "研究開発投資": 1,
+    "能力開発": 1,
+    "研究開発費": 4,
+    "委託研究開発費（百万円）": 2,
+    "受託研究費（百万円）": 2,
+    "うち、関係会社への委託": 1,
+    "うち、関係会社からの受託": 1
+}
+PATENT_MERGED_SPANS = {
+    "特許権": 3,
+    "実用新案権": 3,
+    "意匠権": 3,
+    "件数": 2,
+    "使用のもの（含供与）": 1
+}
+
+RESEARCH_BEFORE_2020 = SheetLayout(
+    header=HeaderSpec(rows=5, merged_spans=RESEARCH_MERGED_SPANS),
+    read_header=1, skip_rows=2, data_start=10,
+    drop_empty_columns=True, strip_whitespace=True,
+)
+RESEARCH_WIDE_SPAN = replace(
+    RESEARCH_BEFORE_2020,
+    header=HeaderSpec(rows=5, merged_spans={**RESEARCH_MERGED_SPANS, "研究開発": 10}),
+)
+PATENT_BEFORE_2020 = SheetLayout(
+    header=HeaderSpec(rows=6, merged_spans=PATENT_MERGED_SPANS),
+    read_header=1, data_start=11, drop_columns=(0,),
+    strip_whitespace=True,
+)
+LABOR_BEFORE_2020 = SheetLayout(
+    header=HeaderSpec(rows=3, sep=" ", collapse_passes=0, first_label=None),
+    read_header=[0, 1], skip_rows=2, data_start=3,
+    drop_empty_rows=True, drop_empty_columns=True, column_names={0: "産業", 1: "年度"},
+    ffill_industry=True, require_year=True, strip_year=True, reset_index=False,
+)
+
+# Layouts by table and by the first survey year they apply to.
+# A year uses the entry of the latest year at or before it, so a new survey
+# year only needs an entry when its layout changes.
+LAYOUT_REGISTRY = {
+    "research_expense": {
+        1992: RESEARCH_BEFORE_2020,
+        2010: RESEARCH_WIDE_SPAN,
+        2011: replace(RESEARCH_BEFORE_2020, skip_rows=1),
+        2013: replace(RESEARCH_WIDE_SPAN, skip_rows=1),
+        2014: RESEARCH_WIDE_SPAN,
+        2015: RESEARCH_BEFORE_2020,
+        2020: SheetLayout(
+            header=HeaderSpec(rows=6),
+            read_header=0, data_start=12, drop_empty_columns=True, drop_columns=(0, 2, 3),
+        ),
+    },
+    "patent_count": {
+        1992: PATENT_BEFORE_2020,
+        2011: replace(PATENT_BEFORE_2020, drop_columns=()),
+        2014: replace(PATENT_BEFORE_2020, skip_rows=2),
+        2020: SheetLayout(
+            header=HeaderSpec(rows=6, collapse_passes=2, renames={'特許権_件数_所有数_件': '特許権_件数_所有数'}),
+            read_header=0, data_start=12, drop_empty_columns=True, drop_columns=(0, 2, 3),
+        ),
+    },
+    "labor_number": {
+        1992: LABOR_BEFORE_2020,
+        2003: replace(LABOR_BEFORE_2020, drop_after=(2,)),
+        2004: replace(
+            LABOR_BEFORE_2020, header=replace(LABOR_BEFORE_2020.header, rows=4), skip_rows=1, data_start=4,
+            column_names={0: "年度"}, split_industry_rows=True,
+        ),
+        2006: replace(LABOR_BEFORE_2020, drop_after=(2,)),
+        2007: replace(LABOR_BEFORE_2020, skip_rows=1, require_year=False, drop_after=(2,)),
+        2008: replace(LABOR_BEFORE_2020, drop_after=(2,)),
+        2009: replace(LABOR_BEFORE_2020, skip_rows=0, require_year=False),
+        2010: LABOR_BEFORE_2020,
+        2011: replace(LABOR_BEFORE_2020, skip_rows=0, require_year=False),
+        2014: LABOR_BEFORE_2020,
+        2020: replace(
+            LABOR_BEFORE_2020, header=replace(LABOR_BEFORE_2020.header, rows=1), skip_rows=0,
+            column_names={1: "産業", 3: "年度"}, ffill_industry=False, require_year=False, drop_after=(0,),
+        ),
+    },
+}
+
+def get_layout(table: str, year: int) -> SheetLayout:
+    """
+    Returns the layout registered for a table and survey year.
+
+    Raises:
+        KeyError: If no layout covers the year.
+    """
+    layouts = LAYOUT_REGISTRY[table]
+    starts = [start for start in layouts if start <= year]
+    if not starts:
+        raise KeyError(f"No {table} layout for {year}")
+    return layouts[max(starts)]
@@ -0,0 +1,228 @@
+"""
+Derived metrics of the long-format panels: growth rates, ratios, differences and
+rolling means per industry across survey years.
+"""
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .cache import source_version
+from .panel import PANEL_DIR, PanelStore, wide_panel
+
+# Derived metrics are cached next to the panels, one partitioned Parquet dataset per table
+DERIVED_DIR = os.path.join(PANEL_DIR, "derived")
+# The fingerprints of the panel years the cached metrics were computed from
+METRICS_STATE_FILENAME = ".metrics_state.json"
+
+@dataclass(frozen=True)
+class DerivedMetric:
+    """
+    One derived metric of a table, computed per industry from metrics of the
+    table's panel or from derived metrics declared before it.
+
+    kind is one of:
+        "growth"   inputs[0] / inputs[0] `lag` years earlier - 1
+        "ratio"    inputs[0] / inputs[1] in the same year
+        "diff"     inputs[0] - inputs[0] `lag` years earlier
+        "rolling"  mean of inputs[0] over the `window` years up to the year,
+                   missing unless all of them have a value
+
+    Earlier years are calendar years, not the previous survey year: a growth
+    rate after a gap in the survey is missing rather than taken over the gap.
+    """
+    name: str
+    table: str
+    kind: str
+    inputs: tuple
+    lag: int = 1
+    window: int = 3
+
+    @property
+    def reach(self) -> int:
+        """
+        How many years before its year the metric reads its inputs.
+        """
+        return {"growth": self.lag, "diff": self.lag, "rolling": self.window - 1}.get(self.kind, 0)
+
+DERIVED_METRICS = (
+    DerivedMetric("rd_expense_growth", "research_expense", "growth", ("rd_expense_total",)),
+    DerivedMetric("rd_intensity", "research_expense", "ratio", ("rd_expense_total", "sales")),
+    DerivedMetric("rd_intensity_delta", "research_expense", "diff", ("rd_intensity",)),
+    DerivedMetric("rd_expense_rolling3", "research_expense", "rolling", ("rd_expense_total",), window=3),
+    DerivedMetric("patents_used_ratio", "patent_count", "ratio", ("patents_used", "patents_owned")),
+    DerivedMetric("patents_owned_growth", "patent_count", "growth", ("patents_owned",)),
+)
+
+def lookback(specs) -> int:
+    """
+    Returns how many years before its year any of the metrics depends on,
+    following derived metrics that are inputs of others.
+    """
+    reach = {}
+    for spec in specs:
+        reach[spec.name] = spec.reach + max((reach.get(name, 0) for name in spec.inputs), default=0)
+    return max(reach.values(), default=0)
+
+def lagged(values: pd.Series, years: int) -> pd.Series:
+    """
+    Returns, for each row, the value of the same industry `years` years earlier,
+    NaN where that year has no row. Aligns on the index instead of shifting rows,
+    so gaps between survey years are respected.
+    """
+    return values.rename(lambda year: year + years, level="year").reindex(values.index)
+
+def compute_metrics(panel: pd.DataFrame, specs=DERIVED_METRICS) -> pd.DataFrame:
+    """
+    Computes derived metrics of one table's panel, all in one pass over its wide form.
+
+    Args:
+        panel (pd.DataFrame): The long-format panel (see build_panel).
+        specs (tuple): The DerivedMetric specs of the table, in dependency order.
+
+    Returns:
+        pd.DataFrame: A long-format panel of the derived metrics, with the columns
+        of the input panel. Missing and infinite values are left out.
+    """
+    keys = [column for column in ("year", "industry", "period") if column in panel]
+    names = [spec.name for spec in specs]
+    if panel.empty or not specs:
+        return pd.DataFrame(columns=keys + ["metric", "value"])
+    wide = wide_panel(panel, [column for column in ("industry", "period", "year") if column in panel])
+    for spec in specs:
+        missing = [name for name in spec.inputs if name not in wide]
+        if missing:
+            wide[spec.name] = np.nan
+            continue
+        values = wide[spec.inputs[0]]
+        if spec.kind == "growth":
+            result = values / lagged(values, spec.lag) - 1
+        elif spec.kind == "ratio":
+            result = values / wide[spec.inputs[1]]
+        elif spec.kind == "diff":
+            result = values - lagged(values, spec.lag)
+        elif spec.kind == "rolling":
+            window = pd.concat([lagged(values, years) for years in range(spec.window)], axis=1)
+            result = window.mean(axis=1, skipna=False)
+        else:
+            raise ValueError(f"Unknown kind {spec.kind!r} of derived metric {spec.name}")
+        wide[spec.name] = result.replace([np.inf, -np.inf], np.nan)
+
+    derived = wide[names].rename_axis(columns="metric").stack(future_stack=True).dropna().rename("value").reset_index()
+    derived["year"] = derived["year"].astype("int16")
+    for column in ("industry", "period", "metric"):
+        if column in derived:
+            derived[column] = derived[column].astype(str).astype("category")
+    return derived[keys + ["metric", "value"]].sort_values(["year", "industry", "metric"], ignore_index=True)
+
+def year_fingerprints(panel: pd.DataFrame) -> dict:
+    """
+    Returns a hash of the rows of each year of a panel, {year (str): hash}.
+    """
+    if panel.empty:
+        return {}
+    hashes = pd.util.hash_pandas_object(panel.drop(columns="year"), index=False)
+    return {str(year): str(value) for year, value in hashes.groupby(panel["year"].to_numpy()).sum().items()}
+
+class MetricsEngine:
+    """
+    Computes the derived metrics of the tables and caches them with the panels,
+    as Parquet datasets partitioned by year (see PanelStore).
+
+    Each update compares the fingerprint of every year of the input panel with
+    the one the cache was computed from. Only the years whose inputs changed (a
+    new survey year, a re-cleaned file) are recomputed, with the later years
+    whose growth rates and rolling windows reach back to them; only the input
+    years those need are read. A change to the specs or to this code recomputes
+    every year.
+    """
+    def __init__(self, specs=DERIVED_METRICS, store=None):
+        self.specs = specs
+        self.store = store or PanelStore(DERIVED_DIR)
+        self.state_path = os.path.join(self.store.root, METRICS_STATE_FILENAME)
+
+    def table_specs(self, table: str) -> tuple:
+        return tuple(spec for spec in self.specs if spec.table == table)
+
+    def version(self, table: str) -> str:
+        """
+        Returns the version of a table's specs and of the code computing them.
+        """
+        return f"{source_version(compute_metrics, lagged, wide_panel)}:{self.table_specs(table)!r}"
+
+    def load_state(self) -> dict:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self, state: dict):
+        os.makedirs(self.store.root, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def update(self, table: str, panel: pd.DataFrame, years=None) -> list:
+        """
+        Brings the cached derived metrics of a table up to date with its panel.
+
+        Args:
+            table (str): The table name.
+            panel (pd.DataFrame): The table's current long-format panel, with the
+                earlier years the changed years reach back to.
+            years (list): The survey years the run cleaned. Only these years can
+                count as changed or be deleted; the cache of the other years is kept.
+                None means the panel holds every year.
+
+        Returns:
+            list: The years that were recomputed.
+        """
+        specs = self.table_specs(table)
+        if not specs:
+            return []
+        state = self.load_state()
+        cached = state.get(table, {})
+        fingerprints = year_fingerprints(panel)
+        in_scope = {str(int(year)) for year in years} if years is not None else None
+        if cached.get("version") != self.version(table) or not os.path.exists(self.store.path(table)):
+            previous = {}
+            changed = set(fingerprints)
+        else:
+            previous = cached.get("years", {})
+            changed = {
+                year for year in fingerprints.keys() | previous.keys()
+                if fingerprints.get(year) != previous.get(year) and (in_scope is None or year in in_scope)
+            }
+        if not changed:
+            return []
+
+        reach = lookback(specs)
+        changed = {int(year) for year in changed}
+        present = {int(year) for year in fingerprints}
+        recompute = {year for year in present if any(0 <= year - c <= reach for c in changed)}
+        needed = {year for year in present if any(0 <= r - year <= reach for r in recompute)}
+        derived = compute_metrics(panel[panel["year"].isin(needed)], specs)
+        derived = derived[derived["year"].isin(recompute)]
+
+        # Partitions of years that were removed, or that no longer have any values, must not linger
+        removed = changed - present
+        self.store.delete_years(table, recompute | removed)
+        if not derived.empty:
+            self.store.write(table, derived)
+        merged = {year: value for year, value in previous.items() if int(year) not in removed}
+        merged.update(fingerprints)
+        state[table] = {"version": self.version(table), "years": dict(sorted(merged.items()))}
+        self.save_state(state)
+        return sorted(recompute)
+
+    def read(self, table: str, years=None, industries=None, metrics=None) -> pd.DataFrame:
+        """
+        Reads the cached derived metrics of a table. See PanelStore.read.
+        """
+        if not os.path.exists(self.store.path(table)):
+            return pd.DataFrame(columns=["year", "industry", "metric", "value"])
+        return self.store.read(table, years, industries, metrics)
@@ -0,0 +1,106 @@
+"""
+Typing of the cleaned frames: numeric value columns and categorical labels.
+"""
+import numpy as np
+import pandas as pd
+
+# Cell values that mean "suppressed" or "not available" once NFKC-normalized
+SUPPRESSION_MARKERS = ("X", "x", "***", "*", "-", "…", "")
+# Label columns; every other column is a value column
+ID_COLUMNS = ("産業", "年度")
+NULLABLE_INT_DTYPES = ("Int8", "Int16", "Int32", "Int64")
+
+def compact_numeric(values: np.ndarray) -> pd.Series:
+    """
+    Casts float values to the smallest nullable integer dtype that holds them,
+    or to Float64 when they are not all integral.
+    """
+    present = values[~np.isnan(values)]
+    if len(present) and not np.array_equal(present, np.floor(present)):
+        return pd.Series(values, dtype="Float64")
+    low, high = (present.min(), present.max()) if len(present) else (0, 0)
+    for dtype in NULLABLE_INT_DTYPES:
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return pd.Series(values).astype(dtype)
+    return pd.Series(values, dtype="Float64")
+
+def parse_values(values: pd.DataFrame) -> tuple:
+    """
+    Parses all value cells in one pass: strings are NFKC-normalized (so full-width
+    digits and markers become half-width), thousands separators are removed,
+    suppression markers become nulls and the rest is parsed as numbers.
+
+    Args:
+        values (pd.DataFrame): The value columns.
+
+    Returns:
+        tuple: (float array of the numbers, one row per column, NaN where a cell
+        is not a number; bool array, True for the columns with text that is not a number)
+    """
+    n_rows, n_cols = values.shape
+    cells = pd.Series(values.to_numpy(dtype=object).ravel(order="F"), dtype=object)
+    try:
+        text = cells.str.normalize("NFKC").str.replace(",", "", regex=False).str.strip()
+    except AttributeError:
+        # No strings among the cells
+        text = pd.Series(None, index=cells.index, dtype=object)
+    is_text = text.notna()
+    text = text.where(~text.isin(SUPPRESSION_MARKERS))
+    cells = cells.where(~is_text, text)
+    numbers = pd.to_numeric(cells, errors="coerce").to_numpy(dtype="float64")
+    unparsed = (np.isnan(numbers) & cells.notna().to_numpy()).reshape(n_cols, n_rows).any(axis=1)
+    return numbers.reshape(n_cols, n_rows), unparsed
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gives a cleaned frame compact, typed columns.
+
+    All value cells are parsed in one pass (see parse_values). Each value column
+    then gets the smallest nullable numeric dtype that holds it. Columns with
+    text that is not a number are kept as they are. The label columns become
+    categoricals.
+
+    The memory use before and after is kept in df.attrs["memory_bytes"].
+
+    Args:
+        df (pd.DataFrame): A cleaned frame.
+
+    Returns:
+        pd.DataFrame: The typed frame.
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    is_id = df.columns.isin(ID_COLUMNS)
+    value_positions = np.flatnonzero(~is_id)
+    numbers, unparsed = parse_values(df.iloc[:, value_positions])
+
+    columns = []
+    for position in range(df.shape[1]):
+        column = df.iloc[:, position]
+        if is_id[position]:
+            column = column.astype("category")
+        else:
+            k = np.searchsorted(value_positions, position)
+            if not unparsed[k]:
+                column = compact_numeric(numbers[k]).set_axis(df.index)
+        columns.append(column.rename(df.columns[position]))
+
+    typed = pd.concat(columns, axis=1) if columns else df.copy()
+    typed.columns = df.columns
+    typed.attrs["memory_bytes"] = {"before": before, "after": int(typed.memory_usage(deep=True).sum())}
+    return typed
+
+def report_memory(label: str, frames: dict):
+    """
+    Prints the memory use of the cleaned frames before and after normalize_frame.
+    """
+    total_before = total_after = 0
+    for key, df in frames.items():
+        memory = df.attrs.get("memory_bytes")
+        if not memory:
+            continue
+        total_before += memory["before"]
+        total_after += memory["after"]
+        print(f"  {label} {key}: {memory['before'] / 1024:,.1f} KB → {memory['after'] / 1024:,.1f} KB")
+    if total_before:
+        print(f"  {label} total: {total_before / 1024:,.1f} KB → {total_after / 1024:,.1f} KB")
@@ -0,0 +1,172 @@
+"""
+Long-format panels of the cleaned tables, stored as partitioned Parquet datasets.
+"""
+import os
+import re
+import shutil
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Consolidated long-format panels, one partitioned Parquet dataset per table
+PANEL_DIR = "data/panel"
+
+# Canonical metric IDs for the headers used across the project.
+# Headers that are not listed keep their normalized header as metric ID.
+METRIC_ALIASES = {
+    "research_expense": {
+        "企業数": "companies",
+        "研究開発_企業数_社": "rd_companies",
+        "研究開発_売上高（百万円）": "sales",
+        "研究開発_研究開発費_計": "rd_expense_total",
+        "研究開発_研究開発費_計_百万円": "rd_expense_total",
+        "研究開発_研究開発費_自社研究開発費（百万円）": "rd_expense_internal",
+        "研究開発_研究開発費_委託研究開発費（百万円）": "rd_expense_outsourced",
+        "研究開発_売上高研究開発費比率_％": "rd_sales_ratio",
+    },
+    "patent_count": {
+        "企業数_社": "companies",
+        "特許権_件数_所有数": "patents_owned",
+        "特許権_件数_所有数_件": "patents_owned",
+        "特許権_件数_所有数_使用のもの（含供与）_件": "patents_used",
+    },
+    "labor_number": {},
+}
+
+def normalize_header(header: str) -> str:
+    """
+    Normalizes a joined header so that the same column matches across years:
+    NFKC width folding and single "_" separators in place of whitespace.
+    """
+    header = unicodedata.normalize("NFKC", str(header))
+    header = re.sub(r"\s+", "_", header)
+    return re.sub(r"_+", "_", header).strip("_")
+
+NORMALIZED_METRIC_ALIASES = {
+    table: {normalize_header(header): metric for header, metric in aliases.items()}
+    for table, aliases in METRIC_ALIASES.items()
+}
+
+def canonical_metric(table: str, header: str) -> str:
+    """
+    Returns the canonical metric ID of a header of a table.
+    """
+    header = normalize_header(header)
+    return NORMALIZED_METRIC_ALIASES.get(table, {}).get(header, header)
+
+def build_panel(table: str, frames: dict) -> pd.DataFrame:
+    """
+    Stacks the cleaned per-year frames of a table into one long-format panel.
+
+    Args:
+        table (str): The table name in LAYOUT_REGISTRY.
+        frames (dict): A mapping of year to the cleaned DataFrame.
+
+    Returns:
+        pd.DataFrame: Columns year, industry, (period,) metric and value. Cells
+        without a numeric value are left out. The labor table keeps its
+        fiscal-year rows in the period column.
+    """
+    parts = []
+    for year, df in frames.items():
+        if "産業" not in df.columns:
+            print(f"No 産業 column in the {table} frame of {year}. Skipping.")
+            continue
+        is_industry = df.columns == "産業"
+        is_period = df.columns == "年度"
+        values = df.loc[:, ~(is_industry | is_period)]
+        n_rows, n_cols = values.shape
+        metrics = [canonical_metric(table, column) for column in values.columns]
+        part = pd.DataFrame({
+            "year": np.full(n_rows * n_cols, int(year), dtype="int16"),
+            "industry": np.repeat(df.loc[:, is_industry].iloc[:, 0].to_numpy(), n_cols),
+            "metric": np.tile(np.asarray(metrics, dtype=object), n_rows),
+            "value": pd.to_numeric(pd.Series(values.to_numpy().ravel()), errors="coerce"),
+        })
+        if is_period.any():
+            part.insert(2, "period", np.repeat(df.loc[:, is_period].iloc[:, 0].to_numpy(), n_cols))
+        parts.append(part.dropna(subset=["industry", "value"]))
+
+    if not parts:
+        return pd.DataFrame(columns=["year", "industry", "metric", "value"])
+    panel = pd.concat(parts, ignore_index=True)
+    for column in ("industry", "period", "metric"):
+        if column in panel:
+            panel[column] = panel[column].astype(str).astype("category")
+    return panel.sort_values(["year", "industry", "metric"], ignore_index=True)
+
+def wide_panel(panel: pd.DataFrame, keys) -> pd.DataFrame:
+    """
+    Turns a long-format panel into one row per key, e.g. (year, industry), and one
+    column per metric, with a sorted index. Where a metric appears twice for a
+    key, its first value is kept.
+
+    Args:
+        panel (pd.DataFrame): A long-format panel (see build_panel).
+        keys (list): The columns of the index, in order.
+    """
+    panel = panel.astype({"industry": str, "metric": str})
+    wide = panel.groupby(list(keys) + ["metric"], sort=False, observed=True)["value"].first().unstack("metric")
+    wide.columns = wide.columns.astype(str)
+    wide.columns.name = None
+    return wide.sort_index()
+
+class PanelStore:
+    """
+    Reads and writes the long-format panels as Parquet datasets partitioned by year.
+
+    Reads push the year filter down to the partitions and the industry and
+    metric filters down to the row groups, so a query only reads what it needs.
+    """
+    def __init__(self, root=PANEL_DIR):
+        self.root = root
+
+    def path(self, table: str) -> str:
+        return os.path.join(self.root, table)
+
+    def write(self, table: str, panel: pd.DataFrame):
+        """
+        Writes the panel of a table, replacing the partitions of the years it contains.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        panel.to_parquet(
+            self.path(table),
+            partition_cols=["year"],
+            index=False,
+            existing_data_behavior="delete_matching",
+        )
+
+    def delete_years(self, table: str, years):
+        """
+        Deletes the partitions of some years of a table's panel.
+        """
+        for year in years:
+            shutil.rmtree(os.path.join(self.path(table), f"year={int(year)}"), ignore_errors=True)
+
+    def read(self, table: str, years=None, industries=None, metrics=None, columns=None) -> pd.DataFrame:
+        """
+        Reads the panel of a table.
+
+        Args:
+            table (str): The table name.
+            years (list): Only these years.
+            industries (list): Only these industries.
+            metrics (list): Only these metric IDs.
+            columns (list): Only these columns.
+
+        Returns:
+            pd.DataFrame: The matching rows.
+        """
+        filters = []
+        if years is not None:
+            filters.append(("year", "in", [int(year) for year in years]))
+        if industries is not None:
+            filters.append(("industry", "in", list(industries)))
+        if metrics is not None:
+            filters.append(("metric", "in", list(metrics)))
+        panel = pd.read_parquet(self.path(table), columns=columns, filters=filters or None)
+        if "year" in panel:
+            panel["year"] = panel["year"].astype("int16")
+            panel = panel[["year"] + [column for column in panel.columns if column != "year"]]
+        return panel
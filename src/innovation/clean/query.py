@@ -0,0 +1,217 @@
+"""
+Indexed queries over the cleaned tables by canonical metric name.
+"""
+import functools
+
+import pandas as pd
+
+from ..config import TABLE_ATTRIBUTES, TABLE_TARGETS
+from .panel import PanelStore, build_panel, canonical_metric, normalize_header, wide_panel
+
+# Industry rows that sum up the others, left out of rankings by default
+TOTAL_INDUSTRIES = ("総合計", "合計")
+
+def freeze(value):
+    """
+    Returns a hashable stand-in for a list or set argument.
+    """
+    return tuple(value) if isinstance(value, (list, set)) else value
+
+def memoized(method):
+    """
+    Caches a DataQuery method's results in the instance's memo, by method and arguments.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, tuple(map(freeze, args)), tuple((k, freeze(v)) for k, v in sorted(kwargs.items())))
+        if key not in self.memo:
+            self.memo[key] = method(self, *args, **kwargs)
+        return self.memo[key]
+    return wrapper
+
+class DataQuery:
+    """
+    Answers questions about the cleaned tables by canonical metric name
+    (rd_expense_total, patents_owned, ... see METRIC_ALIASES), whatever the
+    column is called in a given survey year.
+
+    Each table is indexed once: its long-format panel is turned into a wide frame
+    indexed by (year, industry), or (year, industry, period) for the labor table,
+    with one column per metric and a sorted index, so that a lookup by year or
+    industry is an index slice instead of a scan. Every result is memoized; the
+    results are shared between calls and should be copied before being modified.
+
+    A DataQuery reads one snapshot of the data. Build a new one after cleaning again.
+    """
+    def __init__(self, frames=None, panels=None):
+        """
+        Args:
+            frames (dict): {table: {year: cleaned DataFrame}}, as set by DataCleaner.
+            panels (dict): {table: long-format panel}, e.g. read from the PanelStore.
+                Used instead of building the panel from the frames.
+        """
+        self.frames = frames or {}
+        self.panels = dict(panels or {})
+        self.memo = {}
+
+    @classmethod
+    def from_cleaner(cls, cleaner) -> "DataQuery":
+        """
+        Queries the tables a DataCleaner has cleaned.
+        """
+        frames = {table: getattr(cleaner, attr) for table, attr in TABLE_ATTRIBUTES.items() if hasattr(cleaner, attr)}
+        return cls(frames)
+
+    @classmethod
+    def from_store(cls, store=None, tables=None, derived=False) -> "DataQuery":
+        """
+        Queries the panels saved in a PanelStore, without cleaning anything. With
+        `derived`, the cached derived metrics (rd_expense_growth, ...) can be
+        queried like the table's own metrics.
+        """
+        store = store or PanelStore()
+        panels = {table: store.read(table) for table in tables or TABLE_TARGETS}
+        if derived:
+            from .metrics import MetricsEngine
+
+            engine = MetricsEngine()
+            for table, panel in panels.items():
+                derived_panel = engine.read(table)
+                if not derived_panel.empty:
+                    panels[table] = pd.concat([panel, derived_panel], ignore_index=True)
+        return cls(panels=panels)
+
+    @property
+    def tables(self) -> list:
+        return [table for table in TABLE_TARGETS if table in self.frames or table in self.panels]
+
+    @memoized
+    def headers(self, table: str, year) -> dict:
+        """
+        Returns {metric: column header} of a table in one survey year, e.g.
+        {"rd_expense_total": "研究開発_研究開発費_計__百万円", ...}.
+        """
+        frames = self.table_frames(table)
+        # The labor table is keyed by str years, the others by int years
+        df = frames[year] if year in frames else frames[str(year) if isinstance(year, int) else int(year)]
+        return {canonical_metric(table, column): column for column in df.columns if column not in ("産業", "年度")}
+
+    def table_frames(self, table: str) -> dict:
+        if table not in self.frames:
+            raise KeyError(f"No cleaned frames for {table!r}. Tables: {', '.join(self.tables)}")
+        return self.frames[table]
+
+    @memoized
+    def index(self, table: str) -> pd.DataFrame:
+        """
+        Returns the indexed table: one row per (year, industry[, period]), one column per metric.
+        Where an industry appears twice in a year, its first row is kept.
+        """
+        panel = self.panels.get(table)
+        if panel is None:
+            panel = build_panel(table, self.table_frames(table))
+        keys = [column for column in ("year", "industry", "period") if column in panel]
+        if "period" in panel:
+            # Fiscal years sort in the order of the sheets, not by their (era) names
+            periods = panel["period"].astype(str)
+            panel = panel.assign(period=pd.Categorical(periods, categories=periods.unique(), ordered=True))
+        return wide_panel(panel, keys)
+
+    def metrics(self, table: str) -> list:
+        """
+        Returns the metric IDs of a table.
+        """
+        return list(self.index(table).columns)
+
+    def column(self, table: str, metric: str) -> pd.Series:
+        """
+        Returns one metric of the indexed table, raising KeyError with the known metrics if it is missing.
+        """
+        wide = self.index(table)
+        if metric not in wide.columns:
+            metric_id = canonical_metric(table, metric)
+            if metric_id not in wide.columns:
+                raise KeyError(f"No metric {metric!r} in {table}. Metrics: {', '.join(wide.columns)}")
+            metric = metric_id
+        return wide[metric]
+
+    @memoized
+    def values(self, table: str, metric: str, years=None) -> pd.Series:
+        """
+        Returns the values of a metric indexed by (year, industry), without missing values.
+        For the labor table, the last fiscal-year row of each industry is used.
+        """
+        values = self.column(table, metric).dropna()
+        if values.index.nlevels > 2:
+            values = values.groupby(level=["year", "industry"], sort=True).last()
+        if years is not None:
+            values = values[values.index.get_level_values("year").isin([int(year) for year in years])]
+        return values
+
+    @memoized
+    def value(self, table: str, metric: str, year: int, industry: str):
+        """
+        Returns one value, or None if the table has no value for the year and industry.
+        """
+        return self.values(table, metric).get((int(year), industry))
+
+    @memoized
+    def top(self, table: str, metric: str, year: int, k: int = 10, exclude=TOTAL_INDUSTRIES) -> pd.Series:
+        """
+        Returns the k industries with the largest values of a metric in a year, largest first.
+
+        Args:
+            exclude (tuple): Industries left out, compared without whitespace and width
+                differences. Defaults to the total rows.
+
+        Returns:
+            pd.Series: The values, indexed by industry.
+        """
+        values = self.values(table, metric).xs(int(year), level="year")
+        if exclude:
+            excluded = {normalize_header(name).replace("_", "") for name in exclude}
+            keys = values.index.map(lambda name: normalize_header(name).replace("_", ""))
+            values = values[~keys.isin(excluded)]
+        return values.nlargest(k)
+
+    @memoized
+    def series(self, table: str, metric: str, industry=None, years=None):
+        """
+        Returns a metric over the survey years.
+
+        Args:
+            industry (str): One industry. None returns every industry.
+            years (list): Only these years.
+
+        Returns:
+            pd.Series | pd.DataFrame: A series by year for one industry, or a
+            frame of years by industries.
+        """
+        values = self.values(table, metric, years)
+        if industry is not None:
+            return values.xs(industry, level="industry").rename(industry)
+        return values.unstack("industry")
+
+    @memoized
+    def join(self, left: tuple, right: tuple, years=None, how: str = "inner") -> pd.DataFrame:
+        """
+        Lines up two metrics, possibly of different tables, by year and industry.
+
+        Example:
+            query.join(("research_expense", "rd_expense_total"), ("patent_count", "patents_owned"))
+
+        Args:
+            left (tuple): (table, metric).
+            right (tuple): (table, metric).
+            years (list): Only these years.
+            how (str): The pandas join type ("inner", "outer", "left", "right").
+
+        Returns:
+            pd.DataFrame: Indexed by (year, industry), one column per metric.
+        """
+        columns = []
+        for table, metric in (left, right):
+            values = self.values(table, metric, years)
+            name = metric if left[1] != right[1] else f"{table}.{metric}"
+            columns.append(values.rename(name))
+        return columns[0].to_frame().join(columns[1], how=how).sort_index()
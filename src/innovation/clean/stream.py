@@ -0,0 +1,182 @@
+"""
+Streaming cleaning: sheets are read row by row and cleaned in batches of rows.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from ..config import STREAM_BATCH_ROWS
+from .layout import SheetLayout, apply_rows, build_header, column_names
+from .normalize import ID_COLUMNS, parse_values
+from .workbook import WorkbookReader
+
+# Cell strings pd.read_excel reads as missing values
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>", "N/A",
+    "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+def is_missing(value) -> bool:
+    if isinstance(value, str):
+        return value in NA_STRINGS
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+def sheet_rows(path: str, sheet=0):
+    """
+    Returns a callable that iterates over the raw rows of a sheet. The workbook is
+    opened for each pass and closed after it, so no handle is held between passes.
+    """
+    def rows():
+        with WorkbookReader(path) as reader:
+            yield from reader.iter_rows(sheet)
+    return rows
+
+class SheetStream:
+    """
+    Cleans one sheet with its layout in batches of rows, so that memory is bounded
+    by the batch size instead of the size of the sheet.
+
+    The batches hold the rows apply_layout and normalize_frame produce for the
+    whole sheet, with the same columns, index and values. The rows are read in
+    three passes:
+
+    1. scan: the width of the sheet and the columns with data, which
+       drop_empty_columns needs before the first row can be cleaned.
+    2. profile: the values of the label columns (the industry labels among
+       them) and, for each value column, whether it holds text or only
+       integers, so that every batch gets the same dtypes.
+    3. batches: the typed batches. Label columns are categorical, like in
+       normalize_frame, with the same categories in every batch; value columns
+       with text are strings, the others Int64 or Float64.
+    """
+    def __init__(self, rows, layout: SheetLayout, batch_size=STREAM_BATCH_ROWS):
+        """
+        Args:
+            rows (callable): Returns a new iterator over the raw rows of the sheet, see sheet_rows.
+            layout (SheetLayout): The layout of the sheet.
+            batch_size (int): Data rows per batch.
+        """
+        self.rows = rows
+        self.layout = layout
+        self.batch_size = batch_size
+        self.width = None
+        self.filled = None
+        self.labels = None
+        self.categories = None
+        self.dtypes = None
+
+    @property
+    def header_rows(self) -> int:
+        """
+        The number of rows pd.read_excel takes as the column names with layout.read_header.
+        """
+        read_header = self.layout.read_header
+        return max(read_header) + 1 if isinstance(read_header, (list, tuple)) else read_header + 1
+
+    def scan(self):
+        """
+        Pass 1: finds the width of the sheet and which columns have data.
+        """
+        width, filled = 0, set()
+        for i, row in enumerate(self.rows()):
+            width = max(width, len(row))
+            if i >= self.header_rows:
+                filled.update(j for j, value in enumerate(row) if not is_missing(value))
+        self.width, self.filled = width, filled
+
+    def raw_batches(self):
+        """
+        Yields the data rows cleaned by the layout, in batches, with their cells untyped.
+        """
+        if self.width is None:
+            self.scan()
+        layout = self.layout
+        columns = [j for j in range(self.width) if not layout.drop_empty_columns or j in self.filled]
+        columns = [j for k, j in enumerate(columns) if k not in layout.drop_columns]
+        header, names, carry = [], None, None
+        index, batch = [], []
+        position, yielded = 0, False
+        for i, row in enumerate(self.rows()):
+            if i < self.header_rows:
+                continue
+            cells = [None if is_missing(value) else value for value in row]
+            cells.extend([None] * (self.width - len(cells)))
+            if layout.drop_empty_rows and all(value is None for value in cells):
+                continue
+            position += 1
+            offset = position - 1 - layout.skip_rows
+            if offset < 0:
+                continue
+            cells = [cells[j] for j in columns]
+            if layout.strip_whitespace:
+                cells = [re.sub(r"\s+", "", value) if isinstance(value, str) else value for value in cells]
+            if offset < layout.header.rows:
+                header.append(cells)
+            if offset < layout.data_start:
+                continue
+            if names is None:
+                names = self.column_names(header, len(columns))
+            index.append(offset - layout.data_start if layout.reset_index else i - self.header_rows)
+            batch.append(cells)
+            if len(batch) == self.batch_size:
+                df, carry = apply_rows(self.frame(batch, index, names), layout, carry)
+                yield df
+                index, batch, yielded = [], [], True
+        if batch or not yielded:
+            # The last rows, or an empty batch with the columns of a sheet without data rows
+            names = names or self.column_names(header, len(columns))
+            df, carry = apply_rows(self.frame(batch, index, names), layout, carry)
+            yield df
+
+    @staticmethod
+    def frame(batch: list, index: list, names: list) -> pd.DataFrame:
+        return pd.DataFrame(batch, index=index, columns=range(len(names)), dtype=object).set_axis(names, axis=1)
+
+    def column_names(self, header: list, n_columns: int) -> list:
+        rows = pd.DataFrame(header, columns=range(n_columns), dtype=object)
+        return column_names(build_header(rows, self.layout.header), self.layout)
+
+    def profile(self):
+        """
+        Pass 2: collects the values of the label columns and the dtype of each value column.
+        """
+        categories, has_text, integral, names = {}, None, None, []
+        for df in self.raw_batches():
+            names = list(df.columns)
+            for position in np.flatnonzero(df.columns.isin(ID_COLUMNS)):
+                categories.setdefault(position, {}).update(dict.fromkeys(df.iloc[:, position].dropna()))
+            numbers, unparsed = parse_values(df.loc[:, ~df.columns.isin(ID_COLUMNS)])
+            present = np.where(np.isnan(numbers), 0, numbers)
+            whole = (present == np.floor(present)).all(axis=1)
+            has_text = unparsed if has_text is None else has_text | unparsed
+            integral = whole if integral is None else integral & whole
+        self.categories = {position: pd.CategoricalDtype(list(values)) for position, values in categories.items()}
+        self.labels = categories[names.index("産業")] if "産業" in names else {}
+        self.dtypes = ["string" if text else "Int64" if whole else "Float64" for text, whole in zip(has_text, integral)]
+
+    def batches(self):
+        """
+        Pass 3: yields the cleaned, typed batches.
+        """
+        if self.dtypes is None:
+            self.profile()
+        for df in self.raw_batches():
+            is_id = df.columns.isin(ID_COLUMNS)
+            value_positions = np.flatnonzero(~is_id)
+            numbers, _ = parse_values(df.iloc[:, value_positions])
+            columns = []
+            for position in range(df.shape[1]):
+                column = df.iloc[:, position]
+                if is_id[position]:
+                    column = column.astype(self.categories[position])
+                else:
+                    k = np.searchsorted(value_positions, position)
+                    dtype = self.dtypes[k]
+                    if dtype != "string":
+                        column = pd.Series(numbers[k], index=df.index)
+                    column = column.astype(dtype)
+                columns.append(column.rename(df.columns[position]))
+            typed = pd.concat(columns, axis=1) if columns else df
+            typed.columns = df.columns
+            yield typed
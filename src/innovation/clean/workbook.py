@@ -0,0 +1,163 @@
+"""
+Workbook reading: one open handle per file, shared by all reads of it.
+"""
+import io
+import os
+import threading
+
+import pandas as pd
+
+class WorkbookReader:
+    """
+    Opens a workbook once and reads its sheets from the open handle.
+
+    The engine is picked once from the file extension (xlrd for .xls, openpyxl
+    otherwise) with a fallback to the other engine. .xls workbooks are opened
+    on demand, so only the sheets that are read get parsed.
+
+    The workbook can also be given as the bytes of the file, with its extension
+    in `ext`; it is then read from memory.
+    """
+    def __init__(self, path, ext=None, name=None):
+        self.source = path
+        self.path = path if isinstance(path, str) else name or f"<memory {ext or ''}>"
+        ext = (ext or os.path.splitext(self.path)[1]).lower()
+        self.engines = ['xlrd', 'openpyxl'] if ext == '.xls' else ['openpyxl', 'xlrd']
+        self.engine = None
+        self._book = None
+
+    @property
+    def book(self) -> pd.ExcelFile:
+        """
+        The open workbook. Opened on first use.
+        """
+        if self._book is None:
+            error = None
+            for engine in self.engines:
+                try:
+                    engine_kwargs = {'on_demand': True} if engine == 'xlrd' else None
+                    source = self.source if isinstance(self.source, str) else io.BytesIO(self.source)
+                    self._book = pd.ExcelFile(source, engine=engine, engine_kwargs=engine_kwargs)
+                    self.engine = engine
+                    break
+                except Exception as e:
+                    error = e
+            else:
+                raise error
+        return self._book
+
+    @property
+    def sheet_names(self) -> list:
+        return self.book.sheet_names
+
+    def read(self, sheet=0, **kwargs) -> pd.DataFrame:
+        """
+        Reads one sheet from the open workbook.
+
+        Args:
+            sheet (str | int): The sheet name or position.
+            **kwargs: Passed on to pd.ExcelFile.parse (header, skiprows, ...).
+
+        Returns:
+            pd.DataFrame: The sheet.
+        """
+        return self.book.parse(sheet, **kwargs)
+
+    def iter_rows(self, sheet=0):
+        """
+        Reads one sheet row by row, without loading it into a DataFrame.
+
+        .xlsx sheets are streamed from the read-only openpyxl workbook; .xls
+        sheets come from xlrd, which parses one sheet at a time. Cells are
+        converted like pd.ExcelFile.parse converts them: integral numbers become
+        int, error cells NaN and empty cells "". Like pandas, trailing empty
+        cells and rows of an .xlsx sheet are dropped.
+
+        Args:
+            sheet (str | int): The sheet name or position.
+
+        Yields:
+            list: The cell values of one row.
+        """
+        book = self.book.book
+        if self.engine == 'xlrd':
+            import xlrd
+
+            ws = book.sheet_by_name(sheet) if isinstance(sheet, str) else book.sheet_by_index(sheet)
+            for i in range(ws.nrows):
+                row = []
+                for cell in ws.row(i):
+                    value = cell.value
+                    if cell.ctype == xlrd.XL_CELL_DATE:
+                        value = xlrd.xldate.xldate_as_datetime(value, book.datemode)
+                    elif cell.ctype == xlrd.XL_CELL_ERROR:
+                        value = float("nan")
+                    elif cell.ctype == xlrd.XL_CELL_BOOLEAN:
+                        value = bool(value)
+                    elif cell.ctype == xlrd.XL_CELL_NUMBER and int(value) == value:
+                        value = int(value)
+                    row.append(value)
+                yield row
+            return
+
+        from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+        ws = book[sheet] if isinstance(sheet, str) else book.worksheets[sheet]
+        if book.read_only:
+            ws.reset_dimensions()
+        empty_rows = 0
+        for cells in ws.rows:
+            row = []
+            for cell in cells:
+                value = cell.value
+                if value is None:
+                    value = ""
+                elif cell.data_type == TYPE_ERROR:
+                    value = float("nan")
+                elif cell.data_type == TYPE_NUMERIC and int(value) == value:
+                    value = int(value)
+                row.append(value)
+            while row and row[-1] == "":
+                row.pop()
+            if not row:
+                empty_rows += 1
+                continue
+            # Empty rows are only kept when a row with data follows
+            for _ in range(empty_rows):
+                yield []
+            empty_rows = 0
+            yield row
+
+    def close(self):
+        if self._book is not None:
+            self._book.close()
+            self._book = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Workbooks opened in this process, keyed by (path, mtime)
+OPEN_WORKBOOKS = {}
+OPEN_WORKBOOKS_LOCK = threading.Lock()
+
+def open_workbook(path) -> WorkbookReader:
+    """
+    Returns a WorkbookReader for a file, shared by all reads of the file in this process.
+    """
+    key = (path, os.path.getmtime(path))
+    with OPEN_WORKBOOKS_LOCK:
+        if key not in OPEN_WORKBOOKS:
+            OPEN_WORKBOOKS[key] = WorkbookReader(path)
+        return OPEN_WORKBOOKS[key]
+
+def close_workbooks(paths=None):
+    """
+    Closes the workbooks opened with open_workbook, or only those of the given paths.
+    """
+    with OPEN_WORKBOOKS_LOCK:
+        for key in list(OPEN_WORKBOOKS):
+            if paths is None or key[0] in paths:
+                OPEN_WORKBOOKS.pop(key).close()
@@ -0,0 +1,150 @@
+"""
+The command line: `python -m innovation <command>`, or `python src/main.py <command>`.
+
+    scrape   scrape the listing pages and download the workbooks
+    clean    clean the downloaded tables into table files and panels
+    plot     render the charts
+    run      run the whole pipeline, or the stages given (the default command)
+    report   sum up a run report
+
+Each command imports what it needs when it runs: --help and `scrape` start
+without loading pandas, `clean` without loading requests.
+"""
+import argparse
+import os
+import sys
+
+from .config import (
+    DOWNLOAD_DIR, EXPORT_FORMAT, MIN_REQUEST_INTERVAL, SPILL_THRESHOLD, STREAM_BATCH_ROWS, SURVEY_YEARS, TABLE_TARGETS,
+    listing_urls,
+)
+
+# The pipeline stages run by the scrape, clean and plot commands
+COMMAND_STAGES = {
+    "scrape": ["listings", "download"],
+    "clean": ["clean", "panel"],
+    "plot": ["charts"],
+}
+COMMANDS = (*COMMAND_STAGES, "run", "report")
+
+def pipeline_options() -> argparse.ArgumentParser:
+    """
+    Returns the options shared by the pipeline commands.
+    """
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument("--table", action="append", choices=list(TABLE_TARGETS), help="Only this table (repeatable).")
+    options.add_argument("--year", action="append", type=int, help="Only this survey year (repeatable).")
+    options.add_argument("--force", action="store_true", help="Run the stages even if their inputs are unchanged.")
+    options.add_argument("--workers", type=int, default=1, help="Worker threads/processes per stage.")
+    options.add_argument("--download-dir", default=DOWNLOAD_DIR, help="Where the workbooks are downloaded.")
+    options.add_argument("--format", choices=["csv", "parquet", "feather"], default=EXPORT_FORMAT,
+                         help="The format of the cleaned table files (with a schema.json of their dtypes).")
+    options.add_argument("--min-interval", type=float, default=MIN_REQUEST_INTERVAL,
+                         help="Minimum seconds between two requests of the scraper to one host (0: no limit).")
+    options.add_argument("--resume", action="store_true",
+                         help="Continue an interrupted scrape: skip the listing pages and downloads it finished.")
+    options.add_argument("--record", metavar="DIR",
+                         help="Record the scraper's HTTP responses into this cassette directory.")
+    options.add_argument("--replay", metavar="DIR",
+                         help="Answer the scraper's HTTP requests from this cassette directory, without a network.")
+    options.add_argument("--report", help="Append per-call metrics of this run to a JSON-lines file.")
+    options.add_argument("--profile", choices=["cprofile", "pyinstrument"], help="Profile the measured calls (with --report).")
+    options.add_argument("--profile-stage", action="append", help="Only profile this stage (repeatable), "
+                         "e.g. download, clean, chart, pipeline:clean:patent_count.")
+    options.add_argument("--profile-dir", default="profiles", help="Where the profiles are written.")
+    return options
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="innovation",
+                                     description="Scrape, clean and plot the e-Stat innovation survey tables.")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    options = pipeline_options()
+    for name, description in (
+        ("scrape", "Scrape the listing pages and download the workbooks."),
+        ("clean", "Clean the downloaded tables into table files and long-format panels."),
+        ("plot", "Render the charts of the cleaned tables."),
+    ):
+        command = commands.add_parser(name, parents=[options], help=description, description=description)
+        command.add_argument("--with-deps", action="store_true",
+                             help="Also run the stages this command depends on (e.g. download before clean).")
+        if name == "clean":
+            command.add_argument("--stream", action="store_true",
+                                 help="Clean the workbooks row by row in batches, with memory bounded by the batch "
+                                 "size. Writes the table files only, not the panels.")
+            command.add_argument("--batch-rows", type=int, default=STREAM_BATCH_ROWS,
+                                 help="With --stream, data rows per batch.")
+
+    run = commands.add_parser("run", parents=[options], help="Run the pipeline (the default command).",
+                              description="Run the pipeline, or only some of its stages.")
+    run.add_argument("stages", nargs="*", help="Stages to run: listings, download, clean, clean:<table>, "
+                     "panel, charts. Runs every stage by default.")
+    run.add_argument("--no-deps", action="store_true", help="Do not run the stages the targets depend on.")
+    run.add_argument("--in-memory", action="store_true",
+                     help="Clean the downloads from memory instead of saving the workbooks first.")
+    run.add_argument("--spill-mb", type=float, default=SPILL_THRESHOLD / 2**20,
+                     help="With --in-memory, save downloads larger than this (MB) to disk.")
+
+    report = commands.add_parser("report", help="Sum up a run report by stage.",
+                                 description="Sum up a run report by stage.")
+    report.add_argument("path", help="The JSON-lines report.")
+    report.add_argument("--run-id", help="The run to sum up. Defaults to the last run in the file.")
+    return parser
+
+def run_pipeline(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """
+    Runs the stages of a scrape, clean, plot or run command.
+    """
+    from .pipeline import Pipeline
+    from .report import RUN_REPORT, summarize_report
+
+    if args.report:
+        RUN_REPORT.configure(args.report, args.profile, args.profile_dir, args.profile_stage)
+
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be used together")
+    if args.record and args.resume:
+        parser.error("--record and --resume cannot be used together: a resumed scrape skips the requests to record")
+    if args.replay and not os.path.isdir(args.replay):
+        parser.error(f"no cassette directory {args.replay!r} to replay: record it first with --record")
+    transport = "record" if args.record else "replay" if args.replay else "live"
+    pipeline = Pipeline(
+        listing_urls(), SURVEY_YEARS, args.download_dir, max_workers=args.workers, tables=args.table,
+        run_years=args.year, resume=args.resume, export_format=args.format, transport=transport,
+        cassette_dir=args.record or args.replay, min_interval=args.min_interval,
+    )
+    if args.command == "run" and args.in_memory:
+        pipeline.run_in_memory(int(args.spill_mb * 2**20))
+    elif args.command == "clean" and args.stream:
+        for table in pipeline.tables:
+            paths = pipeline.cleaner.stream_table(table, pipeline.run_years, args.format, args.batch_rows)
+            print(f"  {table}: {len(paths)} file(s)")
+    else:
+        if args.command == "run":
+            targets, with_deps = args.stages or None, not args.no_deps
+        else:
+            targets, with_deps = COMMAND_STAGES[args.command], args.with_deps
+        try:
+            report = pipeline.run(targets, force=args.force, with_deps=with_deps)
+        except KeyError as e:
+            parser.error(e.args[0])
+        print("\n".join(f"  {name}: {status}" for name, status in report.items()))
+    if args.report:
+        print(f"\nRun report ({args.report}):")
+        print(summarize_report(args.report).to_string())
+
+def show_report(args: argparse.Namespace):
+    from .report import summarize_report
+
+    print(summarize_report(args.path, args.run_id).to_string())
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Without a command, e.g. `main.py clean:patent_count --year 2020`, the arguments are those of `run`
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["run", *argv]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "report":
+        show_report(args)
+    else:
+        run_pipeline(parser, args)
@@ -0,0 +1,64 @@
+"""
+Paths, tables and listing pages shared by the scrape, clean and plot steps.
+"""
+
+# Downloaded workbooks, relative to the working directory. Created on first use, not at import.
+DOWNLOAD_DIR = "downloads"
+
+# The part of each table's name that identifies its files, and where its CSVs go
+TABLE_TARGETS = {
+    "labor_number": "産業別、売上高経常利益率別常時従業者数",
+    "research_expense": "研究開発費及び売上高比率、受託研究費、研究開発投資、能力開発費",
+    "patent_count": "産業別、企業数、特許権、実用新案権、意匠権別",
+}
+TABLE_OUTPUT_DIRS = {
+    "labor_number": "data/産業別、売上高経常利益率別常時従業者数",
+    "research_expense": "data/研究開発費",
+    "patent_count": "data/特許件数",
+}
+TABLE_ATTRIBUTES = {
+    "labor_number": "LaborNumberDict",
+    "research_expense": "ResearchExpenseDict",
+    "patent_count": "PatentCountDict",
+}
+
+def table_for_name(table_name: str):
+    """
+    Returns the TABLE_TARGETS key of a downloaded table's name, or None if it is not cleaned.
+    """
+    for table, target_str in TABLE_TARGETS.items():
+        if target_str in table_name:
+            return table
+    return None
+
+# Minimum seconds between two requests of the scraper to one host
+MIN_REQUEST_INTERVAL = 0.5
+# Downloads larger than this are written to disk in the in-memory mode
+SPILL_THRESHOLD = 64 * 1024 * 1024
+# Data rows per cleaned batch in the streaming clean mode
+STREAM_BATCH_ROWS = 5000
+# Format of the cleaned table files: "csv", "parquet" or "feather" (see innovation.clean.export)
+EXPORT_FORMAT = "csv"
+# Compression codec and maximum rows per row group of the Parquet table files
+PARQUET_COMPRESSION = "zstd"
+PARQUET_ROW_GROUP_ROWS = 64 * 1024
+
+# e-Stat listing pages of the survey, one per year of SURVEY_YEARS
+LISTING_BASE_URL = "https://www.e-stat.go.jp/stat-search/files?page=1&layout=datalist&toukei=00550100&kikan=00550&tstat=000001010832&cycle=7&tclass1=000001023579&tclass2="
+LISTING_IDS = [
+    "000001218360", "000001206520", "000001166746", "000001152686",
+    "000001141607", "000001131164", "000001117016", "000001105035",
+    "000001086216", "000001079305", "000001079316", "000001079315",
+    "000001075665", "000001045865", "000001041347", "000001041186",
+    "000001023580", "000001023590", "000001079335", "000001079317",
+    "000001079296", "000001079336", "000001079355", "000001079337",
+    "000001079356", "000001079297", "000001079298", "000001079299",
+    "000001079300", "000001079357",
+]
+SURVEY_YEARS = list(range(2023, 1991, -1))
+
+def listing_urls() -> list:
+    """
+    Returns the URLs of the listing pages, in the order of SURVEY_YEARS.
+    """
+    return [f"{LISTING_BASE_URL}{listing_id}&tclass3val=0" for listing_id in LISTING_IDS]
@@ -0,0 +1,29 @@
+"""
+Lazy re-exports for the package __init__ modules.
+"""
+import importlib
+
+def lazy_exports(package: str, exports: dict):
+    """
+    Builds the module __getattr__ and __dir__ of a package whose names are imported on first use.
+
+    Args:
+        package (str): The package's __name__.
+        exports (dict): Submodule (relative, e.g. ".scraper") -> the names it exports.
+
+    Returns:
+        tuple: (__getattr__, __dir__, __all__) for the package module.
+    """
+    modules = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name):
+        if name not in modules:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(modules[name], package), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(importlib.import_module(package))) | set(modules))
+
+    return __getattr__, __dir__, list(modules)
@@ -0,0 +1,424 @@
+"""
+The scrape → download → clean → panel / charts pipeline.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+
+from .config import (
+    DOWNLOAD_DIR, EXPORT_FORMAT, MIN_REQUEST_INTERVAL, SPILL_THRESHOLD, TABLE_OUTPUT_DIRS, TABLE_TARGETS, table_for_name,
+)
+from .report import RUN_REPORT
+from .scrape.listing import url_extension
+from .scrape.manifest import DownloadManifest, canonical_files
+
+# Pipeline bookkeeping, kept next to the downloads
+LISTINGS_FILENAME = "listings.json"
+PIPELINE_STATE_FILENAME = ".pipeline_state.json"
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of the pipeline.
+
+    `inputs(pipeline)` returns JSON-serializable values the stage's result depends
+    on and `outputs(pipeline)` the paths it writes. A stage is skipped when the
+    fingerprint of its inputs matches its last successful run and all its outputs
+    exist. `tables` names the tables the stage works on, for --table filtering.
+    An `always` stage runs on every run: its inputs cannot tell whether the remote
+    data changed, so it revalidates it instead (see DataScraper).
+    """
+    name: str
+    run: object = field(repr=False)
+    inputs: object = field(repr=False)
+    outputs: object = field(repr=False)
+    deps: tuple = ()
+    tables: tuple = ()
+    always: bool = False
+
+class Pipeline:
+    """
+    Runs the scrape → download → clean → panel / charts stages as a small DAG.
+
+    Independent stages (the three table cleaners, then the panel and the charts)
+    run concurrently in threads. A run can be restricted to some tables and years;
+    such runs keep their own fingerprints.
+
+    The scraper and the cleaner are created on first use, so a run that only
+    downloads does not import pandas and one that only cleans does not import requests.
+    With `resume`, an interrupted scrape continues from the scraper's journal.
+    `transport` and `cassette_dir` record the scraper's responses or replay them
+    offline (see DataScraper), and `min_interval` spaces the scraper's requests to one host.
+    The cleaned tables are written in `export_format` (see innovation.clean.export).
+    """
+    def __init__(self, base_urls, years, download_dir=DOWNLOAD_DIR, font_path='/Library/Fonts/Arial Unicode.ttf',
+                 use_cache=True, max_workers=1, tables=None, run_years=None, resume=False, export_format=EXPORT_FORMAT,
+                 transport="live", cassette_dir=None, min_interval=MIN_REQUEST_INTERVAL):
+        self.base_urls = base_urls
+        self.years = years
+        self.download_dir = download_dir
+        self.font_path = font_path
+        self.use_cache = use_cache
+        self.max_workers = max_workers
+        self.tables = list(tables) if tables else list(TABLE_TARGETS)
+        self.run_years = sorted(run_years) if run_years else None
+        self.resume = resume
+        self.export_format = export_format
+        self.transport = transport
+        self.cassette_dir = cassette_dir
+        self.min_interval = min_interval
+        os.makedirs(download_dir, exist_ok=True)
+        self._scraper = None
+        self._cleaner = None
+        self.state_path = os.path.join(download_dir, PIPELINE_STATE_FILENAME)
+        self.listings_path = os.path.join(download_dir, LISTINGS_FILENAME)
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        self.lock = threading.Lock()
+        self.table_locks = {table: threading.Lock() for table in TABLE_TARGETS}
+        self.frames = {}
+        self.forced = set()
+        self.stages = self.build_stages()
+
+    @property
+    def scraper(self):
+        """
+        The DataScraper of the run. Created on first use.
+        """
+        with self.lock:
+            if self._scraper is None:
+                from .scrape.scraper import DataScraper
+
+                cassette = {"cassette_dir": self.cassette_dir} if self.cassette_dir else {}
+                self._scraper = DataScraper(
+                    self.base_urls, self.download_dir, self.years, max_workers=self.max_workers, resume=self.resume,
+                    min_interval=self.min_interval, transport=self.transport, **cassette,
+                )
+            return self._scraper
+
+    @property
+    def cleaner(self):
+        """
+        The DataCleaner of the run. Created on first use.
+        """
+        with self.lock:
+            if self._cleaner is None:
+                from .clean.cleaners import DataCleaner
+
+                self._cleaner = DataCleaner(
+                    self.download_dir, self.font_path, self.use_cache, self.max_workers, self.export_format,
+                )
+            return self._cleaner
+
+    def build_stages(self) -> dict:
+        """
+        Declares the stages and their dependencies.
+        """
+        clean_stages = [
+            Stage(
+                f"clean:{table}", functools.partial(Pipeline.run_clean, table=table),
+                functools.partial(Pipeline.clean_inputs, table=table),
+                functools.partial(Pipeline.clean_outputs, table=table),
+                deps=("download",), tables=(table,),
+            )
+            for table in TABLE_TARGETS
+        ]
+        stages = [
+            # The listing pages and the files can change on the server: the download manifest's
+            # ETag / Last-Modified checks keep unchanged files from being downloaded again
+            Stage("listings", Pipeline.run_listings, Pipeline.listings_inputs, lambda p: [p.listings_path],
+                  always=True),
+            Stage("download", Pipeline.run_download, Pipeline.download_inputs, Pipeline.download_outputs,
+                  deps=("listings",), always=True),
+            *clean_stages,
+            Stage("panel", Pipeline.run_panel, Pipeline.panel_inputs, Pipeline.panel_outputs,
+                  deps=tuple(stage.name for stage in clean_stages), tables=tuple(TABLE_TARGETS)),
+            Stage("charts", Pipeline.run_charts, Pipeline.charts_inputs, Pipeline.charts_outputs,
+                  deps=("clean:research_expense", "clean:patent_count"), tables=("research_expense", "patent_count")),
+        ]
+        return {stage.name: stage for stage in stages}
+
+    def select(self, targets=None, with_deps=True) -> list:
+        """
+        Returns the stages to run, in declaration order.
+
+        Args:
+            targets (list): Stage names, or "clean" for every clean stage. None selects all stages.
+            with_deps (bool): Also select the stages the targets depend on.
+        """
+        names = set()
+        for target in targets or self.stages:
+            matches = [name for name in self.stages if name == target or name.split(":")[0] == target]
+            if not matches:
+                raise KeyError(f"Unknown stage {target!r}. Stages: {', '.join(self.stages)}")
+            names.update(matches)
+        if with_deps:
+            queue = list(names)
+            while queue:
+                for dep in self.stages[queue.pop()].deps:
+                    if dep not in names:
+                        names.add(dep)
+                        queue.append(dep)
+        names = {
+            name for name in names
+            if not self.stages[name].tables or set(self.stages[name].tables) & set(self.tables)
+        }
+        return [name for name in self.stages if name in names]
+
+    def run(self, targets=None, force=False, with_deps=True) -> dict:
+        """
+        Runs the selected stages, each as soon as its dependencies have finished.
+
+        A failed stage is reported and the stages depending on it are not run.
+        `force` reruns the targets themselves; their dependencies still skip when unchanged.
+
+        Returns:
+            dict: {stage name: "ran", "skipped", "failed" or "blocked"}
+        """
+        selected = self.select(targets, with_deps)
+        self.forced = set(self.select(targets, with_deps=False)) if force else set()
+        pending, running, report = list(selected), {}, {}
+        with ThreadPoolExecutor(max_workers=max(len(selected), 1)) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = [dep for dep in self.stages[name].deps if dep in selected]
+                    if any(report.get(dep) in ("failed", "blocked") for dep in deps):
+                        pending.remove(name)
+                        report[name] = "blocked"
+                        print(f"✗ {name}: not run, a dependency failed")
+                    elif all(report.get(dep) in ("ran", "skipped") for dep in deps):
+                        pending.remove(name)
+                        running[pool.submit(self.run_stage, name, name in self.forced)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        report[name] = future.result()
+                    except Exception as e:
+                        print(f"Error in stage {name}: {e!r}")
+                        report[name] = "failed"
+        return report
+
+    def run_stage(self, name: str, force=False) -> str:
+        """
+        Runs one stage unless its fingerprint and outputs are unchanged.
+        """
+        stage = self.stages[name]
+        fingerprint = self.fingerprint(stage)
+        outputs = stage.outputs(self)
+        unchanged = self.state.get(self.state_key(name)) == fingerprint
+        if not force and not stage.always and unchanged and all(p and os.path.exists(p) for p in outputs):
+            print(f"= {name}: unchanged, skipped")
+            RUN_REPORT.record(f"pipeline:{name}", result="skipped")
+            return "skipped"
+        print(f"▶ {name}")
+        start = time.perf_counter()
+        with RUN_REPORT.measure(f"pipeline:{name}"):
+            stage.run(self)
+        with self.lock:
+            self.state[self.state_key(name)] = fingerprint
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, indent=1)
+            os.replace(tmp_path, self.state_path)
+        print(f"✓ {name} ({time.perf_counter() - start:.1f} s)")
+        return "ran"
+
+    def state_key(self, name: str) -> str:
+        """
+        Returns the key of a stage's fingerprint in the state file. Runs restricted
+        to some tables or years keep their own entries, so they do not invalidate
+        the fingerprints of a full run.
+        """
+        scope = []
+        if self.tables != list(TABLE_TARGETS):
+            scope.append("tables=" + ",".join(sorted(self.tables)))
+        if self.run_years is not None:
+            scope.append("years=" + ",".join(map(str, self.run_years)))
+        return f"{name}[{';'.join(scope)}]" if scope else name
+
+    def fingerprint(self, stage: Stage) -> str:
+        """
+        Hashes a stage's inputs.
+        """
+        payload = stage.inputs(self)
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode()).hexdigest()
+
+    def table_frames(self, table: str) -> dict:
+        """
+        Returns the cleaned frames of a table, cleaning (or loading from the frame cache) once per run.
+        """
+        with self.table_locks[table]:
+            if table not in self.frames:
+                self.frames[table] = self.cleaner.load_table(table, self.run_years)
+            return self.frames[table]
+
+    def selected_pages(self) -> list:
+        return [
+            i for i in range(len(self.base_urls))
+            if self.run_years is None or (i < len(self.years) and int(self.years[i]) in self.run_years)
+        ]
+
+    def load_listings(self) -> dict:
+        if not os.path.exists(self.listings_path):
+            return {}
+        with open(self.listings_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def run_in_memory(self, spill_threshold=SPILL_THRESHOLD):
+        """
+        Scrapes, downloads and cleans without saving the workbooks: each download is
+        kept in memory and handed straight to its table's cleaner. Downloads larger
+        than spill_threshold bytes are saved to disk as usual and cleaned from there.
+        Then writes the table files, the panels and the charts.
+        """
+        listings = self.scraper.scrape_listings(self.selected_pages())
+        jobs = [
+            (url, table_name, year) for year, items in listings for url, table_name in items
+            if table_for_name(table_name) in self.tables
+        ]
+        print(f"  → Found {len(jobs)} EXCEL links")
+
+        def downloads():
+            with ThreadPoolExecutor(max_workers=self.scraper.max_workers) as pool:
+                futures = {pool.submit(self.scraper.fetch, *job, spill_threshold): job for job in jobs}
+                for future in as_completed(futures):
+                    url, table_name, year = futures[future]
+                    yield table_name, year, future.result(), url_extension(url)
+
+        frames = self.cleaner.clean_sources(downloads())
+        for table in self.tables:
+            self.frames[table] = frames[table]
+        self.cleaner.save_tables(self.tables)
+        self.run_panel()
+        self.run_charts()
+
+    # Stage: listings
+    def listings_inputs(self):
+        return [[self.scraper.base_urls[i], self.scraper.year_for_page(i)] for i in self.selected_pages()]
+
+    def run_listings(self):
+        listings = self.load_listings()
+        for year, items in self.scraper.scrape_listings(self.selected_pages()):
+            if items:
+                listings[year] = [list(item) for item in items]
+        tmp_path = self.listings_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(listings, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.listings_path)
+
+    # Stage: download
+    def download_jobs(self) -> list:
+        jobs = []
+        for year, items in self.load_listings().items():
+            if self.run_years is not None and (not year or int(year) not in self.run_years):
+                continue
+            for url, table_name in items:
+                if self.tables == list(TABLE_TARGETS) or table_for_name(table_name) in self.tables:
+                    jobs.append((url, table_name, year))
+        return jobs
+
+    def download_inputs(self):
+        return self.download_jobs()
+
+    def download_outputs(self):
+        manifest = DownloadManifest(self.download_dir)
+        paths = []
+        for url, _, _ in self.download_jobs():
+            entry = manifest.get(url)
+            paths.append(os.path.join(self.download_dir, entry["filename"]) if entry else None)
+        return paths
+
+    def run_download(self):
+        self.scraper.download_all(self.download_jobs())
+
+    # Stages: clean:<table>
+    def clean_files(self, table: str) -> dict:
+        files = canonical_files(self.download_dir, TABLE_TARGETS[table])
+        return {year: name for year, name in files.items() if self.run_years is None or year in self.run_years}
+
+    def clean_inputs(self, table: str):
+        from .clean.cache import file_sha256, source_version
+        from .clean.cleaners import LAYOUT_ENGINE, BaseCleaner, DataCleaner, PatentCountCleaner, ResearchExpenseCleaner
+        from .clean.layout import get_layout
+
+        cleaner_classes = {
+            "labor_number": (DataCleaner,),
+            "research_expense": (BaseCleaner, ResearchExpenseCleaner),
+            "patent_count": (BaseCleaner, PatentCountCleaner),
+        }[table]
+        files = [
+            [year, name, file_sha256(os.path.join(self.download_dir, name)), repr(get_layout(table, year))]
+            for year, name in self.clean_files(table).items()
+        ]
+        return [source_version(*cleaner_classes, *LAYOUT_ENGINE), files]
+
+    def clean_outputs(self, table: str):
+        from .clean.export import EXPORT_FORMATS
+
+        extension = EXPORT_FORMATS[self.export_format].extension
+        return [f"{TABLE_OUTPUT_DIRS[table]}/{year}{extension}" for year in self.clean_files(table)]
+
+    def run_clean(self, table: str):
+        with self.table_locks[table]:
+            self.frames.pop(table, None)
+        self.table_frames(table)
+        self.cleaner.save_tables([table])
+
+    # Stage: panel
+    def panel_inputs(self):
+        from .clean.cache import source_version
+        from .clean.metrics import MetricsEngine
+        from .clean.panel import PanelStore, build_panel
+
+        engine = MetricsEngine()
+        clean = [self.state.get(self.state_key(f"clean:{table}")) for table in self.tables]
+        return [source_version(build_panel, PanelStore), [engine.version(table) for table in self.tables], clean]
+
+    def panel_outputs(self):
+        from .clean.metrics import MetricsEngine
+        from .clean.panel import PanelStore
+
+        store = PanelStore()
+        return [store.path(table) for table in self.tables] + [MetricsEngine().state_path]
+
+    def run_panel(self):
+        from .clean.metrics import MetricsEngine
+        from .clean.panel import PanelStore, build_panel
+
+        store = PanelStore()
+        engine = MetricsEngine()
+        for table in self.tables:
+            frames = self.table_frames(table)
+            if frames:
+                panel = build_panel(table, frames)
+                store.write(table, panel)
+                # A run over some years updates their derived metrics from the whole stored panel
+                engine.update(table, store.read(table) if self.run_years else panel, self.run_years)
+
+    # Stage: charts
+    def charts_inputs(self):
+        from .plot.charts import CHART_SPECS, chart_code_version
+
+        code = [chart_code_version(spec.prepare) for spec in CHART_SPECS]
+        clean = [self.state.get(self.state_key(f"clean:{table}")) for table in ("research_expense", "patent_count")]
+        return [code, clean]
+
+    def charts_outputs(self):
+        from .plot.charts import PLOT_DIR, RENDER_MANIFEST_FILENAME, rendered_charts
+
+        return [os.path.join(PLOT_DIR, RENDER_MANIFEST_FILENAME), *rendered_charts(PLOT_DIR)]
+
+    def run_charts(self):
+        self.table_frames("research_expense")
+        self.table_frames("patent_count")
+        self.cleaner.render_charts(years=self.run_years, force="charts" in self.forced)
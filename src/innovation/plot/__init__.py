@@ -0,0 +1,11 @@
+"""
+Charts of the cleaned tables.
+"""
+from ..lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".charts": (
+        "CHART_SPECS", "PLOT_DIR", "RENDER_MANIFEST_FILENAME", "ChartJob", "ChartSpec", "chart_input_hash",
+        "load_render_manifest", "metric_column", "render_chart", "render_charts", "rendered_charts",
+    ),
+})
@@ -0,0 +1,299 @@
+"""
+Chart specs and batch rendering with matplotlib.
+"""
+import functools
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+import pandas as pd
+
+from ..clean.cache import source_version
+from ..clean.panel import canonical_metric
+from ..report import RUN_REPORT
+from ..tasks import run_tasks
+
+# Rendered charts go here, with a manifest of the input hash of each file
+PLOT_DIR = "plots"
+RENDER_MANIFEST_FILENAME = ".render_manifest.json"
+
+def metric_column(df: pd.DataFrame, table: str, metric: str) -> str:
+    """
+    Returns the column of df holding a canonical metric, whatever its header looks like that year.
+    """
+    for column in df.columns:
+        if canonical_metric(table, column) == metric:
+            return column
+    raise KeyError(metric)
+
+def ranked(df: pd.DataFrame, table: str, metric: str, n: int) -> pd.DataFrame:
+    """
+    Returns the n industries with the largest values of a metric, as (label, value) rows.
+    """
+    top = df.assign(value=df[metric_column(df, table, metric)].astype("float64")).nlargest(n, "value")
+    return pd.DataFrame({"label": top["産業"].astype(str).to_numpy(), "value": top["value"].to_numpy()})
+
+def top_rd_costs(frames: dict, year: int):
+    return ranked(frames[year].iloc[2:], "research_expense", "rd_expense_total", 10), {"year": year}
+
+def top_rd_sales_ratio(frames: dict, year: int):
+    return ranked(frames[year], "research_expense", "rd_sales_ratio", 10), {"year": year}
+
+def top_companies(frames: dict, year: int):
+    # Skip the first two rows (合計 and 総合計)
+    return ranked(frames[year].iloc[2:], "research_expense", "rd_companies", 10), {"year": year}
+
+def total_patents_owned(frames: dict, year=None):
+    years = [yr for yr in sorted(frames) if yr >= 2010]
+    totals = []
+    for yr in years:
+        df = frames[yr]
+        totals.append(df[metric_column(df, "patent_count", "patents_owned")].dropna().astype(int).sum())
+    return pd.DataFrame({"label": years, "value": totals}), {"first": years[0], "last": years[-1]}
+
+def top_patent_industries(frames: dict, year=None):
+    latest_year = max(frames)
+    df = frames[latest_year].iloc[2:]
+    owned = metric_column(df, "patent_count", "patents_owned")
+    df = df[["産業", owned]].dropna()
+    df[owned] = df[owned].astype(int)
+    df = df.sort_values(by=owned, ascending=False).head(5)
+    data = pd.DataFrame({"label": df["産業"].astype(str).to_numpy(), "value": df[owned].to_numpy()})
+    return data, {"year": latest_year}
+
+def patents_owned_vs_used(frames: dict, year: int):
+    df = frames[year].iloc[2:]
+    owned = metric_column(df, "patent_count", "patents_owned")
+    used = metric_column(df, "patent_count", "patents_used")
+    df = df[["産業", owned, used]].dropna()
+    df = df.astype({owned: int, used: int}).sort_values(by=owned, ascending=False).head(5)
+    data = pd.DataFrame({
+        "label": df["産業"].astype(str).to_numpy(), "value": df[owned].to_numpy(), "value2": df[used].to_numpy(),
+    })
+    return data, {"year": year}
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """
+    One chart: where its data comes from and how it is drawn.
+
+    `prepare(frames, year)` gets the cleaned frames of `table` by year and returns
+    (data, labels). data has a "label" column and one value column per series
+    ("value", "value2"); labels fills the {year}, {first} and {last} fields of
+    `filename` and `title`. Charts with `per_year=False` are drawn once per batch
+    and get year=None.
+    """
+    name: str
+    table: str
+    prepare: object = field(repr=False)
+    kind: str = "bar"  # "bar", "line" or "grouped_bar"
+    filename: str = ""
+    title: str = ""
+    xlabel: str = ""
+    ylabel: str = ""
+    colors: tuple = ("skyblue",)
+    legend: tuple = ()
+    title_size: int = None
+    label_size: int = None
+    rotation: int = 45
+    ha: str = "center"
+    grid: bool = False
+    per_year: bool = True
+
+CHART_SPECS = (
+    ChartSpec(
+        "top10_rd_costs", "research_expense", top_rd_costs, filename="top10_rd_costs_{year}.png",
+        title="Top 10 Industries by Total R&D Costs ({year})", xlabel="Industry", ylabel="R&D Costs (Million Yen)",
+        title_size=14, label_size=12, ha="right",
+    ),
+    ChartSpec(
+        "top10_rd_costs_percent", "research_expense", top_rd_sales_ratio, filename="top10_rd_costs_percent_{year}.png",
+        title="Top 10 Industries by R&D Cost as % of Sales ({year})", xlabel="Industry", ylabel="R&D Cost as % of Sales",
+        colors=("orange",), title_size=14, label_size=12, ha="right",
+    ),
+    ChartSpec(
+        "top10_num_companies", "research_expense", top_companies, filename="top10_num_companies_{year}.png",
+        title="Top 10 Industries by Number of Companies ({year})", xlabel="Industry", ylabel="Number of Companies",
+        colors=("green",), title_size=14, label_size=12, ha="right",
+    ),
+    ChartSpec(
+        "total_patents_owned", "patent_count", total_patents_owned, kind="line",
+        filename="total_patents_owned_{first}_{last}.png", title="Total Patents Owned Over the Years",
+        xlabel="Year", ylabel="Total Patents Owned", legend=("Total Patents Owned",), rotation=0, grid=True,
+        per_year=False,
+    ),
+    ChartSpec(
+        "top5_industries_patents", "patent_count", top_patent_industries, filename="top5_industries_patents_{year}.png",
+        title="Top 5 Industries with Most Patents in {year}", xlabel="Industry", ylabel="Number of Patents",
+        per_year=False,
+    ),
+    ChartSpec(
+        "patents_owned_vs_used", "patent_count", patents_owned_vs_used, kind="grouped_bar",
+        filename="patents_owned_vs_used_{year}.png", title="Patents Owned vs. Used in {year}", xlabel="Industry",
+        ylabel="Number of Patents", colors=("orange", "green"), legend=("Patents Owned", "Patents Used"),
+    ),
+)
+
+@dataclass(frozen=True)
+class ChartJob:
+    """
+    A prepared chart, ready to be drawn in a worker process.
+    """
+    path: str
+    spec: ChartSpec = field(repr=False)
+    data: pd.DataFrame = field(repr=False)
+    labels: dict = field(repr=False)
+    font_path: str = field(default=None, repr=False)
+
+@functools.lru_cache(maxsize=None)
+def chart_font_family(font_path: str):
+    """
+    Registers the font file once per process and returns its family name, or None.
+    """
+    from matplotlib import font_manager
+
+    try:
+        font_manager.fontManager.addfont(font_path)
+        return font_manager.FontProperties(fname=font_path).get_name()
+    except Exception as e:
+        print(f"Error loading font: {e}")
+        return None
+
+def render_chart(job: ChartJob) -> str:
+    """
+    Draws one chart and saves it to job.path.
+
+    The Figure is created without pyplot, so it needs no GUI and leaves the
+    caller's matplotlib backend alone; savefig picks the canvas for the file format.
+    """
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    spec, data = job.spec, job.data
+    family = chart_font_family(job.font_path) if job.font_path else None
+    with RUN_REPORT.measure("chart", chart=spec.name, path=job.path, rows_in=len(data)), matplotlib.rc_context({"font.family": family} if family else {}):
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        if spec.kind == "line":
+            ax.plot(data["label"], data["value"], marker="o", label=spec.legend[0] if spec.legend else None)
+        elif spec.kind == "grouped_bar":
+            bar_width = 0.35
+            x = np.arange(len(data))
+            for i, column in enumerate(("value", "value2")):
+                ax.bar(x + i * bar_width, data[column], width=bar_width, label=spec.legend[i], color=spec.colors[i])
+            ax.set_xticks(x + bar_width / 2, data["label"], rotation=spec.rotation, ha=spec.ha)
+        else:
+            ax.bar(data["label"], data["value"], color=spec.colors[0])
+        if spec.kind == "bar":
+            ax.tick_params(axis="x", labelrotation=spec.rotation)
+            for tick in ax.get_xticklabels():
+                tick.set_horizontalalignment(spec.ha)
+        ax.set_title(spec.title.format(**job.labels), fontsize=spec.title_size)
+        ax.set_xlabel(spec.xlabel, fontsize=spec.label_size)
+        ax.set_ylabel(spec.ylabel, fontsize=spec.label_size)
+        if spec.grid:
+            ax.grid(True)
+        if spec.legend:
+            ax.legend()
+        fig.tight_layout()
+        fig.savefig(job.path)
+    return job.path
+
+@functools.lru_cache(maxsize=None)
+def chart_code_version(prepare) -> str:
+    """
+    Returns the source version of the drawing code and of one prepare function.
+    """
+    return source_version(render_chart, prepare)
+
+def chart_input_hash(job: ChartJob) -> str:
+    """
+    Hashes everything a rendered chart depends on: its data, labels, spec, font and drawing code.
+    """
+    spec = job.spec
+    digest = hashlib.sha256(chart_code_version(spec.prepare).encode())
+    settings = [getattr(spec, f.name) for f in fields(spec) if f.name != "prepare"]
+    digest.update(repr((settings, sorted(job.labels.items()), job.font_path, list(job.data.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(job.data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def load_render_manifest(out_dir=PLOT_DIR) -> dict:
+    """
+    Returns the render manifest of an output directory: {chart path: input hash}.
+    """
+    manifest_path = os.path.join(out_dir, RENDER_MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def rendered_charts(out_dir=PLOT_DIR) -> list:
+    """
+    Returns the paths of the charts rendered into an output directory, as recorded in its render manifest.
+    """
+    return sorted(load_render_manifest(out_dir))
+
+def render_charts(frames: dict, years=None, specs=CHART_SPECS, out_dir=PLOT_DIR, font_path=None, max_workers=1,
+                  force=False) -> dict:
+    """
+    Renders a batch of charts, in worker processes when max_workers > 1.
+
+    Each chart's data is prepared once in this process from the cleaned frames.
+    A chart whose input hash matches the one recorded at its last render, and
+    whose file still exists, is skipped.
+
+    Args:
+        frames (dict): {table: {year: cleaned DataFrame}}.
+        years (list): The years of the per-year charts. None renders every year available.
+        specs (tuple): The ChartSpec entries to render.
+        out_dir (str): Output directory for the PNG files.
+        font_path (str): A font file for the labels (e.g. a Japanese font), or None.
+        max_workers (int): Number of worker processes.
+        force (bool): Render every chart even if its inputs are unchanged.
+
+    Returns:
+        dict: {"rendered": [paths], "skipped": [paths], "errors": [(job or spec, exception)]}
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, RENDER_MANIFEST_FILENAME)
+    manifest = load_render_manifest(out_dir)
+
+    report = {"rendered": [], "skipped": [], "errors": []}
+    jobs, hashes = [], {}
+    for spec in specs:
+        table_frames = frames.get(spec.table) or {}
+        if not spec.per_year:
+            chart_years = [None]
+        else:
+            chart_years = sorted(table_frames) if years is None else [yr for yr in years if yr in table_frames]
+        for year in chart_years:
+            try:
+                data, labels = spec.prepare(table_frames, year)
+            except Exception as e:
+                print(f"Error preparing {spec.name} ({year}): {e!r}. Skipping.")
+                report["errors"].append((spec, e))
+                continue
+            path = os.path.join(out_dir, spec.filename.format(**labels))
+            job = ChartJob(path, spec, data, labels, font_path)
+            hashes[path] = chart_input_hash(job)
+            if not force and manifest.get(path) == hashes[path] and os.path.exists(path):
+                report["skipped"].append(path)
+            else:
+                jobs.append((job,))
+
+    results, errors = run_tasks(render_chart, jobs, max_workers, label="rendering")
+    for _, path in results:
+        manifest[path] = hashes[path]
+        report["rendered"].append(path)
+    report["errors"].extend((task[0], e) for task, e in errors)
+
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, manifest_path)
+    print(f"Charts: {len(report['rendered'])} rendered, {len(report['skipped'])} unchanged, "
+          f"{len(report['errors'])} failed")
+    RUN_REPORT.record("charts", **{key: len(value) for key, value in report.items()})
+    return report
@@ -0,0 +1,211 @@
+"""
+Run reports: per-call metrics appended to a JSON-lines file, with optional profiling.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Run report settings, kept in the environment so that worker processes share them
+RUN_REPORT_ENV = "INNOVATION_RUN_REPORT"
+
+def peak_rss_mb():
+    """
+    Returns the peak resident memory of this process in MB, or None where it is not available.
+
+    On Linux this is VmHWM, the peak of this process's own memory: ru_maxrss keeps
+    the peak of the parent a worker was started from.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class RunReport:
+    """
+    Structured metrics of a run, appended to a JSON-lines file.
+
+    Every measured call writes one record: the stage, wall time, how far the call
+    raised the peak RSS of the process (peak_rss_growth_mb), an ok/error status and
+    the fields the call fills in (bytes, rows and columns in and out, cache hit or
+    miss, ...). Calls can also be profiled with
+    cProfile or pyinstrument, one profile file per call.
+
+    Nothing is recorded until configure() is called. The settings are stored in an
+    environment variable, so worker processes append to the same report.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def configure(self, path, profiler=None, profile_dir="profiles", profile_stages=None):
+        """
+        Starts recording to path (appending), optionally profiling some stages.
+
+        Args:
+            path (str): The JSON-lines report file. None stops recording.
+            profiler (str): "cprofile", "pyinstrument" or None.
+            profile_dir (str): Where the profiles are written.
+            profile_stages (list): Stages to profile. None profiles every stage.
+        """
+        if path is None:
+            os.environ.pop(RUN_REPORT_ENV, None)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if profiler:
+            os.makedirs(profile_dir, exist_ok=True)
+        os.environ[RUN_REPORT_ENV] = json.dumps({
+            "path": path,
+            "run_id": time.strftime("%Y%m%dT%H%M%S") + f"-{os.getpid()}",
+            "profiler": profiler,
+            "profile_dir": profile_dir,
+            "profile_stages": list(profile_stages) if profile_stages else None,
+        })
+
+    @property
+    def settings(self):
+        settings = os.environ.get(RUN_REPORT_ENV)
+        return json.loads(settings) if settings else None
+
+    def record(self, stage: str, **fields):
+        """
+        Appends one record to the report.
+        """
+        settings = self.settings
+        if settings is None:
+            return
+        record = {"run_id": settings["run_id"], "ts": round(time.time(), 3), "pid": os.getpid(), "stage": stage, **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self.lock, open(settings["path"], "a", encoding="utf-8") as f:
+            f.write(line)
+
+    @contextmanager
+    def measure(self, stage: str, **fields):
+        """
+        Measures the body of a with block as one call of stage.
+
+        Yields the record's fields; the body adds its own (e.g. metrics["bytes"] = n).
+        Setting "error", or raising, marks the call as failed.
+
+        The peak RSS is the high-water mark of the whole process, so the call is
+        charged with its growth: 0 when the call stayed below an earlier peak.
+        Concurrent calls in other threads of the process share the growth.
+        """
+        settings = self.settings
+        if settings is None:
+            yield fields
+            return
+        profiler = self.start_profiler(stage, settings)
+        start_peak_mb = peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields["error"] = repr(e)
+            raise
+        finally:
+            wall_s = time.perf_counter() - start
+            if profiler is not None:
+                self.stop_profiler(profiler, stage, settings)
+            status = "error" if fields.get("error") else "ok"
+            end_peak_mb = peak_rss_mb()
+            growth_mb = None if end_peak_mb is None else round(end_peak_mb - start_peak_mb, 1)
+            self.record(stage, wall_s=round(wall_s, 6), peak_rss_growth_mb=growth_mb, status=status, **fields)
+
+    def start_profiler(self, stage: str, settings: dict):
+        """
+        Starts a profiler for this call if the stage is profiled and none is running in this thread.
+        """
+        if not settings["profiler"] or getattr(self.local, "profiling", False):
+            return None
+        if settings["profile_stages"] and stage not in settings["profile_stages"]:
+            return None
+        try:
+            if settings["profiler"] == "pyinstrument":
+                from pyinstrument import Profiler
+
+                profiler = Profiler()
+                profiler.start()
+            else:
+                import cProfile
+
+                profiler = cProfile.Profile()
+                profiler.enable()
+        except Exception as e:
+            print(f"Could not start the {settings['profiler']} profiler for {stage}: {e}")
+            return None
+        self.local.profiling = True
+        return profiler
+
+    def stop_profiler(self, profiler, stage: str, settings: dict):
+        """
+        Stops a profiler and writes its profile to the profile directory.
+        """
+        self.local.profiling = False
+        name = re.sub(r"[^\w.-]+", "_", stage)
+        path = os.path.join(settings["profile_dir"], f"{name}-{os.getpid()}-{time.time_ns()}")
+        if settings["profiler"] == "pyinstrument":
+            profiler.stop()
+            with open(path + ".html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.disable()
+            profiler.dump_stats(path + ".prof")
+
+# The report of this process
+RUN_REPORT = RunReport()
+
+def summarize_report(path: str, run_id=None) -> "pd.DataFrame":
+    """
+    Sums up a run report by stage: calls, errors, wall time, bytes, rows, cache hits and
+    the largest peak RSS growth of one call.
+
+    Args:
+        path (str): The JSON-lines report.
+        run_id (str): The run to sum up. None takes the last run in the file.
+
+    Returns:
+        pd.DataFrame: One row per stage, slowest first.
+    """
+    import pandas as pd
+
+    records = pd.read_json(path, lines=True)
+    run_id = run_id or records["run_id"].iloc[-1]
+    records = records[records["run_id"] == run_id]
+    for column in ("bytes", "rows_out", "cache", "peak_rss_growth_mb"):
+        if column not in records:
+            records[column] = None
+    records = records.assign(
+        failed=records["status"].eq("error"),
+        cache_hit=records["cache"].eq("hit"),
+        cache_miss=records["cache"].eq("miss"),
+    )
+    summary = records.groupby("stage").agg(
+        calls=("stage", "size"),
+        errors=("failed", "sum"),
+        wall_s=("wall_s", "sum"),
+        max_wall_s=("wall_s", "max"),
+        bytes=("bytes", "sum"),
+        rows_out=("rows_out", "sum"),
+        cache_hits=("cache_hit", "sum"),
+        cache_misses=("cache_miss", "sum"),
+        peak_rss_growth_mb=("peak_rss_growth_mb", "max"),
+    )
+    return summary.sort_values("wall_s", ascending=False)
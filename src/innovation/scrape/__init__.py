@@ -0,0 +1,12 @@
+"""
+Scraping the e-Stat listing pages and downloading the EXCEL files.
+"""
+from ..lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".cassette": ("CASSETTE_DIR", "CassetteStore", "RecordingAdapter", "ReplayAdapter"),
+    ".journal": ("JOURNAL_FILENAME", "ScrapeJournal"),
+    ".listing": ("ExcelLinkParser", "listing_key", "url_extension"),
+    ".manifest": ("FILENAME_YEAR_PATTERN", "MANIFEST_FILENAME", "DownloadManifest", "canonical_files", "scan_files"),
+    ".scraper": ("DataScraper", "RateLimiter"),
+})
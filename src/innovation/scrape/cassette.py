@@ -0,0 +1,152 @@
+"""
+Recording HTTP responses to a local cassette store and replaying them without a network.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Recorded responses are stored here unless another directory is given
+CASSETTE_DIR = "cassettes"
+# Headers that describe the transfer, not the body; the stored body is already decoded
+TRANSFER_HEADERS = ("Content-Encoding", "Transfer-Encoding", "Content-Length", "Connection", "Keep-Alive")
+
+class CassetteStore:
+    """
+    Recorded GET responses, keyed by URL: {key}.json holds the status and the
+    headers, {key}.body the body. Files are written through temp files, so
+    concurrent recordings of different URLs do not interfere.
+    """
+    def __init__(self, root=CASSETTE_DIR, create=True):
+        """
+        Args:
+            root (str): The directory of the recorded responses.
+            create (bool): Create root if it does not exist, for recording. A store
+                that is only read from must exist already.
+
+        Raises:
+            FileNotFoundError: If root does not exist and create is False.
+        """
+        self.root = root
+        if create:
+            os.makedirs(root, exist_ok=True)
+        elif not os.path.isdir(root):
+            raise FileNotFoundError(f"No cassette directory {root!r} to replay: record it first with --record")
+
+    def key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+
+    def save(self, url: str, status: int, reason: str, headers: dict, body: bytes):
+        """
+        Records one response.
+        """
+        key = self.key(url)
+        suffix = f".{threading.get_ident()}.tmp"
+        headers = {name: value for name, value in headers.items() if name.title() not in TRANSFER_HEADERS}
+        meta = {"url": url, "status": status, "reason": reason, "headers": headers}
+        for name, data in ((f"{key}.body", body), (f"{key}.json", json.dumps(meta, ensure_ascii=False, indent=1).encode())):
+            path = os.path.join(self.root, name)
+            with open(path + suffix, "wb") as f:
+                f.write(data)
+            os.replace(path + suffix, path)
+
+    def load(self, url: str):
+        """
+        Returns (meta, body) of the recorded response of a URL, or None if it was not recorded.
+        """
+        key = self.key(url)
+        try:
+            with open(os.path.join(self.root, f"{key}.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(os.path.join(self.root, f"{key}.body"), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        return meta, body
+
+    def urls(self) -> list:
+        """
+        Returns the recorded URLs.
+        """
+        urls = []
+        for name in sorted(os.listdir(self.root)):
+            if name.endswith(".json"):
+                with open(os.path.join(self.root, name), encoding="utf-8") as f:
+                    urls.append(json.load(f)["url"])
+        return urls
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Sends requests over the network like HTTPAdapter and records every complete
+    GET response in a CassetteStore. Partial (206) and not-modified (304)
+    responses are not recorded; the replay derives them from the full response.
+    A recorded body is read into memory before it is handed back.
+    """
+    def __init__(self, store: CassetteStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if request.method == "GET" and response.status_code not in (206, 304):
+            body = response.content
+            self.store.save(request.url, response.status_code, response.reason, dict(response.headers), body)
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Answers requests from a CassetteStore without any network access.
+
+    Conditional and Range requests are answered from the recorded response the
+    way a server would: If-None-Match / If-Modified-Since matching its validators
+    gives 304, and Range gives 206 with the requested bytes (or the full body
+    when If-Range does not match). A URL that was not recorded raises
+    ConnectionError, like an unreachable host.
+    """
+    def __init__(self, store: CassetteStore):
+        super().__init__()
+        self.store = store
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        recorded = self.store.load(request.url)
+        if recorded is None:
+            raise requests.exceptions.ConnectionError(f"No recorded response for {request.url}", request=request)
+        meta, body = recorded
+        status, reason = meta["status"], meta["reason"]
+        headers = CaseInsensitiveDict(meta["headers"])
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+
+        if status == 200:
+            if (etag and request.headers.get("If-None-Match") == etag) or (
+                    last_modified and request.headers.get("If-Modified-Since") == last_modified):
+                status, reason, body = 304, "Not Modified", b""
+            elif request.headers.get("Range", "").startswith("bytes="):
+                if_range = request.headers.get("If-Range")
+                if if_range is None or if_range in (etag, last_modified):
+                    start = int(request.headers["Range"][len("bytes="):].split("-")[0])
+                    if start >= len(body):
+                        status, reason, body = 416, "Range Not Satisfiable", b""
+                    else:
+                        headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                        status, reason, body = 206, "Partial Content", body[start:]
+        headers["Content-Length"] = str(len(body))
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = headers
+        response.encoding = get_encoding_from_headers(headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
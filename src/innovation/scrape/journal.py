@@ -0,0 +1,87 @@
+"""
+The checkpoint journal of a scraping run.
+"""
+import json
+import os
+import threading
+
+# Scraping checkpoints written next to the downloaded files
+JOURNAL_FILENAME = ".scrape_journal.json"
+
+class ScrapeJournal:
+    """
+    A JSON journal of the work a scraping run has finished, so that an
+    interrupted run can be resumed.
+
+    It records the links found on each listing page that was scraped without
+    errors, and the validators (ETag, Last-Modified) of the downloads that were
+    started but not finished, so their partial files can be resumed with a Range
+    request. Finished downloads are recorded in the DownloadManifest.
+    """
+    def __init__(self, download_dir):
+        self.download_dir = download_dir
+        self.path = os.path.join(download_dir, JOURNAL_FILENAME)
+        self._lock = threading.Lock()
+        self.entries = self.load()
+
+    def load(self) -> dict:
+        """
+        Loads the journal from disk, or returns an empty one.
+        """
+        entries = {"listings": {}, "partials": {}}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error reading scrape journal {self.path}: {e}. Starting a new one.")
+        return entries
+
+    def save(self):
+        """
+        Writes the journal to disk through a temp file. Called with the lock held.
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def listing(self, page_url: str):
+        """
+        Returns the (download URL, table name) links of a finished listing page, or None.
+        """
+        with self._lock:
+            items = self.entries["listings"].get(page_url)
+        return None if items is None else [tuple(item) for item in items]
+
+    def finish_listing(self, page_url: str, items: list):
+        """
+        Records the links of a listing page that was scraped without errors.
+        """
+        with self._lock:
+            self.entries["listings"][page_url] = [list(item) for item in items]
+            self.save()
+
+    def partial(self, url: str) -> dict:
+        """
+        Returns the validators of an unfinished download, or an empty dict.
+        """
+        with self._lock:
+            return dict(self.entries["partials"].get(url, {}))
+
+    def start_download(self, url: str, etag=None, last_modified=None):
+        """
+        Records the validators of a download whose body is being written to its partial file.
+        """
+        with self._lock:
+            self.entries["partials"][url] = {"etag": etag, "last_modified": last_modified}
+            self.save()
+
+    def finish_download(self, url: str):
+        """
+        Forgets an unfinished download once it is saved or its partial file is discarded.
+        """
+        with self._lock:
+            if self.entries["partials"].pop(url, None) is not None:
+                self.save()
@@ -0,0 +1,90 @@
+"""
+Parsing of the e-Stat listing pages.
+"""
+import re
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
+
+def url_extension(url: str) -> str:
+    """
+    Returns the Excel extension of a download URL, ".xls" when it has none.
+    """
+    ext_match = re.search(r"\.xls[xm]?$", url)
+    return ext_match.group(0) if ext_match else ".xls"
+
+def listing_key(url: str, keep_page: bool = False) -> tuple:
+    """
+    Returns a comparable key for a listing URL: its path and sorted query
+    parameters, without `page` unless `keep_page` is set.
+    """
+    parts = urlparse(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if keep_page or k != "page")
+    return parts.netloc, parts.path, urlencode(query)
+
+class ExcelLinkParser(HTMLParser):
+    """
+    A streaming parser for e-Stat listing pages.
+
+    The page is read once, front to back. Every `<span class="stat-dl_text">EXCEL</span>`
+    inside a link gives a download URL, paired with the text of the last dataset
+    title link seen before it. Links carrying a `page=` parameter are collected in
+    `page_links` for pagination.
+    """
+    TITLE_CLASSES = frozenset(("stat-link_text", "stat-dataset_list-detail-item-text", "js-data"))
+
+    def __init__(self, page_url: str):
+        super().__init__(convert_charrefs=True)
+        self.page_url = page_url
+        self.results = []
+        self.page_links = []
+        self.open_links = []  # (href, is_title) for each <a> not yet closed
+        self.title_parts = None  # text of the title link being read
+        self.title = None  # text of the last complete title link
+        self.label_parts = None  # text of the stat-dl_text span being read
+        self.label_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a":
+            href = attrs.get("href")
+            is_title = self.TITLE_CLASSES.issubset((attrs.get("class") or "").split())
+            self.open_links.append((href, is_title))
+            if is_title:
+                self.title_parts = []
+            if href and "page=" in href:
+                self.page_links.append(urljoin(self.page_url, href))
+        elif tag == "span":
+            if self.label_parts is not None:
+                self.label_depth += 1
+            elif "stat-dl_text" in (attrs.get("class") or "").split():
+                self.label_parts = []
+                self.label_depth = 1
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self.open_links:
+            _, is_title = self.open_links.pop()
+            if is_title and self.title_parts is not None:
+                self.title = " ".join(self.title_parts)
+                self.title_parts = None
+        elif tag == "span" and self.label_parts is not None:
+            self.label_depth -= 1
+            if self.label_depth == 0:
+                label = "".join(part.strip() for part in self.label_parts)
+                self.label_parts = None
+                if label == "EXCEL":
+                    self.add_excel_link()
+
+    def handle_data(self, data):
+        text = data.strip()
+        if self.title_parts is not None and text:
+            self.title_parts.append(text)
+        if self.label_parts is not None:
+            self.label_parts.append(text)
+
+    def add_excel_link(self):
+        href = next((href for href, _ in reversed(self.open_links) if href), None)
+        if not href:
+            return
+        download_url = urljoin(self.page_url, href)
+        table_name = self.title if self.title is not None else download_url.split("/")[-1]
+        self.results.append((download_url, table_name))
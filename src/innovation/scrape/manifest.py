@@ -0,0 +1,137 @@
+"""
+The download manifest and the lookup of the downloaded file of each year.
+"""
+import json
+import os
+import re
+import threading
+
+from ..config import table_for_name
+
+# Download manifest written next to the downloaded files
+MANIFEST_FILENAME = "manifest.json"
+# Matches "<table name>_<year>_<hash or timestamp>.xls"
+FILENAME_YEAR_PATTERN = re.compile(r"_(\d{4})_[0-9a-f]+\.xls[xm]?$")
+
+class DownloadManifest:
+    """
+    A JSON manifest of downloaded files keyed by URL.
+
+    Each entry holds the table ID (the TABLE_TARGETS key), table name, year,
+    filename, ETag, Last-Modified, content length and SHA-256 of the file, so
+    that unchanged tables can be revalidated with a conditional GET instead of
+    being downloaded again. The entries are also indexed by (table ID, year), so
+    the cleaners find the file of a year without listing the download directory.
+    """
+    def __init__(self, download_dir):
+        self.download_dir = download_dir
+        self.path = os.path.join(download_dir, MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+        self.entries = self.load()
+        self.index = {}
+        for entry in self.entries.values():
+            self.add_to_index(entry)
+
+    def load(self) -> dict:
+        """
+        Loads the manifest from disk, or returns an empty one.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Error reading manifest {self.path}: {e}. Starting a new one.")
+            return {}
+
+    def save(self):
+        """
+        Writes the manifest to disk through a temp file.
+        """
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, url: str):
+        """
+        Returns the entry for a URL if its file is still on disk.
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if entry and os.path.exists(os.path.join(self.download_dir, entry["filename"])):
+            return entry
+        return None
+
+    def update(self, url: str, entry: dict):
+        """
+        Records the entry for a URL and saves the manifest.
+        """
+        with self._lock:
+            self.entries[url] = entry
+            self.add_to_index(entry)
+            self.save()
+
+    def add_to_index(self, entry: dict):
+        # Entries written before the table ID was recorded are matched by their table name
+        table = entry.get("table") or table_for_name(entry.get("table_name", ""))
+        if table and entry.get("year"):
+            self.index.setdefault(table, {})[int(entry["year"])] = entry["filename"]
+
+    def table_files(self, table: str) -> dict:
+        """
+        Returns {year: filename} of the downloaded files of a table that are still on disk, sorted by year.
+        """
+        with self._lock:
+            files = dict(self.index.get(table, {}))
+        return {
+            year: filename for year, filename in sorted(files.items())
+            if os.path.exists(os.path.join(self.download_dir, filename))
+        }
+
+def canonical_files(download_dir: str, target_str: str) -> dict:
+    """
+    Returns exactly one downloaded file per year for a table.
+
+    The files are looked up in the manifest's (table ID, year) index. Only when
+    the manifest has no file of the table, e.g. for files downloaded before the
+    manifest existed, is the directory scanned (see scan_files).
+
+    Args:
+        download_dir (str): The directory with the downloaded files.
+        target_str (str): A substring of the table name.
+
+    Returns:
+        dict: A mapping of year (int) to filename, sorted by year.
+    """
+    manifest = DownloadManifest(download_dir)
+    table = table_for_name(target_str)
+    files = manifest.table_files(table) if table else {}
+    return files or scan_files(download_dir, target_str, manifest)
+
+def scan_files(download_dir: str, target_str: str, manifest=None) -> dict:
+    """
+    Finds the downloaded files of a table by listing the download directory.
+
+    Files recorded in the download manifest win. Older timestamped files that are
+    not in the manifest are still picked up, keeping the newest one per year.
+
+    Returns:
+        dict: A mapping of year (int) to filename, sorted by year.
+    """
+    files = {}
+    legacy = [fp for fp in os.listdir(download_dir) if target_str in fp and not fp.startswith(".")]
+    for fp in sorted(legacy, key=lambda fp: os.path.getmtime(os.path.join(download_dir, fp))):
+        match = FILENAME_YEAR_PATTERN.search(fp)
+        if match:
+            files[int(match.group(1))] = fp
+        else:
+            print(f"Could not extract year from filename: {fp}. Skipping.")
+
+    manifest = manifest or DownloadManifest(download_dir)
+    for entry in manifest.entries.values():
+        if target_str in entry["filename"] and entry["year"] \
+                and os.path.exists(os.path.join(download_dir, entry["filename"])):
+            files[int(entry["year"])] = entry["filename"]
+    return dict(sorted(files.items()))
@@ -0,0 +1,448 @@
+"""
+Scraping of the listing pages and download of the EXCEL files.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, suppress
+from urllib.parse import urlparse
+
+import requests
+import tqdm
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config import MIN_REQUEST_INTERVAL, table_for_name
+from ..report import RUN_REPORT
+from .cassette import CASSETTE_DIR, CassetteStore, RecordingAdapter, ReplayAdapter
+from .listing import ExcelLinkParser, listing_key, url_extension
+from .journal import ScrapeJournal
+from .manifest import DownloadManifest
+
+class RateLimiter:
+    """
+    A thread-safe limiter that keeps a minimum interval between requests to the same host.
+    """
+    def __init__(self, min_interval: float = MIN_REQUEST_INTERVAL):
+        """
+        Args:
+            min_interval (float): Minimum number of seconds between two requests to one host.
+                0 does not limit the rate.
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, host: str):
+        """
+        Blocks until the next request to the host is allowed.
+
+        Args:
+            host (str): The host name the request goes to.
+        """
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class DataScraper:
+    """
+    A class to scrape and download EXCEL files from specified URLs.
+    """
+    def __init__(self, base_urls, download_dir, years, max_workers=1, per_host_limit=4,
+                 min_interval=MIN_REQUEST_INTERVAL, retries=3, backoff=0.5, timeout=30, resume=False, transport="live",
+                 cassette_dir=CASSETTE_DIR):
+        """
+        Initializes the DataScraper with base URLs, download directory, and years.
+
+        Args:
+            base_urls (list): A list of base URLs to scrape.
+            download_dir (str): The directory to save downloaded files.
+            years (list): A list of years to associate with the downloads.
+            max_workers (int): Number of worker threads. 1 keeps the serial path.
+            per_host_limit (int): Maximum number of requests in flight to one host.
+            min_interval (float): Minimum seconds between two requests to one host.
+            retries (int): Number of retries for failed requests.
+            backoff (float): Backoff factor between retries, in seconds.
+            timeout (float): Timeout for each request, in seconds.
+            resume (bool): Continue an interrupted run: listing pages in the journal are
+                not scraped again and files in the manifest are not revalidated.
+            transport (str): "live" sends the requests over the network, "record" does so and
+                records the responses in cassette_dir, "replay" answers them from cassette_dir
+                without a network. A recording downloads every file in full, even one the
+                manifest already has.
+            cassette_dir (str): The cassette store of the record and replay transports.
+
+        Raises:
+            ValueError: If a recording is to resume: the requests it skips would be missing from the cassette.
+        """
+        if transport == "record" and resume:
+            raise ValueError("A recording cannot resume: the requests it skips would be missing from the cassette")
+        self.base_urls = base_urls
+        self.download_dir = download_dir
+        self.years = years
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.resume = resume
+        self.rate_limiter = RateLimiter(min_interval)
+        self.transport = transport
+        self.cassette_dir = cassette_dir
+        self.session = self.build_session(retries, backoff)
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        os.makedirs(self.download_dir, exist_ok=True)
+        self.manifest = DownloadManifest(self.download_dir)
+        self.journal = ScrapeJournal(self.download_dir)
+
+    def build_session(self, retries: int, backoff: float) -> requests.Session:
+        """
+        Builds one keep-alive session shared by all requests. Its transport adapter
+        is picked by `transport`: the network, the network with recording, or replay.
+
+        Args:
+            retries (int): Number of retries for failed requests.
+            backoff (float): Backoff factor between retries, in seconds.
+
+        Returns:
+            requests.Session: A session with a connection pool sized for the workers.
+        """
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        pool_size = max(self.max_workers, self.per_host_limit)
+        pool = {"pool_connections": pool_size, "pool_maxsize": pool_size, "max_retries": retry}
+        if self.transport == "replay":
+            adapter = ReplayAdapter(CassetteStore(self.cassette_dir, create=False))
+        elif self.transport == "record":
+            adapter = RecordingAdapter(CassetteStore(self.cassette_dir), **pool)
+        elif self.transport == "live":
+            adapter = HTTPAdapter(**pool)
+        else:
+            raise ValueError(f"Unknown transport {self.transport!r}: use live, record or replay")
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @contextmanager
+    def host_slot(self, url: str):
+        """
+        Holds one of the per-host request slots and waits for the rate limiter.
+
+        Args:
+            url (str): The URL that is about to be requested.
+        """
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.setdefault(host, threading.BoundedSemaphore(self.per_host_limit))
+        with slot:
+            self.rate_limiter.wait(host)
+            yield
+
+    def sanitize_filename(self, text: str) -> str:
+        """
+        Turns arbitrary text into a safe filename.
+
+        Args:
+            text (str): The text to sanitize.
+
+        Returns:
+            str: A safe filename.
+        """
+        name = re.sub(r"\s+", " ", text.strip())
+        return re.sub(r'[\\/:"*?<>|]+', "_", name)
+
+    def scrape_excel_links(self, page_url: str, follow_pages: bool = True) -> list:
+        """
+        Scrapes a given URL for EXCEL file links and their associated table names.
+
+        Listing pages are parsed in one streaming pass. When `follow_pages` is set,
+        the further pages of the same listing (the same URL with another `page=`
+        value) are fetched as well, so tables past the first page are not missed.
+        A listing scraped without errors is recorded in the journal; with `resume`,
+        the recorded links are returned without fetching the listing again.
+
+        Args:
+            page_url (str): The URL of the page to scrape.
+            follow_pages (bool): Whether to follow the listing's pagination links.
+
+        Returns:
+            list: A list of tuples, where each tuple contains the download URL and the table name.
+        """
+        if self.resume:
+            items = self.journal.listing(page_url)
+            if items is not None:
+                print(f"  = Already scraped {page_url}")
+                return items
+        results = []
+        failed = False
+        listing = listing_key(page_url)
+        seen = {listing_key(page_url, keep_page=True)}
+        queue = [page_url]
+        while queue:
+            url = queue.pop(0)
+            with RUN_REPORT.measure("scrape_listing", url=url) as metrics:
+                try:
+                    with self.host_slot(url):
+                        resp = self.session.get(url, timeout=self.timeout)
+                        resp.raise_for_status()
+                    metrics.update(status_code=resp.status_code, bytes=len(resp.content))
+                    parser = ExcelLinkParser(url)
+                    parser.feed(resp.text)
+                    parser.close()
+                    metrics["links"] = len(parser.results)
+                except requests.exceptions.RequestException as e:
+                    print(f"Error fetching {url}: {e}")
+                    metrics["error"] = repr(e)
+                    failed = True
+                    continue
+                except Exception as e:
+                    print(f"Error parsing {url}: {e}")
+                    metrics["error"] = repr(e)
+                    failed = True
+                    continue
+
+            results.extend(parser.results)
+            if not follow_pages:
+                break
+            for link in parser.page_links:
+                key = listing_key(link, keep_page=True)
+                if listing_key(link) == listing and key not in seen:
+                    seen.add(key)
+                    queue.append(link)
+        if not failed:
+            self.journal.finish_listing(page_url, results)
+        return results
+
+    def download_file(self, url: str, table_name: str, year: str):
+        """
+        Downloads one EXCEL file into the download directory.
+
+        The file is named after its content hash. If the manifest already has the
+        URL, a conditional GET is sent and an unchanged file is not transferred again.
+
+        Args:
+            url (str): The download URL.
+            table_name (str): The table name used for the filename.
+            year (str): The survey year used for the filename.
+
+        Returns:
+            str: The path of the saved file, or None if the download failed.
+        """
+        return self.fetch(url, table_name, year)
+
+    def fetch(self, url: str, table_name: str, year: str, spill_threshold=None):
+        """
+        Downloads one EXCEL file, into memory when spill_threshold is set.
+
+        In memory, the body is kept in a buffer and returned as bytes; nothing is
+        written and the manifest is not touched. A body larger than spill_threshold
+        bytes is spilled to disk and saved exactly like download_file saves it. A
+        file the manifest already has is revalidated and, if unchanged, read from disk;
+        with `resume` it is read from disk without a request.
+
+        On disk, the body is written to a partial file that is renamed into place
+        once complete. The partial file of an interrupted download is continued
+        with a Range request, guarded by If-Range with the validator recorded in
+        the journal so that a file changed in between is downloaded from the start.
+        The record transport sends neither: it downloads every file in full.
+
+        Args:
+            url (str): The download URL.
+            table_name (str): The table name used for the filename.
+            year (str): The survey year used for the filename.
+            spill_threshold (int): Largest body kept in memory, in bytes. None always writes to disk.
+
+        Returns:
+            str | bytes: The path of the saved file or the file content, or None if the download failed.
+        """
+        with RUN_REPORT.measure("download", url=url, table=table_name, year=year) as metrics:
+            ext = url_extension(url)
+            safe_name = self.sanitize_filename(table_name)
+            url_key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+            tmp_path = os.path.join(self.download_dir, f".{url_key}.part")
+
+            entry = self.manifest.get(url)
+            if entry and self.resume:
+                print(f"  = Already downloaded {entry['filename']}")
+                metrics.update(result="skipped", bytes=0)
+                return os.path.join(self.download_dir, entry["filename"])
+            # A recording sends every request unconditionally: the cassette needs the full
+            # response, from which a replay answers the conditional and Range requests
+            recording = self.transport == "record"
+            headers = {}
+            if entry and not recording:
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+
+            offset = 0
+            partial = self.journal.partial(url)
+            validator = partial.get("etag") or partial.get("last_modified")
+            if spill_threshold is None and not recording and os.path.exists(tmp_path) and (validator or self.resume):
+                offset = os.path.getsize(tmp_path)
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                if validator:
+                    headers["If-Range"] = validator
+
+            print(f"↓ Downloading {safe_name}_{year}{ext}")
+            try:
+                with self.host_slot(url):
+                    r = self.session.get(url, stream=True, headers=headers, timeout=self.timeout)
+                    resumed = r.status_code == 206 and r.headers.get("Content-Range", "").startswith(f"bytes {offset}-")
+                    if offset and (r.status_code == 416 or (r.status_code == 206 and not resumed)):
+                        # The partial file does not fit the file on the server: start over
+                        r.close()
+                        offset = 0
+                        headers = {k: v for k, v in headers.items() if k not in ("Range", "If-Range")}
+                        r = self.session.get(url, stream=True, headers=headers, timeout=self.timeout)
+                    metrics["status_code"] = r.status_code
+                    if r.status_code == 304 and entry:
+                        print(f"  = Unchanged {entry['filename']}")
+                        metrics.update(result="unchanged", bytes=0)
+                        return os.path.join(self.download_dir, entry["filename"])
+                    r.raise_for_status()
+                    if r.status_code != 206:
+                        offset = 0
+                    metrics["resumed_bytes"] = offset
+                    digest = hashlib.sha256()
+                    size = 0
+                    buffer = io.BytesIO() if spill_threshold is not None else None
+                    f = None
+                    if buffer is None and offset:
+                        with open(tmp_path, "rb") as part:
+                            for chunk in iter(lambda: part.read(1024 * 1024), b""):
+                                digest.update(chunk)
+                        size = offset
+                        f = open(tmp_path, "ab")
+                    elif buffer is None:
+                        self.journal.start_download(url, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+                        f = open(tmp_path, "wb")
+                    try:
+                        for chunk in r.iter_content(64 * 1024):
+                            digest.update(chunk)
+                            size += len(chunk)
+                            if buffer is None:
+                                f.write(chunk)
+                                continue
+                            buffer.write(chunk)
+                            if size > spill_threshold:
+                                self.journal.start_download(url, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+                                f = open(tmp_path, "wb")
+                                f.write(buffer.getbuffer())
+                                buffer = None
+                    finally:
+                        if f is not None:
+                            f.close()
+            except requests.exceptions.RequestException as e:
+                print(f"Error downloading {url}: {e}")
+                metrics["error"] = repr(e)
+                return None
+            except Exception as e:
+                print(f"Error saving {safe_name}_{year}{ext}: {e}")
+                metrics["error"] = repr(e)
+                return None
+            metrics["bytes"] = size
+            if buffer is not None:
+                metrics["result"] = "memory"
+                return buffer.getvalue()
+            metrics["result"] = "spilled" if spill_threshold is not None else "saved"
+
+            sha256 = digest.hexdigest()
+            filename = f"{safe_name}_{year}_{sha256[:16]}{ext}"
+            path = os.path.join(self.download_dir, filename)
+            os.replace(tmp_path, path)
+            self.journal.finish_download(url)
+            if entry and entry["filename"] != filename:
+                # The old file may already be gone (removed by hand, or by a concurrent run)
+                with suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.download_dir, entry["filename"]))
+
+            self.manifest.update(url, {
+                "table": table_for_name(table_name),
+                "table_name": table_name,
+                "year": year,
+                "filename": filename,
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "content_length": size,
+                "sha256": sha256,
+            })
+            return path
+
+    def year_for_page(self, i: int) -> str:
+        """
+        Returns the year associated with the i-th base URL.
+        """
+        if i < len(self.years):
+            return str(self.years[i])
+        print("Warning: More base URLs than years provided. Skipping year association.")
+        return ""
+
+    def run_scraper(self):
+        """
+        Executes the scraping and downloading process for all base URLs.
+        """
+        if self.max_workers > 1:
+            return self.run_scraper_concurrent()
+        for i, base_url in enumerate(self.base_urls):
+            print(f"\n▶ Scraping {base_url}")
+            items = self.scrape_excel_links(base_url)
+            print(f"  → Found {len(items)} EXCEL links")
+
+            year = self.year_for_page(i) if items else ""
+            for url, table_name in tqdm.tqdm(items):
+                self.download_file(url, table_name, year)
+
+    def run_scraper_concurrent(self):
+        """
+        Scrapes all listing pages and downloads all EXCEL files with a thread pool.
+        The files on disk are the same as the ones written by the serial path.
+        """
+        print(f"\n▶ Scraping {len(self.base_urls)} listing pages with {self.max_workers} workers")
+        listings = self.scrape_listings()
+        jobs = [(url, table_name, year) for year, items in listings for url, table_name in items]
+        print(f"  → Found {len(jobs)} EXCEL links")
+        self.download_all(jobs)
+
+    def scrape_listings(self, pages=None) -> list:
+        """
+        Scrapes listing pages with a thread pool.
+
+        Args:
+            pages (list): Indexes into base_urls. None scrapes every page.
+
+        Returns:
+            list: (year, [(download URL, table name)]) for each page, in page order.
+        """
+        pages = range(len(self.base_urls)) if pages is None else pages
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            listings = list(pool.map(self.scrape_excel_links, [self.base_urls[i] for i in pages]))
+        return [(self.year_for_page(i) if items else "", items) for i, items in zip(pages, listings)]
+
+    def download_all(self, jobs: list) -> list:
+        """
+        Downloads (url, table_name, year) jobs with a thread pool.
+
+        Returns:
+            list: The local path of each job, or None where the download failed.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.download_file, *job) for job in jobs]
+            for future in tqdm.tqdm(as_completed(futures), total=len(futures)):
+                future.result()
+        return [future.result() for future in futures]
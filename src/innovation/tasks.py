@@ -0,0 +1,49 @@
+"""
+Running independent tasks in a process pool.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Start method of the worker processes. A forked worker copies every lock of the
+# caller as it is, so a lock held by another of its threads (a pipeline stage,
+# clean_sources, render_charts) stays held in the worker forever.
+TASK_START_METHOD = "spawn"
+
+def run_tasks(func, tasks, max_workers=1, label="cleaning"):
+    """
+    Runs func(*task) for every task, in a process pool when max_workers > 1.
+
+    A failing task is reported and skipped; it does not abort the other tasks.
+    The workers are started with TASK_START_METHOD, so func and the tasks must be
+    importable and picklable in a fresh interpreter.
+
+    Args:
+        func (callable): A module-level function or a bound method of a picklable object.
+        tasks (list): A list of argument tuples.
+        max_workers (int): Number of worker processes. 1 runs the tasks in this process.
+        label (str): What the tasks do, for the error messages.
+
+    Returns:
+        tuple: (results, errors). results lists (task, result) pairs in task order,
+        errors lists (task, exception) pairs for the tasks that failed.
+    """
+    results, errors = [], []
+    if max_workers > 1 and len(tasks) > 1:
+        context = multiprocessing.get_context(TASK_START_METHOD)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+            futures = [pool.submit(func, *task) for task in tasks]
+            for task, future in zip(tasks, futures):
+                try:
+                    results.append((task, future.result()))
+                except Exception as e:
+                    errors.append((task, e))
+    else:
+        for task in tasks:
+            try:
+                results.append((task, func(*task)))
+            except Exception as e:
+                errors.append((task, e))
+
+    for task, e in errors:
+        print(f"Error {label} {task}: {e!r}. Skipping.")
+    return results, errors
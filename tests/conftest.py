@@ -0,0 +1,35 @@
+"""
+Shared fixtures: synthetic survey workbooks (see benchmarks/synthetic_workbooks.py)
+and a scratch working directory for the cleaners, which write to data/ under it.
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [os.path.join(ROOT_DIR, "src"), os.path.join(ROOT_DIR, "benchmarks")]
+
+import synthetic_workbooks  # noqa: E402
+
+# The survey years of the synthetic workbooks, one per layout change and a few more
+SURVEY_YEARS = [2003, 2004, 2005, 2006, 2007, 2008, 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2019, 2020, 2021, 2023]
+
+@pytest.fixture(scope="session")
+def workbooks(tmp_path_factory):
+    """
+    A directory with one workbook per table and survey year, generated once per session.
+    """
+    path = tmp_path_factory.mktemp("workbooks")
+    synthetic_workbooks.generate(str(path), SURVEY_YEARS, n_rows=20, n_sheets=2)
+    return path
+
+@pytest.fixture
+def download_dir(tmp_path, workbooks, monkeypatch):
+    """
+    A copy of the workbooks to clean, in a fresh working directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(workbooks, tmp_path / "downloads")
+    return "downloads"
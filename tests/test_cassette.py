@@ -0,0 +1,68 @@
+"""
+Recording responses to a cassette store and replaying them without a network.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from innovation.scrape import DataScraper
+from innovation.scrape.cassette import CassetteStore
+
+TABLE_NAME = "第11表 産業別、企業数、特許権、実用新案権、意匠権別所有件数及び使用件数"
+BODY = bytes(range(256)) * 16
+ETAG = '"v1"'
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Serves BODY with an ETag, and 304 to a request whose If-None-Match matches it.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status, body = (304, b"") if self.headers.get("If-None-Match") == ETAG else (200, BODY)
+        self.send_response(status)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    yield f"http://{host}:{port}/file/2021.xlsx"
+    server.shutdown()
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_replay_without_cassettes_fails(tmp_path):
+    with pytest.raises(FileNotFoundError, match="record it first"):
+        DataScraper([], str(tmp_path / "downloads"), [], transport="replay", cassette_dir=str(tmp_path / "missing"))
+
+def test_recording_cannot_resume(tmp_path):
+    with pytest.raises(ValueError, match="cannot resume"):
+        DataScraper([], str(tmp_path / "downloads"), [], resume=True, transport="record",
+                    cassette_dir=str(tmp_path / "cassettes"))
+
+def test_record_over_manifest_then_replay(tmp_path, url):
+    download_dir, cassette_dir = str(tmp_path / "downloads"), str(tmp_path / "cassettes")
+    DataScraper([], download_dir, [], min_interval=0).download_file(url, TABLE_NAME, "2021")
+
+    # The manifest already has the file: the recording still downloads it in full
+    recorder = DataScraper([], download_dir, [], min_interval=0, transport="record", cassette_dir=cassette_dir)
+    assert read(recorder.download_file(url, TABLE_NAME, "2021")) == BODY
+    assert CassetteStore(cassette_dir, create=False).urls() == [url]
+
+    replay = DataScraper([], str(tmp_path / "replayed"), [], transport="replay", cassette_dir=cassette_dir)
+    assert read(replay.download_file(url, TABLE_NAME, "2021")) == BODY
+    # Against the recorded manifest, the replay answers the conditional request with 304
+    replay = DataScraper([], download_dir, [], transport="replay", cassette_dir=cassette_dir)
+    assert read(replay.download_file(url, TABLE_NAME, "2021")) == BODY
+    assert replay.manifest.get(url)["etag"] == ETAG
@@ -0,0 +1,87 @@
+"""
+Startup-time gate for the command line: the import time of each command within a budget.
+
+Each command's modules are imported in a fresh `python -X importtime` process;
+their import time (best of REPEAT, without the interpreter's own startup
+imports) must stay within the command's budget. The modules a command must not
+load at startup (pandas for scrape, requests for clean, matplotlib for every
+command, ...) are checked too.
+On a slow machine the budgets can be scaled, e.g. INNOVATION_IMPORT_BUDGET_SCALE=2.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# command: (modules imported by the time it starts working, modules it must not have imported, budget in ms)
+COMMANDS = {
+    "--help": (["innovation.cli"], ["pandas", "numpy", "requests", "matplotlib"], 60),
+    "scrape": (["innovation.cli", "innovation.pipeline", "innovation.scrape.scraper"],
+               ["pandas", "numpy", "matplotlib"], 400),
+    "clean": (["innovation.cli", "innovation.pipeline", "innovation.clean.cleaners"],
+              ["requests", "matplotlib"], 1200),
+    "plot": (["innovation.cli", "innovation.pipeline", "innovation.clean.cleaners", "innovation.plot.charts"],
+             ["requests", "matplotlib"], 1200),
+    "run": (["innovation.cli", "innovation.pipeline", "innovation.scrape.scraper", "innovation.clean.cleaners",
+             "innovation.plot.charts"], ["matplotlib"], 1500),
+    "report": (["innovation.cli", "innovation.report"], ["pandas", "numpy", "requests", "matplotlib"], 60),
+}
+# Number of fresh interpreters per command; the best import time counts
+REPEAT = 5
+# Multiplies every budget
+BUDGET_SCALE = float(os.environ.get("INNOVATION_IMPORT_BUDGET_SCALE", "1"))
+
+def import_times(modules: list) -> tuple:
+    """
+    Imports modules in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: ({top-level module: cumulative import time in µs}, {every module imported}),
+        both including the interpreter's own startup imports.
+    """
+    code = "; ".join(f"import {module}" for module in modules) or "pass"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env)
+    if result.returncode:
+        raise RuntimeError(f"Importing {modules} failed:\n{result.stderr[-2000:]}")
+    times, loaded = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded.add(name.strip())
+        # Nested imports are indented below the module that imported them
+        if not name[1:].startswith(" "):
+            times[name.strip()] = int(cumulative)
+    return times, loaded
+
+def measure(modules: list, repeat: int, startup: set) -> tuple:
+    """
+    Returns (best import time in ms, every module imported). The
+    interpreter's own startup imports (site, encodings, ...) are not counted.
+    """
+    best, loaded = float("inf"), set()
+    for _ in range(repeat):
+        times, loaded = import_times(modules)
+        best = min(best, sum(us for name, us in times.items() if name not in startup) / 1000)
+    return best, loaded
+
+@pytest.fixture(scope="module")
+def startup():
+    """
+    The modules the interpreter imports on its own.
+    """
+    return set(import_times([])[0])
+
+@pytest.mark.parametrize("command", COMMANDS)
+def test_import_time(command, startup):
+    modules, forbidden, budget_ms = COMMANDS[command]
+    import_ms, loaded = measure(modules, REPEAT, startup)
+
+    leaked = [module for module in forbidden if module in loaded]
+    assert not leaked, f"{command} imports {', '.join(leaked)} at startup"
+    assert import_ms <= budget_ms * BUDGET_SCALE, \
+        f"{command} takes {import_ms:.1f} ms to import, over its budget of {budget_ms * BUDGET_SCALE:.0f} ms"
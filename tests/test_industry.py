@@ -0,0 +1,91 @@
+"""
+Canonical industry names across survey years.
+"""
+import pandas as pd
+import pytest
+import synthetic_workbooks
+from synthetic_workbooks import INDUSTRIES
+
+from innovation.clean import DataCleaner, IndustryNames, canonicalize_industries, industry_label
+
+def build(labels_by_year):
+    return IndustryNames().build(labels_by_year)
+
+def test_labels_match_on_their_key():
+    lookup = build({"2021": ["食料品製造業", "化学工業"], "2010": ["090 食料品製造業", "化学工業 "]})
+
+    assert lookup["090 食料品製造業"] == "食料品製造業"
+    assert lookup["化学工業 "] == "化学工業"
+
+def test_renamed_industries_map_to_the_current_name():
+    lookup = build({
+        "2021": ["製造業", "電子部品・デバイス・電子回路製造業"],
+        "2010": ["製造業計", "電子部品・デバイス製造業"],
+    })
+
+    assert lookup["製造業計"] == "製造業"
+    assert lookup["電子部品・デバイス製造業"] == "電子部品・デバイス・電子回路製造業"
+
+def test_sub_industry_is_not_mapped_onto_its_parent():
+    lookup = build({"2021": ["情報通信業"], "2010": ["情報通信業", "情報サービス業"]})
+
+    assert lookup["情報サービス業"] == "情報サービス業"
+
+def test_labels_of_one_year_keep_distinct_names():
+    # Both have the key 製造業 (one directly, one through INDUSTRY_ALIASES)
+    assert build({"2010": ["製造業計", "製造業"]}) == {"製造業": "製造業", "製造業計": "製造業計"}
+    # Both have the key 化学工業: the one with the exact name keeps it
+    lookup = build({
+        "2021": ["製造業", "化学工業"],
+        "2010": ["製造業計", "製造業", "化学工業（別掲を除く）", "化学工業"],
+    })
+    assert lookup == {
+        "製造業": "製造業", "化学工業": "化学工業", "製造業計": "製造業計", "化学工業（別掲を除く）": "化学工業(別掲を除く)",
+    }
+
+def test_canonicalize_industries_keeps_categories():
+    frames = {
+        2021: pd.DataFrame({"産業": pd.Categorical(["製造業", "化学工業"]), "値": [1, 2]}),
+        2010: pd.DataFrame({"産業": pd.Categorical(["製造業計", "化学工業"]), "値": [3, 4]}),
+    }
+
+    canonical = canonicalize_industries(frames)
+
+    assert canonical[2010]["産業"].tolist() == ["製造業", "化学工業"]
+    assert isinstance(canonical[2010]["産業"].dtype, pd.CategoricalDtype)
+
+def generate(year, renames, monkeypatch, seed=0):
+    """
+    Writes the patent workbook of a year, with some industries renamed.
+    """
+    industries = [renames.get(name, name) for name in INDUSTRIES]
+    monkeypatch.setattr(synthetic_workbooks, "INDUSTRIES", industries)
+    synthetic_workbooks.generate("downloads", [year], n_rows=len(INDUSTRIES), tables=("patent",), seed=seed)
+    return industries
+
+@pytest.fixture
+def renamed_workbooks(tmp_path, monkeypatch):
+    """
+    Patent workbooks of 2010 and 2021 whose industries were renamed in between.
+    Returns the canonical names of the 2010 labels.
+    """
+    monkeypatch.chdir(tmp_path)
+    current = generate(2021, {"製造業計": "製造業"}, monkeypatch)
+    old = generate(2010, {"電子部品・デバイス・電子回路製造業": "電子部品・デバイス製造業", "情報通信業": "情報サービス業"},
+                   monkeypatch, seed=1)
+    # Renamed industries take the current name; the sub-industry keeps its own
+    return [industry_label(label if label == "情報サービス業" else name) for label, name in zip(old, current)]
+
+def test_subset_of_years_gets_the_names_of_all_years(renamed_workbooks, tmp_path):
+    full = DataCleaner("downloads", use_cache=False).load_table("patent_count")
+    assert full[2010]["産業"].tolist() == renamed_workbooks
+
+    # A fresh download directory, with no labels recorded by an earlier run
+    fresh = tmp_path / "fresh"
+    fresh.mkdir()
+    for path in (tmp_path / "downloads").glob("*.xlsx"):
+        (fresh / path.name).write_bytes(path.read_bytes())
+    subset = DataCleaner(str(fresh), use_cache=False).load_table("patent_count", years=[2010])
+
+    assert list(subset) == [2010]
+    assert subset[2010]["産業"].tolist() == renamed_workbooks
@@ -0,0 +1,86 @@
+"""
+Parity of the layout registry with the per-year code paths it replaced.
+
+The golden digests were taken from the outputs of the per-year cleaners on the
+synthetic workbooks of conftest.py. Suppression markers are compared as missing
+values (see normalize_frame). Industry labels are compared in their display
+form, since the per-year cleaners did not make them canonical.
+"""
+import hashlib
+import io
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from innovation.clean import DataCleaner
+from innovation.clean.industry import industry_label
+from innovation.clean.layout import get_layout
+from innovation.config import TABLE_OUTPUT_DIRS
+
+# {table: {year: digest of the cleaned CSV}} written by the per-year cleaners
+GOLDEN = {
+    "labor_number": {
+        "2003": "7a53ffe20c2fefe6", "2004": "01d360be5793d6bf", "2005": "e136160e5128c14b", "2006": "4f8a6cdad9e296d2",
+        "2007": "6ee034d9bce51fde", "2008": "6ec3380fba68c6a6", "2009": "11f2702d971d25ae", "2010": "c086c2b2dfdd5721",
+        "2011": "5c2dceae045d1017", "2012": "939914e95bc9a04e", "2013": "f6620cd97c7f3310", "2014": "93986b5681ab4b8b",
+        "2015": "1e9a6f47560d34b0", "2019": "9254be07f831f43b", "2020": "785d4da569bee473", "2021": "03face065bd66c19",
+        "2023": "1436370620d940c0",
+    },
+    "research_expense": {
+        "2003": "1bbae64e4f526cdf", "2004": "dda2e38a32f4fecf", "2005": "2ba30b39ac84b2e1", "2006": "c14ca2255a21815b",
+        "2007": "86806f35c61355f8", "2008": "e40a00400f44d1dc", "2009": "40922dcf8a659650", "2010": "0535f6014e64772c",
+        "2011": "4c0ff48e601840a3", "2012": "6aa548a8f150accd", "2013": "9acdb4f1640148b8", "2014": "2c6a033b16ad3c17",
+        "2015": "889cb023ffca4b8f", "2019": "a5a0e6e2214e5a46", "2020": "b59c4a8f9f53f6e2", "2021": "d17c69272456bed4",
+        "2023": "6ab085e8dd0b3b9d",
+    },
+    "patent_count": {
+        "2003": "b4eb3679a6889351", "2004": "facd79f1fe3f688e", "2005": "38c41ca261b53020", "2006": "fef74aa065261ca6",
+        "2007": "ac23f0796453fff1", "2008": "e69afcca8e5631f5", "2009": "4bf4b9eb5e0e1a68", "2010": "0718ffb0b0b767a8",
+        "2011": "88ca5cd4b77b6f23", "2012": "cc6d1d5c10e655e3", "2013": "6a0767c70a166bf8", "2014": "7fc6e08fdc79f8d5",
+        "2015": "821cb832cd325652", "2019": "6fdda2abd88b93f1", "2020": "06a98531ef17dc75", "2021": "ffc401a0b881a928",
+        "2023": "3c2b4341fe4d42f4",
+    },
+}
+
+def digest(path):
+    """
+    Returns a short SHA-256 of a cleaned CSV, with the industry labels in their display form.
+    """
+    with open(path, encoding="utf-8") as f:
+        df = pd.read_csv(io.StringIO(f.read()), index_col=0)
+    df["産業"] = df["産業"].map(industry_label)
+    return hashlib.sha256(df.to_csv().encode()).hexdigest()[:16]
+
+@pytest.fixture(scope="module")
+def cleaned(workbooks, tmp_path_factory):
+    """
+    The working directory of cleaning every table of the workbooks into CSV files.
+    """
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("layout"))
+    shutil.copytree(workbooks, "downloads")
+    try:
+        DataCleaner("downloads", use_cache=False).clean_all_data()
+        yield os.getcwd()
+    finally:
+        os.chdir(cwd)
+
+@pytest.mark.parametrize("table", GOLDEN)
+def test_cleaned_tables_match_per_year_cleaners(table, cleaned):
+    output_dir = os.path.join(cleaned, TABLE_OUTPUT_DIRS[table])
+    digests = {year: digest(os.path.join(output_dir, f"{year}.csv")) for year in GOLDEN[table]}
+
+    assert digests == GOLDEN[table]
+
+def test_layout_applies_from_its_first_year():
+    layouts = [get_layout("research_expense", year) for year in (2010, 2011, 2012, 2013, 2014, 2015, 2019)]
+
+    assert layouts[1] is layouts[2]
+    assert [layout.skip_rows for layout in layouts] == [2, 1, 1, 1, 2, 2, 2]
+    assert get_layout("patent_count", 2023) is get_layout("patent_count", 2020)
+
+def test_no_layout_before_the_first_year():
+    with pytest.raises(KeyError, match="labor_number"):
+        get_layout("labor_number", 1991)
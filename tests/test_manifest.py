@@ -0,0 +1,75 @@
+"""
+The download manifest's (table ID, year) index and the lookup of one file per year.
+"""
+import os
+
+from innovation.scrape import DownloadManifest, canonical_files
+
+PATENT_NAME = "第11表 産業別、企業数、特許権、実用新案権、意匠権別所有件数及び使用件数"
+RESEARCH_NAME = "第10表 産業別、企業数、売上高、研究開発費及び売上高比率、受託研究費、研究開発投資、能力開発費"
+
+def touch(directory, filename, mtime=None):
+    path = os.path.join(directory, filename)
+    with open(path, "wb") as f:
+        f.write(b"xls")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return filename
+
+def entry(table_name, year, filename, table=None):
+    record = {"table_name": table_name, "year": str(year), "filename": filename, "sha256": filename}
+    if table:
+        record["table"] = table
+    return record
+
+def test_table_files_by_table_and_year(tmp_path):
+    manifest = DownloadManifest(str(tmp_path))
+    for year in (2021, 2019):
+        manifest.update(f"http://e-stat/patent/{year}",
+                        entry(PATENT_NAME, year, touch(tmp_path, f"patent_{year}_aa.xlsx"), "patent_count"))
+    manifest.update("http://e-stat/research/2021",
+                    entry(RESEARCH_NAME, 2021, touch(tmp_path, "research_2021_bb.xlsx"), "research_expense"))
+
+    assert manifest.table_files("patent_count") == {2019: "patent_2019_aa.xlsx", 2021: "patent_2021_aa.xlsx"}
+    assert manifest.table_files("research_expense") == {2021: "research_2021_bb.xlsx"}
+    assert manifest.table_files("labor_number") == {}
+    # The index is rebuilt from the saved manifest
+    assert DownloadManifest(str(tmp_path)).table_files("patent_count") == manifest.table_files("patent_count")
+
+def test_entries_without_table_id_are_indexed_by_table_name(tmp_path):
+    manifest = DownloadManifest(str(tmp_path))
+    manifest.update("http://e-stat/patent/2015", entry(PATENT_NAME, 2015, touch(tmp_path, "patent_2015_cc.xls")))
+
+    assert manifest.table_files("patent_count") == {2015: "patent_2015_cc.xls"}
+
+def test_files_missing_on_disk_are_left_out(tmp_path):
+    manifest = DownloadManifest(str(tmp_path))
+    manifest.update("http://e-stat/patent/2019",
+                    entry(PATENT_NAME, 2019, touch(tmp_path, "patent_2019_aa.xlsx"), "patent_count"))
+    manifest.update("http://e-stat/patent/2020", entry(PATENT_NAME, 2020, "patent_2020_aa.xlsx", "patent_count"))
+
+    assert manifest.table_files("patent_count") == {2019: "patent_2019_aa.xlsx"}
+    assert manifest.get("http://e-stat/patent/2020") is None
+
+def test_canonical_files_uses_the_index(tmp_path):
+    manifest = DownloadManifest(str(tmp_path))
+    manifest.update("http://e-stat/patent/2019",
+                    entry(PATENT_NAME, 2019, touch(tmp_path, f"{PATENT_NAME}_2019_aa.xlsx"), "patent_count"))
+    # Not in the manifest: ignored while the manifest has files of the table
+    touch(tmp_path, f"{PATENT_NAME}_2018_1700002018.xlsx")
+
+    target_str = "産業別、企業数、特許権、実用新案権、意匠権別"
+    assert canonical_files(str(tmp_path), target_str) == {2019: f"{PATENT_NAME}_2019_aa.xlsx"}
+
+def test_canonical_files_scans_without_manifest(tmp_path):
+    touch(tmp_path, f"{PATENT_NAME}_2019_1700002019.xlsx", mtime=1_700_000_000)
+    touch(tmp_path, f"{PATENT_NAME}_2019_1700009999.xlsx", mtime=1_700_001_000)
+    touch(tmp_path, f"{PATENT_NAME}_2020_1700002020.xlsx")
+    touch(tmp_path, f"{RESEARCH_NAME}_2020_1700002020.xlsx")
+    touch(tmp_path, f".{PATENT_NAME}_2021_abc.xlsx")
+
+    target_str = "産業別、企業数、特許権、実用新案権、意匠権別"
+    assert canonical_files(str(tmp_path), target_str) == {
+        2019: f"{PATENT_NAME}_2019_1700009999.xlsx",
+        2020: f"{PATENT_NAME}_2020_1700002020.xlsx",
+    }
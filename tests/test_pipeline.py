@@ -0,0 +1,55 @@
+"""
+End-to-end runs of the clean command.
+
+The stages run in threads and each clean stage starts a process pool, so a run
+with several workers is compared with a run with one. Each run is a fresh
+`main.py` process with a timeout: a worker stuck on a lock inherited from
+another thread fails the test instead of hanging it.
+"""
+import os
+import shutil
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "main.py")
+
+# Seconds a clean run may take before it counts as hung
+CLEAN_TIMEOUT = 300
+
+def clean(workbooks, path, workers: int) -> dict:
+    """
+    Cleans a copy of the workbooks in path with `main.py clean`.
+
+    Returns:
+        dict: {table file or panel partition, relative to data/: frame}
+    """
+    path.mkdir()
+    shutil.copytree(workbooks, path / "downloads")
+    try:
+        result = subprocess.run(
+            [sys.executable, MAIN_PATH, "clean", "--workers", str(workers), "--format", "parquet"],
+            cwd=path, capture_output=True, text=True, timeout=CLEAN_TIMEOUT,
+        )
+    except subprocess.TimeoutExpired:
+        pytest.fail(f"clean --workers {workers} did not finish in {CLEAN_TIMEOUT} s")
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert "failed" not in result.stdout and "blocked" not in result.stdout, result.stdout[-2000:]
+    data_dir = path / "data"
+    # The files of a panel partition have generated names
+    frames = {}
+    for file in sorted(data_dir.rglob("*.parquet")):
+        name = file.relative_to(data_dir)
+        frames[str(name.parent if name.parts[0] == "panel" else name)] = pd.read_parquet(file)
+    return frames
+
+def test_clean_with_workers_matches_one_worker(workbooks, tmp_path):
+    expected = clean(workbooks, tmp_path / "one", workers=1)
+    outputs = clean(workbooks, tmp_path / "two", workers=2)
+
+    assert expected
+    assert list(outputs) == list(expected)
+    for name, frame in outputs.items():
+        pd.testing.assert_frame_equal(frame, expected[name], obj=name)
@@ -0,0 +1,50 @@
+"""
+Run reports: the per-call records and their summary.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Two calls in a fresh interpreter: one raises the peak RSS by 64 MB, the next stays below it
+MEASURED_CALLS = """
+import sys
+from innovation.report import RUN_REPORT
+
+RUN_REPORT.configure(sys.argv[1])
+with RUN_REPORT.measure("allocate"):
+    data = b"x" * (64 * 2**20)
+del data
+with RUN_REPORT.measure("reallocate"):
+    data = b"x" * (32 * 2**20)
+"""
+
+@pytest.mark.skipif(sys.platform == "win32", reason="no peak RSS on Windows")
+def test_calls_are_charged_with_their_peak_rss_growth(tmp_path):
+    path = tmp_path / "report.jsonl"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")]))}
+    env.pop("INNOVATION_RUN_REPORT", None)
+    subprocess.run([sys.executable, "-c", MEASURED_CALLS, str(path)], env=env, check=True)
+
+    records = {record["stage"]: record for record in map(json.loads, path.read_text().splitlines())}
+    assert records["allocate"]["peak_rss_growth_mb"] >= 32
+    assert records["reallocate"]["peak_rss_growth_mb"] < 8
+
+def test_summary_keeps_the_largest_growth(tmp_path):
+    from innovation.report import summarize_report
+
+    path = tmp_path / "report.jsonl"
+    path.write_text("".join(
+        json.dumps({"run_id": "r", "stage": "clean", "wall_s": wall_s, "peak_rss_growth_mb": growth, "status": "ok"}) + "\n"
+        for wall_s, growth in ((1.0, 12.5), (2.0, 0.0))
+    ))
+
+    summary = summarize_report(str(path))
+
+    assert summary.loc["clean", "calls"] == 2
+    assert summary.loc["clean", "wall_s"] == 3.0
+    assert summary.loc["clean", "peak_rss_growth_mb"] == 12.5
@@ -0,0 +1,93 @@
+"""
+Resuming interrupted downloads with Range requests, against a local HTTP server.
+"""
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from innovation.scrape import DataScraper
+
+TABLE_NAME = "第11表 産業別、企業数、特許権、実用新案権、意匠権別所有件数及び使用件数"
+BODY = bytes(range(256)) * 64
+ETAG = '"v1"'
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Serves BODY with an ETag, and the requested bytes of it for a Range request
+    whose If-Range matches, the way e-Stat does.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status, body, headers = 200, BODY, {"ETag": ETAG}
+        byte_range = self.headers.get("Range", "")
+        if byte_range.startswith("bytes=") and self.headers.get("If-Range", ETAG) == ETAG:
+            start = int(byte_range[len("bytes="):].split("-")[0])
+            if start >= len(BODY):
+                status, body = 416, b""
+            else:
+                status, body = 206, BODY[start:]
+                headers["Content-Range"] = f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"
+        self.send_response(status)
+        for name, value in {**headers, "Content-Length": str(len(body))}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture(scope="module")
+def url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    yield f"http://{host}:{port}/file/2021.xlsx"
+    server.shutdown()
+
+@pytest.fixture
+def scraper(tmp_path):
+    return DataScraper([], str(tmp_path / "downloads"), [], min_interval=0)
+
+def write_partial(scraper, url, data, etag):
+    """
+    Leaves the partial file and journal entry of a download interrupted after `data`.
+    """
+    url_key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    with open(os.path.join(scraper.download_dir, f".{url_key}.part"), "wb") as f:
+        f.write(data)
+    scraper.journal.start_download(url, etag)
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_download_resumes_partial_file(scraper, url):
+    # A marker in place of the first bytes shows that they were not downloaded again
+    marker = b"\xff" * 1000
+    write_partial(scraper, url, marker, ETAG)
+
+    path = scraper.download_file(url, TABLE_NAME, "2021")
+
+    data = read(path)
+    assert data == marker + BODY[len(marker):]
+    # The file is named after the hash of the whole file, including the resumed bytes
+    assert os.path.basename(path).endswith(f"_2021_{hashlib.sha256(data).hexdigest()[:16]}.xlsx")
+    assert scraper.journal.partial(url) == {}
+    assert scraper.manifest.get(url)["content_length"] == len(BODY)
+
+def test_changed_file_is_downloaded_from_the_start(scraper, url):
+    write_partial(scraper, url, b"\xff" * 1000, '"v0"')
+
+    path = scraper.download_file(url, TABLE_NAME, "2021")
+
+    assert read(path) == BODY
+    assert os.path.basename(path).endswith(f"_2021_{hashlib.sha256(BODY).hexdigest()[:16]}.xlsx")
+
+def test_partial_file_longer_than_the_file_starts_over(scraper, url):
+    write_partial(scraper, url, b"\xff" * (len(BODY) + 10), ETAG)
+
+    assert read(scraper.download_file(url, TABLE_NAME, "2021")) == BODY
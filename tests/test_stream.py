@@ -0,0 +1,54 @@
+"""
+Parity of the streaming cleaner with cleaning the whole table in memory.
+"""
+import os
+
+import pytest
+
+from innovation.clean import DataCleaner, read_schema
+from innovation.config import TABLE_OUTPUT_DIRS, TABLE_TARGETS
+
+def read_outputs(table):
+    """
+    Returns ({file name: content} of the written CSV files, the table's schema).
+    """
+    output_dir = TABLE_OUTPUT_DIRS[table]
+    schema = read_schema(output_dir)
+    files = {}
+    for entry in schema.values():
+        with open(os.path.join(output_dir, entry["file"]), "rb") as f:
+            files[entry["file"]] = f.read()
+    return files, schema
+
+@pytest.mark.parametrize("table", TABLE_TARGETS)
+def test_stream_table_writes_the_cleaned_table(table, download_dir):
+    cleaner = DataCleaner(download_dir, use_cache=False, export_format="csv")
+    cleaner.load_table(table)
+    cleaner.save_tables([table])
+    files, schema = read_outputs(table)
+
+    # Small batches, so that sheets and industries are split across batches
+    cleaner.stream_table(table, batch_size=7)
+    streamed, streamed_schema = read_outputs(table)
+
+    assert len(files) == 17
+    assert streamed == files
+    for year, entry in schema.items():
+        assert streamed_schema[year]["rows"] == entry["rows"]
+        assert streamed_schema[year]["columns"] == entry["columns"]
+        labels = [i for i, dtype in enumerate(entry["dtypes"]) if dtype == "category"]
+        assert labels and [streamed_schema[year]["dtypes"][i] for i in labels] == ["category"] * len(labels)
+
+def test_stream_table_years(download_dir):
+    cleaner = DataCleaner(download_dir, use_cache=False, export_format="csv")
+    cleaner.load_table("patent_count")
+    cleaner.save_tables(["patent_count"])
+    files, _ = read_outputs("patent_count")
+    for entry in os.listdir(TABLE_OUTPUT_DIRS["patent_count"]):
+        os.remove(os.path.join(TABLE_OUTPUT_DIRS["patent_count"], entry))
+
+    paths = cleaner.stream_table("patent_count", years=[2010, 2021], batch_size=7)
+    streamed, _ = read_outputs("patent_count")
+
+    assert sorted(paths) == ["2010", "2021"]
+    assert streamed == {name: files[name] for name in ("2010.csv", "2021.csv")}
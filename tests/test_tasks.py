@@ -0,0 +1,26 @@
+"""
+Running tasks in a process pool.
+"""
+import threading
+
+from innovation.tasks import run_tasks
+
+# Held by the test while the tasks run, like a lock another thread of the caller holds
+LOCK = threading.Lock()
+
+def locked_square(x):
+    with LOCK:
+        return x * x
+
+def test_workers_do_not_inherit_held_locks():
+    with LOCK:
+        results, errors = run_tasks(locked_square, [(2,), (3,)], max_workers=2)
+
+    assert results == [((2,), 4), ((3,), 9)]
+    assert errors == []
+
+def test_failing_task_is_skipped():
+    results, errors = run_tasks(locked_square, [(2,), ("x",)], max_workers=2)
+
+    assert results == [((2,), 4)]
+    assert [(task, type(e)) for task, e in errors] == [(("x",), TypeError)]